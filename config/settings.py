@@ -148,6 +148,119 @@ LOGOUT_REDIRECT_URL = "login"
 
 CARDVAULT_API_KEY = os.getenv("CARDVAULT_API_KEY")
 
+# Upstream API concurrency: refresh thread pool size and per-host request cap
+PRICE_REFRESH_MAX_WORKERS = int(os.getenv("PRICE_REFRESH_MAX_WORKERS", "4"))
+UPSTREAM_MAX_CONCURRENCY_PER_HOST = int(
+    os.getenv("UPSTREAM_MAX_CONCURRENCY_PER_HOST", "4")
+)
+# Rows per bulk write when flushing refreshed prices
+PRICE_REFRESH_WRITE_CHUNK_SIZE = int(os.getenv("PRICE_REFRESH_WRITE_CHUNK_SIZE", "500"))
+# Cards per bulk insert when importing a file into a vault
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+# Rows fetched per database round trip while streaming an export
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+# Cards per page in the vault list, and the most the JSON list returns at once
+CARD_LIST_PAGE_SIZE = int(os.getenv("CARD_LIST_PAGE_SIZE", "50"))
+CARD_LIST_MAX_PAGE_SIZE = int(os.getenv("CARD_LIST_MAX_PAGE_SIZE", "200"))
+# Default point budget for the columnar value series
+SERIES_MAX_POINTS = int(os.getenv("SERIES_MAX_POINTS", "1000"))
+# How long a rendered series/list response is kept per vault watermark
+COLLECTION_RESPONSE_CACHE_SECONDS = int(
+    os.getenv("COLLECTION_RESPONSE_CACHE_SECONDS", "3600")
+)
+# Socket timeout for any one upstream call
+UPSTREAM_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", "10"))
+# Total seconds a request may spend on upstream calls, per view name
+REQUEST_BUDGET_SECONDS = {
+    "default": float(os.getenv("REQUEST_BUDGET_SECONDS", "8")),
+    "card-create": float(os.getenv("CARD_CREATE_BUDGET_SECONDS", "6")),
+}
+# Consecutive failures that open a host's circuit, and seconds before probing it
+CIRCUIT_BREAKER_FAILURES = int(os.getenv("CIRCUIT_BREAKER_FAILURES", "5"))
+CIRCUIT_BREAKER_RESET_SECONDS = int(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "30"))
+# Pooled keep-alive connections per upstream host, and connection-level retries
+UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "10"))
+UPSTREAM_CONNECT_RETRIES = int(os.getenv("UPSTREAM_CONNECT_RETRIES", "2"))
+# Run refresh jobs on the asyncio path: lookups in flight at once, price groups
+# written per database batch, and the async client's connection cap
+PRICE_REFRESH_ASYNC = os.getenv("PRICE_REFRESH_ASYNC", "False") == "True"
+ASYNC_REFRESH_MAX_IN_FLIGHT = int(os.getenv("ASYNC_REFRESH_MAX_IN_FLIGHT", "100"))
+ASYNC_REFRESH_APPLY_BATCH_SIZE = int(os.getenv("ASYNC_REFRESH_APPLY_BATCH_SIZE", "25"))
+UPSTREAM_ASYNC_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_ASYNC_MAX_CONNECTIONS", "20"))
+# Running refresh jobs silent for this long are assumed orphaned and requeued
+PRICE_REFRESH_JOB_TIMEOUT_SECONDS = int(
+    os.getenv("PRICE_REFRESH_JOB_TIMEOUT_SECONDS", "1800")
+)
+# How often the worker checks for orphaned jobs
+PRICE_REFRESH_REQUEUE_INTERVAL_SECONDS = int(
+    os.getenv("PRICE_REFRESH_REQUEUE_INTERVAL_SECONDS", "60")
+)
+
+# pokemonpricetracker rate limiting: token bucket rate/burst, retries with
+# backoff on 429/5xx, and the longest a call may wait for a token.
+# PRICE_API_SHARED_LIMITER keeps the bucket in the cache so workers share it
+PRICE_API_RATE_PER_SECOND = float(os.getenv("PRICE_API_RATE_PER_SECOND", "2"))
+PRICE_API_BURST = int(os.getenv("PRICE_API_BURST", "5"))
+PRICE_API_SHARED_LIMITER = os.getenv("PRICE_API_SHARED_LIMITER", "False") == "True"
+PRICE_API_MAX_RETRIES = int(os.getenv("PRICE_API_MAX_RETRIES", "3"))
+PRICE_API_BACKOFF_BASE_SECONDS = float(
+    os.getenv("PRICE_API_BACKOFF_BASE_SECONDS", "0.5")
+)
+PRICE_API_MAX_THROTTLE_WAIT_SECONDS = float(
+    os.getenv("PRICE_API_MAX_THROTTLE_WAIT_SECONDS", "30")
+)
+
+# Shared cache for upstream API responses. Local memory by default; point
+# CACHE_BACKEND at the database or file cache so workers share entries
+# (the database cache needs `python manage.py createcachetable`)
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "cardvault"),
+    }
+}
+
+# Seconds an upstream response stays fresh, per endpoint
+UPSTREAM_CACHE_TTLS = {
+    "price": int(os.getenv("PRICE_CACHE_TTL_SECONDS", str(6 * 60 * 60))),
+    "tcgdex": int(os.getenv("TCGDEX_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60))),
+}
+# How long expired entries are kept as a stale fallback
+UPSTREAM_CACHE_STALE_SECONDS = int(
+    os.getenv("UPSTREAM_CACHE_STALE_SECONDS", str(24 * 60 * 60))
+)
+
+# Local TCGdex card index: rebuild sets older than this, and re-read stored
+# set indexes at most once per memo window in each process
+TCGDEX_INDEX_MAX_AGE_SECONDS = int(
+    os.getenv("TCGDEX_INDEX_MAX_AGE_SECONDS", str(7 * 24 * 60 * 60))
+)
+TCGDEX_INDEX_MEMO_SECONDS = int(os.getenv("TCGDEX_INDEX_MEMO_SECONDS", "300"))
+# Rows in the local price table answer lookups for this long after a fetch
+PRICE_TABLE_MAX_AGE_SECONDS = int(
+    os.getenv("PRICE_TABLE_MAX_AGE_SECONDS", str(6 * 60 * 60))
+)
+
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 CARD_IMAGE_PLACEHOLDER_URL = "/static/vault/image/card-placeholder.png"
+# Local card thumbnails, shared by web and worker, and the largest original to fetch
+CARD_IMAGE_ROOT = os.getenv("CARD_IMAGE_ROOT", str(BASE_DIR / "card_images"))
+CARD_IMAGE_MAX_BYTES = int(os.getenv("CARD_IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+# Printings mirrored per pass, so the job worker isn't held up downloading
+IMAGE_MIRROR_BATCH_SIZE = int(os.getenv("IMAGE_MIRROR_BATCH_SIZE", "50"))
+# Missing-image healing: lookups per pass, its own thread budget, how often the
+# worker runs it, and the retry backoff for a printing that still has no image
+IMAGE_HEAL_BATCH_SIZE = int(os.getenv("IMAGE_HEAL_BATCH_SIZE", "200"))
+IMAGE_HEAL_MAX_WORKERS = int(os.getenv("IMAGE_HEAL_MAX_WORKERS", "2"))
+IMAGE_HEAL_INTERVAL_SECONDS = int(os.getenv("IMAGE_HEAL_INTERVAL_SECONDS", "900"))
+IMAGE_HEAL_BASE_SECONDS = int(os.getenv("IMAGE_HEAL_BASE_SECONDS", str(60 * 60)))
+IMAGE_HEAL_MAX_SECONDS = int(
+    os.getenv("IMAGE_HEAL_MAX_SECONDS", str(30 * 24 * 60 * 60))
+)
+# A lookup that failed upstream (not a miss) is retried after this, uncounted
+IMAGE_HEAL_ERROR_RETRY_SECONDS = int(
+    os.getenv("IMAGE_HEAL_ERROR_RETRY_SECONDS", str(5 * 60))
+)
@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import Card, PriceSnapshot
+from .models import (
+    Card,
+    CatalogCard,
+    PriceSnapshot,
+    PriceRefreshJob,
+    PriceSweepCheckpoint,
+    UpstreamSetIndex,
+)
 
 
 @admin.register(Card)
@@ -21,3 +28,49 @@ class PriceSnapshotAdmin(admin.ModelAdmin):
     list_display = ("card", "price", "as_of_date", "source")
     ordering = ("card__card_name", "-as_of_date")
     list_filter = ("as_of_date",)
+
+
+@admin.register(PriceRefreshJob)
+class PriceRefreshJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "status",
+        "cards_done",
+        "cards_total",
+        "cards_failed",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status",)
+
+
+@admin.register(PriceSweepCheckpoint)
+class PriceSweepCheckpointAdmin(admin.ModelAdmin):
+    list_display = (
+        "as_of_date",
+        "last_key",
+        "distinct_keys",
+        "upstream_calls",
+        "rows_written",
+        "completed_at",
+    )
+
+
+@admin.register(CatalogCard)
+class CatalogCardAdmin(admin.ModelAdmin):
+    list_display = (
+        "card_name",
+        "set_name",
+        "card_number",
+        "value_usd",
+        "price_last_updated",
+    )
+    list_filter = ("set_name",)
+    search_fields = ("card_name", "set_name", "card_number", "tcgdex_id")
+
+
+@admin.register(UpstreamSetIndex)
+class UpstreamSetIndexAdmin(admin.ModelAdmin):
+    list_display = ("set_code", "source", "entry_count", "refreshed_at")
+    list_filter = ("source",)
+    exclude = ("entries",)
@@ -27,6 +27,9 @@ SETS: Dict[str, ApiCodes] = {
     "White Flare": {"image": "sv10.5w", "price": "White Flare"},
 }
 
+# Widths of the locally mirrored card thumbnails, the list renders at 200
+THUMBNAIL_WIDTHS: Tuple[int, ...] = (200, 400)
+
 # Derived artifacts (don’t hand-edit below)
 SET_CHOICES: List[Tuple[str, str]] = [(name, name) for name in SETS.keys()]
 IMAGE_SET_MAP: Dict[str, str] = {name: codes["image"] for name, codes in SETS.items()}
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+
+# Shortest socket timeout worth handing to requests
+MIN_TIMEOUT_SECONDS = 0.05
+
+
+class Deadline:
+    """
+    Time budget for one request. A view creates it and passes it to every
+    upstream call it makes, so chained calls share one budget instead of each
+    getting its own full timeout.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def for_view(cls, name: str) -> "Deadline":
+        """
+        Budget for a view from settings.REQUEST_BUDGET_SECONDS, falling back
+        to its "default" entry.
+        """
+        budgets = getattr(settings, "REQUEST_BUDGET_SECONDS", {})
+        return cls(budgets.get(name, budgets.get("default", 8)))
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() < MIN_TIMEOUT_SECONDS
+
+    def timeout(self, cap: float) -> float:
+        # Never longer than the client's own timeout
+        return max(MIN_TIMEOUT_SECONDS, min(cap, self.remaining()))
@@ -1,12 +1,16 @@
 from django import forms
 from .models import Card
+from vault.services.import_services import guess_import_format
+from vault.services.price_table_services import lookup_table_price, record_price_payload
 from vault.utils import fetch_card_price, extract_card_price
 
 
 class CardForm(forms.ModelForm):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, deadline=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.cleaned_price = None
+        # Request budget the price lookup has to fit in, see vault.deadline
+        self.deadline = deadline
 
     class Meta:
         model = Card
@@ -22,13 +26,21 @@ class CardForm(forms.ModelForm):
         if not (card_name and set_name and card_number):
             return cleaned
 
-        data = fetch_card_price(card_name, set_name)
+        # A fresh row in the local price table saves the API call entirely
+        parsed = lookup_table_price(set_name, card_name, card_number)
+        if parsed is not None:
+            self.cleaned_price = parsed
+            return cleaned
+
+        data = fetch_card_price(card_name, set_name, deadline=self.deadline)
         if "error" in data:
             raise forms.ValidationError(
                 "Price lookup failed (service unavailable or rate-limited). Please try again."
             )
 
-        parsed = extract_card_price(data, card_number)
+        # Index the response once, this lookup and later ones read the table
+        table = record_price_payload(set_name, data)
+        parsed = extract_card_price(table, card_number)
         if "error" in parsed:
             # Attach to card_name so it feels like “spelling”
             self.add_error(
@@ -47,3 +59,14 @@ class CardUpdateForm(forms.ModelForm):
     class Meta:
         model = Card
         fields = ["condition"]
+
+
+class CardImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV, JSON or JSON Lines (.csv, .json, .jsonl)")
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        self.import_format = guess_import_format(upload.name)
+        if self.import_format is None:
+            raise forms.ValidationError("Upload a .csv, .json or .jsonl file.")
+        return upload
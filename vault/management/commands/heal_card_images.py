@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from vault.services.image_heal_services import heal_catalog_images
+
+
+class Command(BaseCommand):
+    help = "Look up images for printings still on the placeholder whose retry is due."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help="Most printings to look up in this pass.",
+        )
+
+    def handle(self, *args, **options):
+        summary = heal_catalog_images(limit=options["limit"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Images healed: {healed} | still missing: {missed} "
+                "| lookup errors: {errors}".format(**summary)
+            )
+        )
@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from vault.services.import_services import (
+    IMPORT_FORMATS,
+    guess_import_format,
+    import_cards,
+    iter_import_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Import cards into a user's vault from a CSV, JSON or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="File format, guessed from the extension by default.",
+        )
+        parser.add_argument(
+            "--no-enrich",
+            action="store_true",
+            help="Don't queue a price refresh for the imported cards.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named '{options['username']}'")
+
+        fmt = options["format"] or guess_import_format(options["path"])
+        if fmt is None:
+            raise CommandError("Can't tell the file format, pass --format")
+
+        with open(options["path"], "rb") as stream:
+            summary = import_cards(
+                user,
+                iter_import_rows(stream, fmt),
+                enrich=not options["no_enrich"],
+            )
+
+        for error in summary["errors"]:
+            self.stderr.write(f"Row {error['row']}: {error['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created: {summary['created']} | duplicates: {summary['duplicates']} "
+                f"| errors: {len(summary['errors'])}"
+            )
+        )
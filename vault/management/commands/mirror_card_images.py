@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from vault.services.thumbnail_services import mirror_catalog_images
+
+
+class Command(BaseCommand):
+    help = "Download card images once and store local thumbnails for the list view."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help="Stop after this many printings.",
+        )
+
+    def handle(self, *args, **options):
+        summary = mirror_catalog_images(limit=options["limit"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Images mirrored: {mirrored} | failed: {failed}".format(**summary)
+            )
+        )
@@ -0,0 +1,57 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from vault.services.image_heal_services import heal_catalog_images, heal_new_images
+from vault.services.job_services import process_next_job, requeue_stale_jobs
+from vault.services.thumbnail_services import mirror_catalog_images
+
+
+class Command(BaseCommand):
+    help = "Process queued price refresh jobs (runs until stopped unless --once)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling forever.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        requeue_every = getattr(settings, "PRICE_REFRESH_REQUEUE_INTERVAL_SECONDS", 60)
+        next_requeue = time.monotonic()
+        heal_every = getattr(settings, "IMAGE_HEAL_INTERVAL_SECONDS", 900)
+        next_heal = time.monotonic()
+        while True:
+            # Another worker may have crashed mid-job, don't leave its user
+            # stuck with an active job until a restart
+            if time.monotonic() >= next_requeue:
+                requeued = requeue_stale_jobs()
+                if requeued:
+                    self.stdout.write(f"Requeued {requeued} stale job(s)")
+                next_requeue = time.monotonic() + requeue_every
+            if process_next_job():
+                processed += 1
+                continue
+            if options["once"]:
+                break
+            # Idle: resolve images for newly added cards first, then the
+            # scheduled retry pass when it's due
+            if any(heal_new_images().values()):
+                continue
+            if time.monotonic() >= next_heal:
+                heal_catalog_images()
+                mirror_catalog_images()
+                next_heal = time.monotonic() + heal_every
+                continue
+            time.sleep(options["poll_interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s)"))
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from vault.services.rollup_services import rebuild_collection_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily collection value rollups from price snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            dest="username",
+            help="Only rebuild this user's rollups.",
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["username"]:
+            try:
+                user = User.objects.get(username=options["username"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named '{options['username']}'")
+
+        written = rebuild_collection_rollups(user)
+        self.stdout.write(self.style.SUCCESS(f"Rollup rows written: {written}"))
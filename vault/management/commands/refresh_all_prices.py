@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from vault.services.price_services import refresh_all_prices
+
+
+class Command(BaseCommand):
+    help = "Refresh prices for every card in every vault, one fetch per distinct card."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore today's checkpoint and sweep from the beginning.",
+        )
+        parser.add_argument(
+            "--checkpoint-every",
+            type=int,
+            default=25,
+            help="Number of price groups between checkpoints.",
+        )
+
+    def handle(self, *args, **options):
+        summary = refresh_all_prices(
+            restart=options["restart"],
+            checkpoint_every=max(1, options["checkpoint_every"]),
+        )
+        if summary["resumed"]:
+            self.stdout.write("Resumed from today's checkpoint")
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Distinct keys: {distinct_keys} | upstream calls: {upstream_calls} "
+                "| rows written: {rows_written}".format(**summary)
+            )
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from vault.services.card_index_services import sync_card_index
+
+
+class Command(BaseCommand):
+    help = "Build or refresh the local TCGdex card index, one request per stale set."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--set",
+            dest="set_codes",
+            action="append",
+            help="TCGdex set code to refresh (repeatable), defaults to every mapped set.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Refresh sets even if their index is still fresh.",
+        )
+
+    def handle(self, *args, **options):
+        summary = sync_card_index(
+            set_codes=options["set_codes"], force=options["force"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Sets refreshed: {refreshed} | skipped: {skipped} "
+                "| failed: {failed}".format(**summary)
+            )
+        )
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0011_pricerefreshjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PriceSweepCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("as_of_date", models.DateField(unique=True)),
+                ("last_key", models.CharField(blank=True, default="", max_length=200)),
+                ("distinct_keys", models.PositiveIntegerField(default=0)),
+                ("upstream_calls", models.PositiveIntegerField(default=0)),
+                ("rows_written", models.PositiveIntegerField(default=0)),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0012_pricesweepcheckpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogCard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("set_name", models.CharField(max_length=25)),
+                ("card_number", models.CharField(max_length=3)),
+                ("card_name", models.CharField(max_length=50)),
+                ("name_key", models.CharField(max_length=50)),
+                ("tcgdex_id", models.CharField(blank=True, default="", max_length=30)),
+                (
+                    "tcgplayer_id",
+                    models.CharField(blank=True, default="", max_length=30),
+                ),
+                ("image_url", models.URLField(blank=True, null=True)),
+                (
+                    "value_usd",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=8, null=True
+                    ),
+                ),
+                ("price_last_updated", models.DateField(blank=True, null=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("set_name", "card_number", "name_key"),
+                        name="uniq_catalog_printing",
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="card",
+            name="catalog",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="cards",
+                to="vault.catalogcard",
+            ),
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_catalog(apps, schema_editor):
+    """
+    Create one CatalogCard per distinct printing in existing vaults, seeded
+    with the most recent price and any real image, and link every card to it.
+    """
+    Card = apps.get_model("vault", "Card")
+    CatalogCard = apps.get_model("vault", "CatalogCard")
+    placeholder = settings.CARD_IMAGE_PLACEHOLDER_URL
+
+    entries = {}
+    links = []
+    cards = Card.objects.order_by("id").values_list(
+        "id",
+        "set_name",
+        "card_number",
+        "card_name",
+        "image_url",
+        "value_usd",
+        "price_last_updated",
+    )
+    for card_id, set_name, number, name, image_url, value, priced_on in cards:
+        key = (set_name, str(number).strip().zfill(3), name.strip().lower())
+        entry = entries.setdefault(
+            key,
+            CatalogCard(
+                set_name=key[0],
+                card_number=key[1],
+                name_key=key[2],
+                card_name=name.strip(),
+            ),
+        )
+        if image_url and image_url != placeholder and not entry.image_url:
+            entry.image_url = image_url
+        if priced_on and (
+            entry.price_last_updated is None or priced_on > entry.price_last_updated
+        ):
+            entry.value_usd = value
+            entry.price_last_updated = priced_on
+        links.append((card_id, key))
+
+    CatalogCard.objects.bulk_create(entries.values(), batch_size=500)
+
+    # Postgres returns ids from bulk_create, other backends need a lookup
+    ids = {
+        (e.set_name, e.card_number, e.name_key): e.id for e in CatalogCard.objects.all()
+    }
+    updates = [Card(id=card_id, catalog_id=ids[key]) for card_id, key in links]
+    Card.objects.bulk_update(updates, ["catalog"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0013_catalogcard"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_catalog, migrations.RunPython.noop),
+    ]
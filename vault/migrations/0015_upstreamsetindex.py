@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0014_backfill_catalogcard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UpstreamSetIndex",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(choices=[("tcgdex", "TCGdex")], max_length=20),
+                ),
+                ("set_code", models.CharField(max_length=30)),
+                ("entries", models.JSONField(default=dict)),
+                ("entry_count", models.PositiveIntegerField(default=0)),
+                ("refreshed_at", models.DateTimeField()),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("source", "set_code"), name="uniq_upstream_set_index"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0015_upstreamsetindex"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="upstreamsetindex",
+            name="source",
+            field=models.CharField(
+                choices=[
+                    ("tcgdex", "TCGdex"),
+                    ("pricetracker", "Pokémon Price Tracker"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
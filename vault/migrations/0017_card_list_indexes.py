@@ -0,0 +1,69 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:13
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0016_upstreamsetindex_pricetracker"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="card",
+            index=models.Index(
+                models.F("user"),
+                models.OrderBy(
+                    django.db.models.functions.comparison.Coalesce(
+                        models.F("value_usd"), models.Value(Decimal("-1"))
+                    ),
+                    descending=True,
+                ),
+                models.F("card_name"),
+                models.F("id"),
+                name="card_user_value_desc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="card",
+            index=models.Index(
+                models.F("user"),
+                django.db.models.functions.comparison.Coalesce(
+                    models.F("value_usd"), models.Value(Decimal("1000000"))
+                ),
+                models.F("card_name"),
+                models.F("id"),
+                name="card_user_value_asc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="card",
+            index=models.Index(
+                fields=["user", "set_name", "card_number", "id"],
+                name="card_user_set_asc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="card",
+            index=models.Index(
+                fields=["user", "-set_name", "card_number", "id"],
+                name="card_user_set_desc_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="card",
+            index=models.Index(
+                models.F("user"),
+                django.db.models.functions.text.Upper("card_name"),
+                django.db.models.functions.text.Upper("set_name"),
+                models.F("card_number"),
+                name="card_user_dup_check_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Sum existing snapshots into one rollup row per user per day.
+    """
+    PriceSnapshot = apps.get_model("vault", "PriceSnapshot")
+    CollectionValueRollup = apps.get_model("vault", "CollectionValueRollup")
+
+    totals = (
+        PriceSnapshot.objects.values("card__user_id", "as_of_date")
+        .annotate(total=Sum("price"), cards=Count("id"))
+        .order_by()
+    )
+    CollectionValueRollup.objects.bulk_create(
+        (
+            CollectionValueRollup(
+                user_id=row["card__user_id"],
+                as_of_date=row["as_of_date"],
+                total_value=row["total"],
+                card_count=row["cards"],
+            )
+            for row in totals.iterator(chunk_size=2000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0018_collectionvaluerollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
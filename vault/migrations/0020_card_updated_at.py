@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0019_backfill_collection_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="card",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="card",
+            index=models.Index(
+                fields=["user", "updated_at"], name="card_user_updated_idx"
+            ),
+        ),
+    ]
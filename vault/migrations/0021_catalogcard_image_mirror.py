@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0020_card_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="catalogcard",
+            name="image_mirror",
+            field=models.CharField(blank=True, default="", max_length=40),
+        ),
+    ]
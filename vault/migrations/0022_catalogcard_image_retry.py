@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0021_catalogcard_image_mirror"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="catalogcard",
+            name="image_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="catalogcard",
+            name="image_next_attempt_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
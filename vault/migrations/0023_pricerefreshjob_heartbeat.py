@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:17
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_heartbeats(apps, schema_editor):
+    # Jobs running at deploy time count from when they started
+    PriceRefreshJob = apps.get_model("vault", "PriceRefreshJob")
+    PriceRefreshJob.objects.filter(status="running").update(
+        heartbeat_at=F("started_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vault", "0022_catalogcard_image_retry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pricerefreshjob",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(seed_heartbeats, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,72 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import F, OrderBy, Value
+from django.db.models.functions import Coalesce, Upper
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
+from django.urls import reverse
 from django.utils import timezone
 
+from vault.constants import THUMBNAIL_WIDTHS
+
+
+# Card price sort keys with unpriced cards last in both directions. Coalescing
+# to a sentinel keeps them plain expressions every backend can index.
+PRICE_SORT_DESC = Coalesce(F("value_usd"), Value(Decimal("-1")))
+PRICE_SORT_ASC = Coalesce(F("value_usd"), Value(Decimal("1000000")))
+
+
+class CatalogCard(models.Model):
+    """
+    One row per printing (set / number / name) shared by every vault that owns
+    it, so upstream prices and images are resolved once per printing.
+    """
+
+    set_name = models.CharField(max_length=25)
+    # Zero padded to match the upstream APIs, ie '006'
+    card_number = models.CharField(max_length=3)
+    card_name = models.CharField(max_length=50)
+    # Lowercased card_name, the lookup key for a printing
+    name_key = models.CharField(max_length=50)
+
+    tcgdex_id = models.CharField(max_length=30, blank=True, default="")
+    tcgplayer_id = models.CharField(max_length=30, blank=True, default="")
+    image_url = models.URLField(blank=True, null=True)
+    # Failed image lookups so far and when the heal pass may try again; once
+    # there is an image, failed thumbnail downloads for mirror_catalog_image
+    image_attempts = models.PositiveSmallIntegerField(default=0)
+    image_next_attempt_at = models.DateTimeField(blank=True, null=True)
+    # Local thumbnails of image_url, "<content hash>.<ext>", see mirror_catalog_image
+    image_mirror = models.CharField(max_length=40, blank=True, default="")
+    value_usd = models.DecimalField(
+        max_digits=8, decimal_places=2, blank=True, null=True
+    )
+    price_last_updated = models.DateField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["set_name", "card_number", "name_key"],
+                name="uniq_catalog_printing",
+            )
+        ]
+
+    def thumbnail_url(self, width: int) -> str:
+        stem, ext = self.image_mirror.rsplit(".", 1)
+        return reverse("card-image", args=[f"{stem}-{width}.{ext}"])
+
+    @property
+    def thumbnail_src(self) -> str:
+        return self.thumbnail_url(200)
+
+    @property
+    def thumbnail_srcset(self) -> str:
+        return ", ".join(f"{self.thumbnail_url(w)} {w}w" for w in THUMBNAIL_WIDTHS)
+
+    def __str__(self):
+        return f"{self.card_name} ({self.set_name} #{self.card_number})"
+
 
 class Card(models.Model):
     CONDITION_CHOICES = [
@@ -54,6 +118,53 @@ class Card(models.Model):
         max_digits=8, decimal_places=2, blank=True, null=True
     )
     price_last_updated = models.DateField(blank=True, null=True)
+    # Shared upstream data for this printing, value/image above are copies of it
+    catalog = models.ForeignKey(
+        CatalogCard,
+        on_delete=models.SET_NULL,
+        related_name="cards",
+        blank=True,
+        null=True,
+    )
+    # Bulk writers set this themselves, bulk_update() skips auto_now
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # One per CardListView sort, matching sorted_cards() column for column
+            models.Index(
+                F("user"),
+                OrderBy(PRICE_SORT_DESC, descending=True),
+                F("card_name"),
+                F("id"),
+                name="card_user_value_desc_idx",
+            ),
+            models.Index(
+                F("user"),
+                PRICE_SORT_ASC,
+                F("card_name"),
+                F("id"),
+                name="card_user_value_asc_idx",
+            ),
+            models.Index(
+                fields=["user", "set_name", "card_number", "id"],
+                name="card_user_set_asc_idx",
+            ),
+            models.Index(
+                fields=["user", "-set_name", "card_number", "id"],
+                name="card_user_set_desc_idx",
+            ),
+            # Card.clean's iexact duplicate check compares UPPER(name/set)
+            models.Index(
+                F("user"),
+                Upper("card_name"),
+                Upper("set_name"),
+                F("card_number"),
+                name="card_user_dup_check_idx",
+            ),
+            # Max(updated_at) per vault for the HTTP cache watermark
+            models.Index(fields=["user", "updated_at"], name="card_user_updated_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         self.card_name = self.card_name.strip()
@@ -100,3 +211,126 @@ class PriceSnapshot(models.Model):
 
     def __str__(self):
         return f"{self.card.card_name} - ${self.price} on {self.as_of_date}"
+
+
+class PriceRefreshJob(models.Model):
+    """
+    A queued price refresh for one user, processed by the
+    process_price_refresh_jobs management command.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+    ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="price_refresh_jobs"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    cards_total = models.PositiveIntegerField(default=0)
+    cards_done = models.PositiveIntegerField(default=0)
+    cards_failed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    # Bumped with every progress report, a running job that stops beating
+    # was orphaned by its worker
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+        # Repeated clicks on "Refresh prices" collapse into the one active job
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="uniq_active_refresh_job_per_user",
+            )
+        ]
+
+    def __str__(self):
+        return f"Price refresh for {self.user} ({self.status})"
+
+
+class PriceSweepCheckpoint(models.Model):
+    """
+    Progress of the nightly refresh_all_prices sweep for one day, so an
+    interrupted sweep resumes after the last price group it finished.
+    """
+
+    as_of_date = models.DateField(unique=True)
+    last_key = models.CharField(max_length=200, blank=True, default="")
+    distinct_keys = models.PositiveIntegerField(default=0)
+    upstream_calls = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Price sweep {self.as_of_date} (last key: {self.last_key or '-'})"
+
+
+class UpstreamSetIndex(models.Model):
+    """
+    A locally stored, per-set lookup table built from an upstream API listing,
+    so hot-path lookups are dictionary reads instead of network calls.
+    """
+
+    TCGDEX = "tcgdex"
+    PRICETRACKER = "pricetracker"
+    SOURCE_CHOICES = [
+        (TCGDEX, "TCGdex"),
+        (PRICETRACKER, "Pokémon Price Tracker"),
+    ]
+
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    set_code = models.CharField(max_length=30)
+    entries = models.JSONField(default=dict)
+    entry_count = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "set_code"], name="uniq_upstream_set_index"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.source} index for {self.set_code} ({self.entry_count} entries)"
+
+
+class CollectionValueRollup(models.Model):
+    """
+    Sum of a user's price snapshots for one day, kept in step with snapshot
+    writes so the value chart reads one row per day.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="value_rollups"
+    )
+    as_of_date = models.DateField()
+    total_value = models.DecimalField(max_digits=14, decimal_places=2)
+    card_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "as_of_date"], name="uniq_rollup_per_user_day"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.as_of_date}: {self.total_value}"
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` calls per second with bursts up to `capacity`.
+
+    State lives in the process by default. With shared=True it is kept in the
+    Django cache (use the database cache backend for a cross-process budget),
+    guarded by a short cache lock.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: int, shared: bool = False):
+        self.name = name
+        self.rate = max(rate, 0.001)
+        self.capacity = max(1, capacity)
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._tokens = float(self.capacity)
+        self._updated = time.time()
+        self._blocked_until = 0.0
+        self.throttle_wait_seconds = 0.0
+        self.throttled_calls = 0
+
+    # ---- state, local or shared through the cache
+
+    def _state_key(self) -> str:
+        return f"vault:ratelimit:{self.name}"
+
+    def _load(self):
+        if not self.shared:
+            return
+        state = cache.get(self._state_key())
+        if state:
+            self._tokens = state["tokens"]
+            self._updated = state["updated"]
+            self._blocked_until = state["blocked_until"]
+
+    def _save(self):
+        if not self.shared:
+            return
+        cache.set(
+            self._state_key(),
+            {
+                "tokens": self._tokens,
+                "updated": self._updated,
+                "blocked_until": self._blocked_until,
+            },
+            timeout=None,
+        )
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            lock_key = self._state_key() + ":lock"
+            have_shared_lock = False
+            if self.shared:
+                # Best effort cross-process lock, give up after ~1s
+                for _ in range(100):
+                    if cache.add(lock_key, uuid.uuid4().hex, timeout=2):
+                        have_shared_lock = True
+                        break
+                    time.sleep(0.01)
+            self._load()
+            try:
+                yield
+            finally:
+                self._save()
+                if have_shared_lock:
+                    cache.delete(lock_key)
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    # ---- public api
+
+    def _take(self) -> float:
+        # Take a token if one is free, otherwise return how long to wait
+        with self._locked():
+            now = time.time()
+            self._refill(now)
+            if self._blocked_until > now:
+                return self._blocked_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def _count_wait(self, waited: float):
+        if waited:
+            with self._lock:
+                self.throttled_calls += 1
+                self.throttle_wait_seconds += waited
+
+    def _gives_up(self, waited: float, wait: float, max_wait: float | None) -> bool:
+        if max_wait is not None and waited + wait > max_wait:
+            logger.warning(
+                "Rate limiter %s would wait %.1fs, giving up", self.name, wait
+            )
+            return True
+        return False
+
+    def acquire(self, max_wait: float | None = None) -> bool:
+        """
+        Take one token, sleeping until one is available or the bucket is
+        unblocked. Returns False if that would take longer than max_wait.
+        """
+        waited = 0.0
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                self._count_wait(waited)
+                return True
+            if self._gives_up(waited, wait, max_wait):
+                return False
+            time.sleep(wait)
+            waited += wait
+
+    async def aacquire(self, max_wait: float | None = None) -> bool:
+        """
+        acquire() for asyncio callers, waits on the event loop instead of
+        blocking it. A shared bucket's cache round trip runs off the loop.
+        """
+        waited = 0.0
+        while True:
+            wait = await sync_to_async(self._take)() if self.shared else self._take()
+            if wait <= 0:
+                self._count_wait(waited)
+                return True
+            if self._gives_up(waited, wait, max_wait):
+                return False
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def block_for(self, seconds: float):
+        """
+        Pause every caller for `seconds`, ie when the API answers Retry-After.
+        """
+        with self._locked():
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+            self._tokens = 0.0
+
+    def metrics(self) -> dict:
+        with self._locked():
+            now = time.time()
+            self._refill(now)
+            return {
+                "name": self.name,
+                "rate_per_second": self.rate,
+                "capacity": self.capacity,
+                "tokens_available": round(self._tokens, 2),
+                "blocked_for_seconds": round(max(0.0, self._blocked_until - now), 2),
+                "throttled_calls": self.throttled_calls,
+                "throttle_wait_seconds": round(self.throttle_wait_seconds, 2),
+                "shared": self.shared,
+            }
+
+
+_price_limiter = None
+_price_limiter_lock = threading.Lock()
+
+
+def get_price_limiter() -> TokenBucket:
+    global _price_limiter
+    with _price_limiter_lock:
+        if _price_limiter is None:
+            _price_limiter = TokenBucket(
+                "pricetracker",
+                rate=getattr(settings, "PRICE_API_RATE_PER_SECOND", 2.0),
+                capacity=getattr(settings, "PRICE_API_BURST", 5),
+                shared=getattr(settings, "PRICE_API_SHARED_LIMITER", False),
+            )
+        return _price_limiter
+
+
+def reset_price_limiter():
+    global _price_limiter
+    with _price_limiter_lock:
+        _price_limiter = None
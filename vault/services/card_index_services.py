@@ -0,0 +1,167 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from vault.constants import IMAGE_SET_MAP
+from vault.models import UpstreamSetIndex
+from vault.utils import _pad_card_number_for_image, fetch_set_cards
+
+logger = logging.getLogger(__name__)
+
+# In-process copy of stored indexes, {(source, set_code): (loaded_at, entries)}
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def _name_number_key(card_name: str, number: str) -> str:
+    return f"{card_name.strip().lower()}|{_pad_card_number_for_image(number)}"
+
+
+def build_set_index(cards: list) -> dict:
+    """
+    Turn a TCGdex set listing into lookup tables keyed by normalized card id
+    and by normalized name + number.
+    """
+    by_id = {}
+    by_name_number = {}
+    for card in cards:
+        card_id = (card.get("id") or "").lower()
+        if not card_id:
+            continue
+        by_id[card_id] = {
+            "id": card.get("id"),
+            "name": card.get("name"),
+            "image": card.get("image"),
+        }
+        number = card.get("localId") or card_id.rsplit("-", 1)[-1]
+        by_name_number[_name_number_key(card.get("name") or "", number)] = card_id
+    return {"by_id": by_id, "by_name_number": by_name_number}
+
+
+def sync_set_index(set_code: str) -> UpstreamSetIndex | None:
+    """
+    Fetch one set listing and store its index. Returns None if TCGdex failed,
+    leaving any previous index in place.
+    """
+    cards = fetch_set_cards(set_code)
+    if isinstance(cards, dict):
+        return None
+    entries = build_set_index(cards)
+    index, _ = UpstreamSetIndex.objects.update_or_create(
+        source=UpstreamSetIndex.TCGDEX,
+        set_code=set_code,
+        defaults={
+            "entries": entries,
+            "entry_count": len(entries["by_id"]),
+            "refreshed_at": timezone.now(),
+        },
+    )
+    forget_set_index(UpstreamSetIndex.TCGDEX, set_code)
+    return index
+
+
+def sync_card_index(set_codes=None, force: bool = False) -> dict:
+    """
+    Refresh the stored index for each set that is missing or older than
+    TCGDEX_INDEX_MAX_AGE_SECONDS, every mapped set by default.
+    """
+    if set_codes is None:
+        set_codes = sorted(set(IMAGE_SET_MAP.values()))
+    max_age = getattr(settings, "TCGDEX_INDEX_MAX_AGE_SECONDS", 7 * 24 * 60 * 60)
+    fresh = set()
+    if not force:
+        fresh = set(
+            UpstreamSetIndex.objects.filter(
+                source=UpstreamSetIndex.TCGDEX,
+                set_code__in=set_codes,
+                refreshed_at__gte=timezone.now() - timedelta(seconds=max_age),
+            ).values_list("set_code", flat=True)
+        )
+
+    summary = {"refreshed": 0, "skipped": 0, "failed": 0}
+    for set_code in set_codes:
+        if set_code in fresh:
+            summary["skipped"] += 1
+        elif sync_set_index(set_code) is None:
+            summary["failed"] += 1
+        else:
+            summary["refreshed"] += 1
+    logger.info("Card index sync: %s", summary)
+    return summary
+
+
+def load_set_index(source: str, set_code: str) -> dict | None:
+    """
+    Stored tables for a set, read from the database at most once per
+    TCGDEX_INDEX_MEMO_SECONDS. None means the set has not been indexed.
+    """
+    ttl = getattr(settings, "TCGDEX_INDEX_MEMO_SECONDS", 300)
+    now = time.monotonic()
+    with _memo_lock:
+        memo = _memo.get((source, set_code))
+    if memo and now - memo[0] < ttl:
+        return memo[1]
+
+    entries = (
+        UpstreamSetIndex.objects.filter(source=source, set_code=set_code)
+        .values_list("entries", flat=True)
+        .first()
+    )
+    remember_set_index(source, set_code, entries)
+    return entries
+
+
+def remember_set_index(source: str, set_code: str, entries: dict | None):
+    with _memo_lock:
+        _memo[(source, set_code)] = (time.monotonic(), entries)
+
+
+def forget_set_index(source: str, set_code: str):
+    with _memo_lock:
+        _memo.pop((source, set_code), None)
+
+
+def warm_card_index(set_names):
+    # Load indexes up front so worker threads only read the memo
+    for set_name in set(set_names):
+        set_code = IMAGE_SET_MAP.get(set_name)
+        if set_code:
+            load_set_index(UpstreamSetIndex.TCGDEX, set_code)
+
+
+def clear_card_index_memo():
+    with _memo_lock:
+        _memo.clear()
+
+
+def lookup_indexed_card(card_name: str, set_name: str, card_number) -> dict | None:
+    """
+    Resolve a card from the local index, same shape as fetch_card_data.
+    Returns None when the set has no index so the caller can go live.
+    """
+    set_code = IMAGE_SET_MAP.get(set_name)
+    if not set_code:
+        return None
+    entries = load_set_index(UpstreamSetIndex.TCGDEX, set_code)
+    if entries is None:
+        return None
+
+    num3 = _pad_card_number_for_image(card_number)
+    card_id = entries["by_name_number"].get(_name_number_key(card_name, num3))
+    card = entries["by_id"].get(card_id)
+    if card is None:
+        # Same loose match as the live search, name contained in the card name
+        card = entries["by_id"].get(f"{set_code.lower()}-{num3}")
+        if card and card_name.strip().lower() not in (card["name"] or "").lower():
+            card = None
+    if not card or not card.get("image"):
+        return {"error": "No matching cards in index"}
+    return {
+        "name": card.get("name"),
+        "image_url": card["image"] + "/high.png",
+        "card_id": card.get("id"),
+    }
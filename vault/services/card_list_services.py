@@ -0,0 +1,90 @@
+import base64
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import F, Q
+
+from vault.models import PRICE_SORT_ASC, PRICE_SORT_DESC, Card
+
+DEFAULT_SORT = "value_desc"
+
+# (column, descending) per sort option, always ending in pk so every position
+# in the list is unique. Each one has a matching index on Card.
+SORT_KEYS = {
+    "value_desc": [("price_sort", True), ("card_name", False), ("pk", False)],
+    "value_asc": [("price_sort", False), ("card_name", False), ("pk", False)],
+    "set_asc": [("set_name", False), ("card_number", False), ("pk", False)],
+    "set_desc": [("set_name", True), ("card_number", False), ("pk", False)],
+}
+PRICE_SORTS = {"value_desc": PRICE_SORT_DESC, "value_asc": PRICE_SORT_ASC}
+
+
+def resolve_sort(sort: str | None) -> str:
+    return sort if sort in SORT_KEYS else DEFAULT_SORT
+
+
+def sorted_cards(user, sort: str | None):
+    sort = resolve_sort(sort)
+    # Catalog rows carry the mirrored thumbnails
+    qs = Card.objects.filter(user=user).select_related("catalog")
+    if sort in PRICE_SORTS:
+        qs = qs.annotate(price_sort=PRICE_SORTS[sort])
+    ordering = [
+        F(field).desc() if descending else F(field).asc()
+        for field, descending in SORT_KEYS[sort]
+    ]
+    return qs.order_by(*ordering)
+
+
+def encode_cursor(card, sort: str) -> str:
+    values = []
+    for field, _ in SORT_KEYS[resolve_sort(sort)]:
+        value = getattr(card, field)
+        values.append(str(value) if isinstance(value, Decimal) else value)
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    """
+    Values of the last row seen, raises ValueError for a malformed cursor.
+    """
+    sort = resolve_sort(sort)
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(SORT_KEYS[sort]):
+        raise ValueError("Invalid cursor")
+    if sort in PRICE_SORTS:
+        try:
+            values[0] = Decimal(values[0])
+        except (InvalidOperation, TypeError):
+            raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_page(queryset, sort: str, cursor: str | None, limit: int):
+    """
+    One page after `cursor` using a WHERE on the sort columns instead of an
+    OFFSET, so deep pages cost the same as the first. Returns (cards, next
+    cursor or None). `queryset` must come from sorted_cards(sort).
+    """
+    if cursor:
+        values = decode_cursor(cursor, sort)
+        keys = SORT_KEYS[resolve_sort(sort)]
+        # (a > x) or (a = x and b > y) or (a = x and b = y and pk > z) ...
+        condition = Q()
+        for i, (field, descending) in enumerate(keys):
+            step = Q(**{f"{field}__{'lt' if descending else 'gt'}": values[i]})
+            for j, (prior_field, _) in enumerate(keys[:i]):
+                step &= Q(**{prior_field: values[j]})
+            condition |= step
+        queryset = queryset.filter(condition)
+
+    cards = list(queryset[: limit + 1])
+    if len(cards) <= limit:
+        return cards, None
+    cards = cards[:limit]
+    return cards, encode_cursor(cards[-1], sort)
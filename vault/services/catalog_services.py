@@ -0,0 +1,104 @@
+import logging
+
+from django.utils import timezone
+
+from vault.models import CatalogCard, Card
+from vault.services.image_services import has_real_image, missing_image_q
+from vault.utils import _pad_card_number_for_image
+
+logger = logging.getLogger(__name__)
+
+
+def catalog_key(set_name: str, card_number: str | int, card_name: str) -> tuple:
+    """
+    (set, padded number, lowercased name), the identity of a printing
+    """
+    return (
+        set_name,
+        _pad_card_number_for_image(card_number),
+        card_name.strip().lower(),
+    )
+
+
+def get_or_create_catalog_card(*, card_name: str, set_name: str, card_number: str):
+    set_name, number, name_key = catalog_key(set_name, card_number, card_name)
+    entry, _ = CatalogCard.objects.get_or_create(
+        set_name=set_name,
+        card_number=number,
+        name_key=name_key,
+        defaults={"card_name": card_name.strip()},
+    )
+    return entry
+
+
+def ensure_catalog(cards) -> int:
+    """
+    Link every card without a catalog row to one, creating missing rows in bulk.
+    New rows are seeded from the cards' own price and image.
+    Returns the number of cards linked.
+    """
+    missing = [card for card in cards if card.catalog_id is None]
+    if not missing:
+        return 0
+
+    seeds = {}
+    for card in missing:
+        key = catalog_key(card.set_name, card.card_number, card.card_name)
+        seed = seeds.setdefault(
+            key,
+            CatalogCard(
+                set_name=key[0],
+                card_number=key[1],
+                name_key=key[2],
+                card_name=card.card_name.strip(),
+            ),
+        )
+        if has_real_image(card.image_url) and not seed.image_url:
+            seed.image_url = card.image_url
+        if card.price_last_updated and (
+            seed.price_last_updated is None
+            or card.price_last_updated > seed.price_last_updated
+        ):
+            seed.value_usd = card.value_usd
+            seed.price_last_updated = card.price_last_updated
+
+    # Rows another vault already created are left alone
+    CatalogCard.objects.bulk_create(seeds.values(), ignore_conflicts=True)
+
+    entries = {
+        (e.set_name, e.card_number, e.name_key): e
+        for e in CatalogCard.objects.filter(
+            set_name__in={key[0] for key in seeds},
+            name_key__in={key[2] for key in seeds},
+        )
+    }
+    for card in missing:
+        card.catalog = entries[
+            catalog_key(card.set_name, card.card_number, card.card_name)
+        ]
+    Card.objects.bulk_update(missing, ["catalog"])
+    return len(missing)
+
+
+def ensure_catalog_for_all_cards(chunk_size: int = 1000) -> int:
+    linked = 0
+    cards = Card.objects.filter(catalog__isnull=True).order_by("id")
+    while True:
+        # Linked cards drop out of the filter, so always take the first chunk
+        chunk = list(cards[:chunk_size])
+        if not chunk:
+            return linked
+        linked += ensure_catalog(chunk)
+
+
+def fan_out_catalog_image(entry) -> int:
+    """
+    Copy a catalog row's image onto every linked card still missing one.
+    """
+    if not has_real_image(entry.image_url):
+        return 0
+    return (
+        Card.objects.filter(catalog=entry)
+        .filter(missing_image_q())
+        .update(image_url=entry.image_url, updated_at=timezone.now())
+    )
@@ -0,0 +1,113 @@
+import csv
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+
+from vault.models import Card, PriceSnapshot
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+# Leading columns match the import format so an export can be re-imported
+CARD_FIELDS = [
+    "card_name",
+    "set_name",
+    "card_number",
+    "condition",
+    "language",
+    "value_usd",
+    "price_last_updated",
+]
+CARD_EXPORT_FIELDS = CARD_FIELDS + ["latest_snapshot_price", "latest_snapshot_date"]
+HISTORY_EXPORT_FIELDS = CARD_FIELDS[:5] + ["as_of_date", "price", "currency"]
+
+
+def _chunk_size() -> int:
+    return max(1, getattr(settings, "EXPORT_CHUNK_SIZE", 2000))
+
+
+def iter_card_rows(user):
+    """
+    Every card in the vault with its latest snapshot, streamed from the
+    database in chunks rather than loaded at once.
+    """
+    latest = PriceSnapshot.objects.filter(card=OuterRef("pk")).order_by("-as_of_date")
+    return (
+        Card.objects.filter(user=user)
+        .annotate(
+            latest_snapshot_price=Subquery(latest.values("price")[:1]),
+            latest_snapshot_date=Subquery(latest.values("as_of_date")[:1]),
+        )
+        .order_by("set_name", "card_number", "card_name")
+        .values(*CARD_EXPORT_FIELDS)
+        .iterator(chunk_size=_chunk_size())
+    )
+
+
+def iter_history_rows(user, start=None, end=None):
+    """
+    One row per price snapshot in [start, end] for the user's cards.
+    """
+    qs = PriceSnapshot.objects.filter(card__user=user)
+    if start is not None:
+        qs = qs.filter(as_of_date__gte=start)
+    if end is not None:
+        qs = qs.filter(as_of_date__lte=end)
+    return (
+        qs.order_by("card__set_name", "card__card_number", "card_id", "as_of_date")
+        .values(
+            *(f"card__{field}" for field in CARD_FIELDS[:5]),
+            "as_of_date",
+            "price",
+            "currency",
+        )
+        .iterator(chunk_size=_chunk_size())
+    )
+
+
+def _history_row(row: dict) -> dict:
+    return {field.removeprefix("card__"): value for field, value in row.items()}
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, Decimal):
+        # Subquery prices come back unquantized on some backends
+        return f"{value:.2f}"
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+class _Echo:
+    # csv.writer target that hands each formatted line straight back
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_cell(row[field]) for field in fields])
+
+
+def stream_jsonl(rows, fields):
+    for row in rows:
+        yield json.dumps({field: _cell(row[field]) or None for field in fields}) + "\n"
+
+
+def stream_export(user, fmt: str, start=None, end=None, history: bool = False):
+    """
+    Lines of the export in `fmt`: the vault itself, or snapshot history when
+    `history` is set. Nothing is buffered beyond one database chunk.
+    """
+    if history:
+        rows = map(_history_row, iter_history_rows(user, start, end))
+        fields = HISTORY_EXPORT_FIELDS
+    else:
+        rows = iter_card_rows(user)
+        fields = CARD_EXPORT_FIELDS
+    if fmt == "csv":
+        return stream_csv(rows, fields)
+    return stream_jsonl(rows, fields)
@@ -0,0 +1,78 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from vault.models import Card
+
+
+def collection_watermark(user) -> dict:
+    """
+    Card count and latest card write for a vault, one aggregate on
+    card_user_updated_idx. Price refreshes, snapshots written with a new
+    card, edits and deletes all move one or the other.
+    """
+    return Card.objects.filter(user=user).aggregate(
+        cards=Count("pk"), modified=Max("updated_at")
+    )
+
+
+def _request_watermark(request) -> dict:
+    # condition() asks for the ETag and Last-Modified separately
+    if not hasattr(request, "_collection_watermark"):
+        request._collection_watermark = collection_watermark(request.user)
+    return request._collection_watermark
+
+
+def collection_etag(request, *args, **kwargs) -> str:
+    mark = _request_watermark(request)
+    # The date is part of it because series run through today
+    raw = "|".join(
+        [
+            str(request.user.pk),
+            str(mark["cards"]),
+            mark["modified"].isoformat() if mark["modified"] else "",
+            timezone.localdate().isoformat(),
+            request.path,
+            request.GET.urlencode(),
+        ]
+    )
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def collection_last_modified(request, *args, **kwargs):
+    # Advisory only: a delete can lower it, the ETag is what catches that
+    return _request_watermark(request)["modified"]
+
+
+def cached_collection_response(view):
+    """
+    Conditional GET plus a server-side copy of the response, both keyed on
+    the vault's watermark: an unchanged vault gets a 304, or its stored body,
+    for the cost of the watermark query. Any write changes the key, so
+    nothing needs deleting when prices refresh or cards come and go.
+    """
+
+    @condition(etag_func=collection_etag, last_modified_func=collection_last_modified)
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = f"collection-response:{collection_etag(request)}"
+        body = cache.get(key)
+        if body is not None:
+            response = HttpResponse(body, content_type="application/json")
+        else:
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                ttl = getattr(settings, "COLLECTION_RESPONSE_CACHE_SECONDS", 3600)
+                cache.set(key, response.content, ttl)
+        # Browsers keep it but check back each time
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    return wrapper
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from vault.models import CatalogCard
+from vault.services.card_index_services import warm_card_index
+from vault.services.catalog_services import fan_out_catalog_image
+from vault.services.image_services import (
+    alookup_card_image,
+    has_real_image,
+    lookup_card_image,
+    missing_image_q,
+)
+from vault.utils import async_http_client
+
+logger = logging.getLogger(__name__)
+
+
+def image_retry_delay(attempts: int) -> timedelta:
+    """
+    Wait before looking a missing image up again: IMAGE_HEAL_BASE_SECONDS
+    doubling per failed attempt, capped at IMAGE_HEAL_MAX_SECONDS.
+    """
+    base = getattr(settings, "IMAGE_HEAL_BASE_SECONDS", 60 * 60)
+    cap = getattr(settings, "IMAGE_HEAL_MAX_SECONDS", 30 * 24 * 60 * 60)
+    return timedelta(seconds=min(base * 2 ** max(0, attempts - 1), cap))
+
+
+def record_image_result(entry, data: dict) -> str:
+    """
+    Store a lookup_card_image result on the printing and return its summary
+    key. A hit records the image and TCGdex id, clears the backoff and heals
+    every linked card. A miss is remembered and pushes the next attempt back.
+    A failed lookup (TCGdex down, timed out, circuit open) says nothing about
+    the printing: it is retried after IMAGE_HEAL_ERROR_RETRY_SECONDS without
+    counting as an attempt.
+    """
+    image_url = data.get("image_url")
+    if has_real_image(image_url):
+        entry.image_url = image_url
+        entry.tcgdex_id = data.get("card_id") or entry.tcgdex_id
+        entry.image_attempts = 0
+        entry.image_next_attempt_at = None
+        entry.save(
+            update_fields=[
+                "image_url",
+                "tcgdex_id",
+                "image_attempts",
+                "image_next_attempt_at",
+            ]
+        )
+        # Heals the printing for every vault, not just the one that asked
+        fan_out_catalog_image(entry)
+        return "healed"
+
+    if "status" in data:
+        retry = getattr(settings, "IMAGE_HEAL_ERROR_RETRY_SECONDS", 5 * 60)
+        entry.image_next_attempt_at = timezone.now() + timedelta(seconds=retry)
+        entry.save(update_fields=["image_next_attempt_at"])
+        return "errors"
+
+    entry.image_attempts += 1
+    entry.image_next_attempt_at = timezone.now() + image_retry_delay(
+        entry.image_attempts
+    )
+    entry.save(update_fields=["image_attempts", "image_next_attempt_at"])
+    return "missed"
+
+
+def entries_due_for_heal(entries=None):
+    """
+    Printings held by some vault, still without a real image, whose retry
+    time has come.
+    """
+    if entries is None:
+        entries = CatalogCard.objects.all()
+    return (
+        entries.filter(missing_image_q(), cards__isnull=False)
+        .filter(
+            Q(image_next_attempt_at__isnull=True)
+            | Q(image_next_attempt_at__lte=timezone.now())
+        )
+        .distinct()
+        .order_by("image_attempts", "pk")
+    )
+
+
+def heal_new_images() -> dict:
+    """
+    Heal printings that have never been looked up, such as ones just added
+    from the create form. Cheap enough for the worker to run on every poll.
+    """
+    return heal_catalog_images(CatalogCard.objects.filter(image_attempts=0))
+
+
+def heal_catalog_images(entries=None, limit: int | None = None) -> dict:
+    """
+    One batched healing pass, separate from price refreshes. Lookups run on
+    their own pool of IMAGE_HEAL_MAX_WORKERS threads, results are written on
+    the calling thread. Returns {healed, missed, errors}.
+    """
+    limit = limit or getattr(settings, "IMAGE_HEAL_BATCH_SIZE", 200)
+    due = list(entries_due_for_heal(entries)[:limit])
+    summary = {"healed": 0, "missed": 0, "errors": 0}
+    if not due:
+        return summary
+
+    # Sets in the local index resolve without a search call
+    warm_card_index(entry.set_name for entry in due)
+
+    max_workers = max(1, getattr(settings, "IMAGE_HEAL_MAX_WORKERS", 2))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(
+                lookup_card_image,
+                card_name=entry.card_name,
+                set_name=entry.set_name,
+                card_number=entry.card_number,
+            ): entry
+            for entry in due
+        }
+        for future in as_completed(futures):
+            _record_into(summary, futures[future], future.result())
+
+    _log_summary(summary)
+    return summary
+
+
+async def aheal_catalog_images(entries=None, limit: int | None = None) -> dict:
+    """
+    heal_catalog_images on the event loop: every lookup goes out over the
+    async TCGdex client, up to settings.ASYNC_REFRESH_MAX_IN_FLIGHT at once,
+    and the results are recorded in one sync_to_async batch.
+    """
+    limit = limit or getattr(settings, "IMAGE_HEAL_BATCH_SIZE", 200)
+
+    def load_due():
+        due = list(entries_due_for_heal(entries)[:limit])
+        warm_card_index(entry.set_name for entry in due)
+        return due
+
+    due = await sync_to_async(load_due)()
+    summary = {"healed": 0, "missed": 0, "errors": 0}
+    if not due:
+        return summary
+
+    bound = asyncio.Semaphore(
+        max(1, getattr(settings, "ASYNC_REFRESH_MAX_IN_FLIGHT", 100))
+    )
+    async with async_http_client() as client:
+
+        async def lookup(entry):
+            async with bound:
+                return await alookup_card_image(
+                    client,
+                    card_name=entry.card_name,
+                    set_name=entry.set_name,
+                    card_number=entry.card_number,
+                )
+
+        results = await asyncio.gather(*(lookup(entry) for entry in due))
+
+    def record_all():
+        for entry, data in zip(due, results):
+            _record_into(summary, entry, data)
+
+    await sync_to_async(record_all)()
+    _log_summary(summary)
+    return summary
+
+
+def _record_into(summary: dict, entry, data: dict):
+    try:
+        outcome = record_image_result(entry, data)
+    except Exception:
+        logger.exception("Image heal failed for catalog card %s", entry.pk)
+        return
+    summary[outcome] += 1
+
+
+def _log_summary(summary: dict):
+    logger.info(
+        "Image heal pass: %d healed, %d still missing, %d lookup errors",
+        summary["healed"],
+        summary["missed"],
+        summary["errors"],
+    )
@@ -1,26 +1,84 @@
 import logging
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from vault.utils import fetch_card_data
+from django.db.models import Q
+from vault.services.card_index_services import lookup_indexed_card
+from vault.utils import afetch_card_data, fetch_card_data
 
 logger = logging.getLogger(__name__)
 
 
-def get_card_image_url_or_placeholder(
-    *, card_name: str, set_name: str, card_number: str
-) -> str:
+def has_real_image(image_url: str | None) -> bool:
+    return bool(image_url) and image_url != settings.CARD_IMAGE_PLACEHOLDER_URL
+
+
+def missing_image_q() -> Q:
+    # Cards still showing nothing or the placeholder
+    return (
+        Q(image_url__isnull=True)
+        | Q(image_url="")
+        | Q(image_url=settings.CARD_IMAGE_PLACEHOLDER_URL)
+    )
 
+
+def lookup_card_image(*, card_name: str, set_name: str, card_number: str) -> dict:
+    """
+    TCGdex data for a printing, {"image_url", "card_id", ...} on a match and
+    {"error": ...} otherwise, with a "status" when the lookup failed rather
+    than found nothing. The local index is tried before the live API.
+    """
     try:
-        data = fetch_card_data(card_name, set_name, card_number)
-        image_url = (data or {}).get("image_url")
-        if image_url:
-            return image_url
+        # Sets in the local index resolve without a network call
+        data = lookup_indexed_card(card_name, set_name, card_number)
+        if data is None:
+            data = fetch_card_data(card_name, set_name, card_number)
+    except Exception as e:
+        logger.exception(
+            "Image fetch failed for %s | %s | #%s", card_name, set_name, card_number
+        )
+        return {"error": str(e), "status": 500}
+    return data or {"error": "No data received from TCGdex"}
 
-        logger.warning(
-            "Image missing from API for %s | %s | #%s", card_name, set_name, card_number
+
+async def alookup_card_image(
+    client, *, card_name: str, set_name: str, card_number: str
+) -> dict:
+    """
+    lookup_card_image over the async TCGdex client (see async_http_client).
+    """
+    try:
+        data = await sync_to_async(lookup_indexed_card)(
+            card_name, set_name, card_number
         )
-    except Exception:
+        if data is None:
+            data = await afetch_card_data(client, card_name, set_name, card_number)
+    except Exception as e:
         logger.exception(
             "Image fetch failed for %s | %s | #%s", card_name, set_name, card_number
         )
+        return {"error": str(e), "status": 500}
+    return data or {"error": "No data received from TCGdex"}
+
 
+def get_card_image_url_or_placeholder(
+    *, card_name: str, set_name: str, card_number: str
+) -> str:
+    data = lookup_card_image(
+        card_name=card_name, set_name=set_name, card_number=card_number
+    )
+    if data.get("image_url"):
+        return data["image_url"]
+
+    logger.warning(
+        "Image missing from API for %s | %s | #%s", card_name, set_name, card_number
+    )
     return settings.CARD_IMAGE_PLACEHOLDER_URL
+
+
+def lookup_indexed_image(*, card_name: str, set_name: str, card_number: str) -> dict:
+    """
+    lookup_card_image against the local card index only, never a network
+    call. {"error": ...} when the set isn't indexed or the card isn't in it.
+    """
+    data = lookup_indexed_card(card_name, set_name, card_number)
+    return data or {"error": "Set not in the local index"}
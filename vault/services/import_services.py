@@ -0,0 +1,237 @@
+import csv
+import io
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from vault.constants import SETS
+from vault.models import Card, PriceSnapshot
+from vault.services.catalog_services import ensure_catalog
+from vault.services.image_services import has_real_image
+from vault.services.job_services import enqueue_price_refresh
+from vault.services.rollup_services import refresh_collection_rollups
+from vault.utils import _pad_card_number_for_image
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "json", "jsonl")
+
+# Set names match case-insensitively, stored with their canonical spelling
+_SET_NAMES = {name.lower(): name for name in SETS}
+_CONDITIONS = {}
+for _code, _label in Card.CONDITION_CHOICES:
+    _CONDITIONS[_code.lower()] = _code
+    _CONDITIONS[_label.lower()] = _code
+_LANGUAGES = {}
+for _code, _label in Card.LANGUAGE_CHOICES:
+    _LANGUAGES[_code.lower()] = _code
+    _LANGUAGES[_label.lower()] = _code
+
+
+def guess_import_format(filename: str) -> str | None:
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if ext == "ndjson":
+        return "jsonl"
+    return ext if ext in IMPORT_FORMATS else None
+
+
+def iter_import_rows(stream, fmt: str):
+    """
+    Yield (row number, row, parse error) from a binary file object.
+    CSV and JSON Lines are read one line at a time; a JSON array has to be
+    parsed whole, so prefer JSON Lines for large collections.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(text), start=1):
+                yield number, row, None
+        elif fmt == "jsonl":
+            number = 0
+            for line in text:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    yield number, None, "Invalid JSON"
+                    continue
+                yield number, row, None
+        elif fmt == "json":
+            try:
+                rows = json.load(text)
+            except ValueError:
+                yield 0, None, "Invalid JSON"
+                return
+            if not isinstance(rows, list):
+                yield 0, None, "Expected a JSON array of cards"
+                return
+            for number, row in enumerate(rows, start=1):
+                yield number, row, None
+        else:
+            raise ValueError(f"Unsupported import format '{fmt}'")
+    finally:
+        # Leave the underlying upload/file open for its owner to close
+        text.detach()
+
+
+def clean_import_row(row) -> tuple[dict | None, str | None]:
+    """
+    Validate one imported row, returning (card fields, None) or (None, error).
+    """
+    if not isinstance(row, dict):
+        return None, "Expected an object with card fields"
+    row = {
+        str(k).strip().lower(): str(v).strip()
+        for k, v in row.items()
+        if k is not None and v is not None
+    }
+
+    card_name = row.get("card_name", "")
+    if not card_name:
+        return None, "card_name is required"
+    if len(card_name) > Card._meta.get_field("card_name").max_length:
+        return None, "card_name is too long"
+
+    set_name = _SET_NAMES.get(row.get("set_name", "").lower())
+    if not set_name:
+        return None, f"Unknown set '{row.get('set_name', '')}'"
+
+    card_number = row.get("card_number", "")
+    if not card_number.isdigit() or len(card_number) > 3:
+        return None, f"Invalid card_number '{card_number}'"
+
+    condition = _CONDITIONS.get((row.get("condition") or "NM").lower())
+    if not condition:
+        return None, f"Unknown condition '{row['condition']}'"
+    language = _LANGUAGES.get((row.get("language") or "EN").lower())
+    if not language:
+        return None, f"Unknown language '{row['language']}'"
+
+    return {
+        "card_name": card_name,
+        "set_name": set_name,
+        "card_number": card_number,
+        "condition": condition,
+        "language": language,
+    }, None
+
+
+def _vault_key(card_name: str, set_name: str, card_number) -> tuple:
+    # Same identity Card.clean checks, with numbers compared padded
+    return (
+        card_name.strip().lower(),
+        set_name.lower(),
+        _pad_card_number_for_image(card_number),
+    )
+
+
+def _copy_from_catalog(cards):
+    """
+    Printings other vaults already hold start with their image and last
+    price. A price from today also gets today's snapshot and rollup, as the
+    create form does, since the queued refresh skips cards already current.
+    """
+    today = timezone.localdate()
+    updates = []
+    snapshots = []
+    for card in cards:
+        entry = card.catalog
+        if has_real_image(entry.image_url) or entry.value_usd is not None:
+            if has_real_image(entry.image_url):
+                card.image_url = entry.image_url
+            card.value_usd = entry.value_usd
+            card.price_last_updated = entry.price_last_updated
+            card.updated_at = timezone.now()
+            updates.append(card)
+            if card.value_usd is not None and card.price_last_updated == today:
+                snapshots.append(
+                    PriceSnapshot(
+                        card=card,
+                        as_of_date=today,
+                        price=card.value_usd,
+                        source="pokemonpricetracker",
+                        currency="USD",
+                    )
+                )
+    if not updates:
+        return
+
+    with transaction.atomic():
+        Card.objects.bulk_update(
+            updates, ["image_url", "value_usd", "price_last_updated", "updated_at"]
+        )
+        if snapshots:
+            PriceSnapshot.objects.bulk_create(snapshots)
+            refresh_collection_rollups({(card.user_id, today) for card in cards})
+
+
+def import_cards(
+    user, rows, chunk_size: int | None = None, enrich: bool = True
+) -> dict:
+    """
+    Add validated rows to the user's vault in chunks, skipping cards already
+    in the vault or earlier in the file. `rows` yields (row number, row,
+    parse error) as produced by iter_import_rows.
+
+    Nothing is looked up upstream per row: when `enrich` is set a price
+    refresh job is queued, which resolves prices and images in batches.
+    Returns counts plus a list of per-row errors.
+    """
+    chunk_size = max(1, chunk_size or getattr(settings, "IMPORT_CHUNK_SIZE", 500))
+    # One query for the whole vault instead of an exists() per row
+    seen = {
+        _vault_key(*key)
+        for key in Card.objects.filter(user=user).values_list(
+            Lower("card_name"), Lower("set_name"), "card_number"
+        )
+    }
+    summary = {"created": 0, "duplicates": 0, "errors": []}
+    pending = []
+
+    def flush():
+        if not pending:
+            return
+        created = Card.objects.bulk_create(pending)
+        ensure_catalog(created)
+        _copy_from_catalog(created)
+        summary["created"] += len(created)
+        pending.clear()
+
+    try:
+        for number, row, error in rows:
+            if not error:
+                fields, error = clean_import_row(row)
+            if error:
+                summary["errors"].append({"row": number, "error": error})
+                continue
+            key = _vault_key(
+                fields["card_name"], fields["set_name"], fields["card_number"]
+            )
+            if key in seen:
+                summary["duplicates"] += 1
+                continue
+            seen.add(key)
+            pending.append(Card(user=user, **fields))
+            if len(pending) >= chunk_size:
+                flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        logger.warning("Import for user %s stopped early: %s", user.pk, e)
+        summary["errors"].append({"row": None, "error": f"Unreadable file: {e}"})
+
+    flush()
+    if enrich and summary["created"]:
+        enqueue_price_refresh(user)
+    logger.info(
+        "Imported %d cards for user %s (%d duplicates, %d errors)",
+        summary["created"],
+        user.pk,
+        summary["duplicates"],
+        len(summary["errors"]),
+    )
+    return summary
@@ -0,0 +1,139 @@
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from vault.models import CatalogCard, PriceRefreshJob
+from vault.services.image_heal_services import (
+    aheal_catalog_images,
+    heal_catalog_images,
+)
+from vault.services.price_services import (
+    arefresh_prices_for_user,
+    refresh_prices_for_user,
+)
+from vault.services.thumbnail_services import mirror_catalog_images
+
+logger = logging.getLogger(__name__)
+
+
+def get_active_job(user):
+    return (
+        PriceRefreshJob.objects.filter(
+            user=user, status__in=PriceRefreshJob.ACTIVE_STATUSES
+        )
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def enqueue_price_refresh(user):
+    """
+    Queue a price refresh for the user, returning (job, created).
+    If the user already has a queued or running job that job is returned instead.
+    """
+    job = get_active_job(user)
+    if job:
+        return job, False
+
+    try:
+        with transaction.atomic():
+            return PriceRefreshJob.objects.create(user=user), True
+    except IntegrityError:
+        # Lost a race with a concurrent enqueue, the unique constraint kept one job
+        return get_active_job(user), False
+
+
+def claim_next_job():
+    """
+    Mark the oldest queued job as running and return it (None if the queue is empty).
+    Row locks with SKIP LOCKED let several workers poll the same table.
+    """
+    with transaction.atomic():
+        job = (
+            PriceRefreshJob.objects.select_for_update(skip_locked=True)
+            .filter(status=PriceRefreshJob.QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = PriceRefreshJob.RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=["status", "started_at", "heartbeat_at"])
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Put jobs left running by a crashed worker back in the queue: running
+    jobs with no heartbeat for PRICE_REFRESH_JOB_TIMEOUT_SECONDS. A long
+    refresh that is still reporting progress is left alone.
+    """
+    timeout = getattr(settings, "PRICE_REFRESH_JOB_TIMEOUT_SECONDS", 1800)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    return PriceRefreshJob.objects.filter(
+        status=PriceRefreshJob.RUNNING, heartbeat_at__lt=cutoff
+    ).update(status=PriceRefreshJob.QUEUED, started_at=None, heartbeat_at=None)
+
+
+def run_price_refresh_job(job) -> int:
+    """
+    Run one claimed job. With settings.PRICE_REFRESH_ASYNC the refresh and
+    the image heal run on an event loop over the async upstream clients
+    instead of thread pools.
+    """
+    use_async = getattr(settings, "PRICE_REFRESH_ASYNC", False)
+    refresh = (
+        async_to_sync(arefresh_prices_for_user)
+        if use_async
+        else refresh_prices_for_user
+    )
+    heal = async_to_sync(aheal_catalog_images) if use_async else heal_catalog_images
+
+    def report(done, total, failed):
+        job.cards_done = done
+        job.cards_total = total
+        job.cards_failed = failed
+        job.heartbeat_at = timezone.now()
+        job.save(
+            update_fields=["cards_done", "cards_total", "cards_failed", "heartbeat_at"]
+        )
+
+    try:
+        updated = refresh(job.user, progress=report)
+    except Exception as e:
+        logger.exception("Price refresh job %s failed", job.pk)
+        job.status = PriceRefreshJob.FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at"])
+        return 0
+
+    job.status = PriceRefreshJob.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at"])
+
+    # Images are healed and mirrored after the job reads as done, so the
+    # refresh itself never waits on image lookups
+    entries = CatalogCard.objects.filter(cards__user=job.user)
+    try:
+        heal(entries)
+        mirror_catalog_images(entries)
+    except Exception:
+        logger.exception("Image healing after job %s failed", job.pk)
+    return updated
+
+
+def process_next_job() -> bool:
+    """
+    Claim and run one queued job. Returns False when there was nothing to do.
+    """
+    job = claim_next_job()
+    if job is None:
+        return False
+    run_price_refresh_job(job)
+    return True
@@ -1,11 +1,24 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from asgiref.sync import sync_to_async
 from django.conf import settings
 import logging
+from django.db import transaction
 from django.utils import timezone
 from decimal import Decimal
 
-from vault.utils import fetch_card_price, extract_card_price
-from vault.models import Card, PriceSnapshot
-from vault.services.image_services import get_card_image_url_or_placeholder
+from vault.constants import PRICE_SET_MAP
+from vault.utils import (
+    afetch_card_price,
+    async_http_client,
+    extract_card_price,
+    fetch_card_price,
+)
+from vault.models import Card, CatalogCard, PriceSnapshot, PriceSweepCheckpoint
+from vault.services.catalog_services import ensure_catalog, ensure_catalog_for_all_cards
+from vault.services.rollup_services import refresh_collection_rollups
+from vault.services.price_table_services import PriceTableBuffer, lookup_table_price
+from vault.services.image_services import has_real_image
 
 logger = logging.getLogger(__name__)
 
@@ -24,74 +37,482 @@ def create_initial_snapshot(card):
             "currency": "USD",
         },
     )
+    refresh_collection_rollups([(card.user_id, today)])
     return True
 
 
-def refresh_prices_for_user(user) -> int:
-    today = timezone.localdate()
-    cards = Card.objects.filter(user=user)
+class PriceWriteBuffer:
+    """
+    Collects refreshed prices in memory and writes them in chunks: one
+    snapshot upsert on uniq_card_price_per_day plus one bulk update each for
+    cards and catalog rows per flush, instead of several queries per card.
+    The collection value rollups for the touched days are refreshed with it,
+    and price responses recorded since the last flush are merged into the
+    stored price tables once per set.
+    """
 
-    updated = 0
+    def __init__(self, chunk_size: int | None = None):
+        self.chunk_size = max(
+            1,
+            chunk_size or getattr(settings, "PRICE_REFRESH_WRITE_CHUNK_SIZE", 500),
+        )
+        self.snapshots = []
+        self.cards = []
+        self.catalog_entries = []
+        self.price_tables = PriceTableBuffer()
+        self.rows_written = 0
 
-    for card in cards:
-        # Attempt to heal any missing images (image api occasionally flaky)
-        if not card.image_url or card.image_url == settings.CARD_IMAGE_PLACEHOLDER_URL:
-            new_url = get_card_image_url_or_placeholder(
-                card_name=card.card_name,
-                set_name=card.set_name,
-                card_number=card.card_number,
+    def add(self, card, price: Decimal, as_of_date):
+        card.value_usd = price
+        card.price_last_updated = as_of_date
+        card.updated_at = timezone.now()
+        self.cards.append(card)
+        self.snapshots.append(
+            PriceSnapshot(
+                card=card,
+                as_of_date=as_of_date,
+                price=price,
+                source="pokemonpricetracker",
+                currency="USD",
             )
-            if (
-                new_url != settings.CARD_IMAGE_PLACEHOLDER_URL
-                and new_url != card.image_url
-            ):
-                card.image_url = new_url
-                card.save(update_fields=["image_url"])
-
-        # Look for current price on each card
-        if card.price_last_updated == today:
-            continue  # Skip if price is already current
-        data = fetch_card_price(card.card_name, card.set_name)
-        if "error" in data:
-            logger.warning(
-                "Fetch card price failed for %s %s #%s status=%s error=%s",
-                card.card_name,
-                card.set_name,
-                card.card_number,
-                data.get("status"),
-                data.get("error"),
+        )
+        if len(self.cards) >= self.chunk_size:
+            self.flush()
+
+    def add_catalog(self, entry, price: Decimal, as_of_date, tcgplayer_id: str = ""):
+        entry.value_usd = price
+        entry.price_last_updated = as_of_date
+        entry.tcgplayer_id = tcgplayer_id or entry.tcgplayer_id
+        self.catalog_entries.append(entry)
+
+    def record_payload(self, set_name: str, data: dict) -> dict:
+        # Indexed now for this refresh's lookups, stored with the next flush
+        return self.price_tables.add(set_name, data)
+
+    def flush(self):
+        if not (self.cards or self.catalog_entries or self.price_tables.pending):
+            return
+        with transaction.atomic():
+            self.price_tables.flush()
+            CatalogCard.objects.bulk_update(
+                self.catalog_entries,
+                ["value_usd", "price_last_updated", "tcgplayer_id"],
             )
-            continue
-        result = extract_card_price(data, card.card_number)
-
-        if "error" in result:
-            logger.warning(
-                "Price extract failed for %s %s #%s: %s",
-                card.card_name,
-                card.set_name,
-                card.card_number,
-                result["error"],
+            PriceSnapshot.objects.bulk_create(
+                self.snapshots,
+                update_conflicts=True,
+                unique_fields=["card", "as_of_date"],
+                update_fields=["price", "source", "currency"],
             )
-            continue
+            Card.objects.bulk_update(
+                self.cards, ["value_usd", "price_last_updated", "updated_at"]
+            )
+            refresh_collection_rollups(
+                {(snap.card.user_id, snap.as_of_date) for snap in self.snapshots}
+            )
+        self.rows_written += (
+            len(self.snapshots) + len(self.cards) + len(self.catalog_entries)
+        )
+        self.snapshots = []
+        self.cards = []
+        self.catalog_entries = []
+
+
+def _group_key(set_name: str, card_name: str):
+    # The price API is queried by set + name, so every printing sharing both can
+    # be resolved against a single response (card number is matched afterwards)
+    return (PRICE_SET_MAP.get(set_name), card_name.strip().lower())
+
+
+def _extract_price(table: dict, entry):
+    """
+    (price, TCGplayer id) for a printing from a group's table, or None.
+    """
+    result = extract_card_price(table, entry.card_number)
 
-        price = Decimal(str(result["price"]))
-
-        # Add new price to price history model
-        PriceSnapshot.objects.update_or_create(
-            card=card,
-            as_of_date=today,
-            defaults={
-                "price": price,
-                "source": "pokemonpricetracker",
-                "currency": "USD",
-            },
+    if "error" in result:
+        logger.warning(
+            "Price extract failed for %s %s #%s: %s",
+            entry.card_name,
+            entry.set_name,
+            entry.card_number,
+            result["error"],
         )
+        return None
+    return Decimal(str(result["price"])), result.get("tcgplayer_id", "")
 
-        # Save current price onto the card model
-        card.value_usd = price
-        card.price_last_updated = today
-        card.save(update_fields=["value_usd", "price_last_updated"])
 
-        updated += 1
+def _fetch_group(entries):
+    first = entries[0]
+    try:
+        data = fetch_card_price(first.card_name, first.set_name)
+    except Exception as e:
+        logger.exception(
+            "Price fetch raised for %s %s", first.card_name, first.set_name
+        )
+        data = {"error": str(e)}
+    return _checked_group_data(entries, data)
+
+
+async def _afetch_group(client, entries):
+    first = entries[0]
+    try:
+        data = await afetch_card_price(client, first.card_name, first.set_name)
+    except Exception as e:
+        logger.exception(
+            "Price fetch raised for %s %s", first.card_name, first.set_name
+        )
+        data = {"error": str(e)}
+    return _checked_group_data(entries, data)
+
+
+def _checked_group_data(entries, data):
+    # None tells the caller every printing in the group failed. A stale
+    # fallback (circuit open) would be written as today's price and keep the
+    # real one out until tomorrow, so it counts as a failure here.
+    if "error" in data or data.get("stale"):
+        first = entries[0]
+        logger.warning(
+            "Fetch card price failed for %s %s (%d printings) status=%s error=%s",
+            first.card_name,
+            first.set_name,
+            len(entries),
+            data.get("status"),
+            data.get("error", "only stale data"),
+        )
+        return None
+    return data
+
+
+def _table_price(entry) -> tuple | None:
+    hit = lookup_table_price(entry.set_name, entry.card_name, entry.card_number)
+    return (Decimal(str(hit["price"])), hit["tcgplayer_id"]) if hit else None
+
+
+def _record_group(writer, group, data):
+    # Parse the shared response once, every printing in the group reads the table
+    if data is None:
+        return None
+    first = next(iter(group.values()))[0]
+    return writer.record_payload(first.set_name, data)
+
+
+class _VaultRefresh:
+    """
+    State for one user's refresh: plan() reads the vault and decides which
+    lookups are needed, apply_group() records each lookup's result, and
+    finish() flushes the writes.
+    """
+
+    def __init__(self, user, progress=None):
+        self.user = user
+        self.progress = progress
+        self.today = timezone.localdate()
+        self.writer = PriceWriteBuffer()
+        self.updated = 0
+        self.reused = 0
+        self.failed = 0
+        self.done = 0
+        self.total = 0
+        self.pending = 0
+        # group key -> catalog id -> (catalog row, cards in this vault holding it)
+        self.groups = {}
+
+    def plan(self):
+        cards = list(Card.objects.filter(user=self.user).select_related("catalog"))
+        ensure_catalog(cards)
+        healed = []
+
+        for card in cards:
+            entry = card.catalog
+
+            # Copy an image the printing already has; looking up missing ones
+            # is the heal pass's job (image_heal_services), not the refresh's
+            if not has_real_image(card.image_url) and has_real_image(entry.image_url):
+                card.image_url = entry.image_url
+                card.updated_at = timezone.now()
+                healed.append(card)
+
+            # Look for current price on each card
+            if card.price_last_updated == self.today:
+                continue  # Skip if price is already current
+            if entry.price_last_updated == self.today and entry.value_usd is not None:
+                # Another vault already priced this printing today
+                self.writer.add(card, entry.value_usd, self.today)
+                self.updated += 1
+                self.reused += 1
+                continue
+            hit = _table_price(entry)
+            if hit is not None:
+                # Fresh in the local price table, no call needed
+                price, tcgplayer_id = hit
+                if entry.price_last_updated != self.today:
+                    self.writer.add_catalog(entry, price, self.today, tcgplayer_id)
+                self.writer.add(card, price, self.today)
+                self.updated += 1
+                self.reused += 1
+                continue
+            key = _group_key(entry.set_name, entry.card_name)
+            group = self.groups.setdefault(key, {})
+            group.setdefault(entry.pk, (entry, []))[1].append(card)
+
+        Card.objects.bulk_update(healed, ["image_url", "updated_at"])
+
+        # Cards already priced today count as done from the start
+        self.pending = sum(
+            len(c) for group in self.groups.values() for _, c in group.values()
+        )
+        self.total = len(cards)
+        self.done = self.total - self.pending
+        self._report()
+
+    def _report(self):
+        if self.progress:
+            self.progress(self.done, self.total, self.failed)
+
+    def group_entries(self, group) -> list:
+        return [entry for entry, _ in group.values()]
+
+    def apply_group(self, group, data):
+        table = _record_group(self.writer, group, data)
+        for entry, entry_cards in group.values():
+            hit = _extract_price(table, entry) if table is not None else None
+            if hit is None:
+                self.failed += len(entry_cards)
+            else:
+                price, tcgplayer_id = hit
+                self.writer.add_catalog(entry, price, self.today, tcgplayer_id)
+                for card in entry_cards:
+                    self.writer.add(card, price, self.today)
+                self.updated += len(entry_cards)
+            self.done += len(entry_cards)
+        self._report()
+
+    def finish(self, stats: dict | None = None) -> int:
+        self.writer.flush()
+
+        upstream_calls = len(self.groups)
+        calls_saved = self.pending + self.reused - upstream_calls
+        logger.info(
+            "Price refresh for user %s: %d upstream calls, %d saved by batching",
+            self.user.pk,
+            upstream_calls,
+            calls_saved,
+        )
+        if stats is not None:
+            stats["upstream_calls"] = upstream_calls
+            stats["calls_saved"] = calls_saved
+        return self.updated
+
+
+def refresh_prices_for_user(user, stats: dict | None = None, progress=None) -> int:
+    """
+    Refresh today's price for every card in the user's vault.
+
+    Prices are resolved on the shared catalog rows: a printing
+    another vault already priced today is copied without an upstream call,
+    and the rest are grouped by price set code and name so each group costs
+    one call. Calls are fanned out over a thread pool sized by
+    settings.PRICE_REFRESH_MAX_WORKERS. Database writes stay on the calling
+    thread and are flushed in chunks of settings.PRICE_REFRESH_WRITE_CHUNK_SIZE.
+    Images the catalog already has are copied, missing ones are left to
+    heal_catalog_images.
+    When a `stats` dict is passed it is filled with the number of upstream
+    calls made and the number saved by grouping and catalog reuse.
+
+    `progress`, if given, is called as progress(done, total, failed) with card
+    counts each time a price group finishes.
+    """
+    refresh = _VaultRefresh(user, progress=progress)
+    refresh.plan()
+
+    max_workers = max(1, getattr(settings, "PRICE_REFRESH_MAX_WORKERS", 4))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # One fetch per (set, name) group, every printing in it shares the response
+        price_futures = {
+            pool.submit(_fetch_group, refresh.group_entries(group)): group
+            for group in refresh.groups.values()
+        }
+
+        for future in as_completed(price_futures):
+            refresh.apply_group(price_futures[future], future.result())
+
+    return refresh.finish(stats)
+
+
+async def arefresh_prices_for_user(
+    user, stats: dict | None = None, progress=None
+) -> int:
+    """
+    asyncio variant of refresh_prices_for_user, same grouping, reuse and
+    results. Every price group is gathered on one event loop over the native
+    async client, up to settings.ASYNC_REFRESH_MAX_IN_FLIGHT lookups at once,
+    so in-flight calls cost no threads. ORM work runs through sync_to_async:
+    planning once, then results are applied in batches of
+    ASYNC_REFRESH_APPLY_BATCH_SIZE groups as they come back.
+    """
+    refresh = _VaultRefresh(user, progress=progress)
+    await sync_to_async(refresh.plan)()
+
+    bound = asyncio.Semaphore(
+        max(1, getattr(settings, "ASYNC_REFRESH_MAX_IN_FLIGHT", 100))
+    )
+    batch_size = max(1, getattr(settings, "ASYNC_REFRESH_APPLY_BATCH_SIZE", 25))
+
+    def apply_batch(results):
+        for group, data in results:
+            refresh.apply_group(group, data)
+
+    async with async_http_client() as client:
+
+        async def fetch(group):
+            async with bound:
+                return group, await _afetch_group(client, refresh.group_entries(group))
+
+        batch = []
+        for result in asyncio.as_completed(
+            [fetch(group) for group in refresh.groups.values()]
+        ):
+            batch.append(await result)
+            if len(batch) >= batch_size:
+                await sync_to_async(apply_batch)(batch)
+                batch = []
+        await sync_to_async(apply_batch)(batch)
+
+    return await sync_to_async(refresh.finish)(stats)
+
+
+def _sweep_key(set_name: str, card_name: str) -> str:
+    set_code, name = _group_key(set_name, card_name)
+    return f"{set_code or ''}|{name}"
+
+
+def refresh_all_prices(restart: bool = False, checkpoint_every: int = 25) -> dict:
+    """
+    Refresh every unpriced card across all vaults, fetching each distinct
+    catalog printing once and fanning the price out to every card holding it.
+
+    Progress is checkpointed every `checkpoint_every` price groups so an
+    interrupted sweep picks up where it stopped, unless `restart` is set.
+    Returns a summary of distinct keys, upstream calls and rows written.
+    """
+    today = timezone.localdate()
+    checkpoint, created = PriceSweepCheckpoint.objects.get_or_create(as_of_date=today)
+    resuming = not created and not restart and checkpoint.completed_at is None
+    if not resuming:
+        checkpoint.last_key = ""
+        checkpoint.upstream_calls = 0
+        checkpoint.rows_written = 0
+        checkpoint.completed_at = None
+
+    ensure_catalog_for_all_cards()
+    writer = PriceWriteBuffer()
+
+    # sweep key -> catalog id -> (catalog row, cards), skipping checkpointed groups
+    groups = {}
+    printings = set()
+    rows = (
+        Card.objects.exclude(price_last_updated=today)
+        .values_list(
+            "id",
+            "user_id",
+            "catalog_id",
+            "catalog__set_name",
+            "catalog__card_number",
+            "catalog__card_name",
+            "catalog__tcgplayer_id",
+            "catalog__value_usd",
+            "catalog__price_last_updated",
+        )
+        .order_by()
+        .iterator(chunk_size=2000)
+    )
+    for (
+        card_id,
+        user_id,
+        catalog_id,
+        set_name,
+        number,
+        name,
+        tcgplayer_id,
+        value,
+        priced_on,
+    ) in rows:
+        card = Card(pk=card_id, user_id=user_id)
+        printings.add((set_name, name, number))
+        if priced_on == today and value is not None:
+            # Printing already priced today by a user refresh, no call needed
+            writer.add(card, value, today)
+            continue
+        key = _sweep_key(set_name, name)
+        if resuming and key <= checkpoint.last_key:
+            continue
+        # tcgplayer_id is loaded so the catalog bulk update doesn't blank it
+        entry = CatalogCard(
+            pk=catalog_id,
+            set_name=set_name,
+            card_number=number,
+            card_name=name,
+            tcgplayer_id=tcgplayer_id,
+        )
+        hit = _table_price(entry)
+        if hit is not None:
+            # Fresh in the local price table, no call needed
+            price, found_id = hit
+            writer.add_catalog(entry, price, today, found_id)
+            writer.add(card, price, today)
+            continue
+        group = groups.setdefault(key, {})
+        group.setdefault(catalog_id, (entry, []))[1].append(card)
+
+    if not resuming:
+        checkpoint.distinct_keys = len(printings)
+    checkpoint.save()
+
+    keys = sorted(groups)
+    max_workers = max(1, getattr(settings, "PRICE_REFRESH_MAX_WORKERS", 4))
+
+    # Rows flushed since the last save, including chunk flushes inside add()
+    rows_at_last_checkpoint = 0
+
+    def save_checkpoint(last_key):
+        nonlocal rows_at_last_checkpoint
+        writer.flush()
+        checkpoint.rows_written += writer.rows_written - rows_at_last_checkpoint
+        rows_at_last_checkpoint = writer.rows_written
+        checkpoint.last_key = last_key
+        checkpoint.save()
+
+    since_checkpoint = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # map() fetches ahead concurrently but yields in key order, which keeps
+        # "everything up to last_key is done" true for the checkpoint
+        batches = [[entry for entry, _ in groups[key].values()] for key in keys]
+        for key, data in zip(keys, pool.map(_fetch_group, batches)):
+            checkpoint.upstream_calls += 1
+            table = _record_group(writer, groups[key], data)
+            for entry, cards in groups[key].values():
+                hit = _extract_price(table, entry) if table is not None else None
+                if hit is None:
+                    continue
+                price, found_id = hit
+                writer.add_catalog(entry, price, today, found_id)
+                for card in cards:
+                    writer.add(card, price, today)
+
+            since_checkpoint += 1
+            if since_checkpoint >= checkpoint_every:
+                save_checkpoint(key)
+                since_checkpoint = 0
+
+    save_checkpoint(keys[-1] if keys else checkpoint.last_key)
+    checkpoint.completed_at = timezone.now()
+    checkpoint.save(update_fields=["completed_at", "updated_at"])
 
-    return updated
+    return {
+        "distinct_keys": checkpoint.distinct_keys,
+        "upstream_calls": checkpoint.upstream_calls,
+        "rows_written": checkpoint.rows_written,
+        "resumed": resuming,
+    }
@@ -0,0 +1,113 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from vault.constants import PRICE_SET_MAP
+from vault.models import UpstreamSetIndex
+from vault.services.card_index_services import load_set_index, remember_set_index
+from vault.utils import _pad_card_number_for_image, index_price_payload, price_row_key
+
+logger = logging.getLogger(__name__)
+
+
+class PriceTableBuffer:
+    """
+    Collects price API responses and merges them into the stored per-set
+    tables on flush(), one locked read and write per set however many
+    responses came in for it.
+    """
+
+    def __init__(self):
+        # set code -> rows and by_number waiting to be merged
+        self.pending = {}
+
+    def add(self, set_name: str, data: dict) -> dict:
+        """
+        Index a response and queue its rows, stamped with when they were
+        fetched. Returns the response's own table for immediate lookups.
+        """
+        table = index_price_payload(data)
+        set_code = PRICE_SET_MAP.get(set_name)
+        # A stale fallback answers this request but mustn't look freshly fetched
+        if not set_code or not table["rows"] or data.get("stale"):
+            return table
+
+        fetched_at = time.time()
+        pending = self.pending.setdefault(set_code, {"rows": {}, "by_number": {}})
+        for key, row in table["rows"].items():
+            pending["rows"][key] = {**row, "fetched_at": fetched_at}
+        pending["by_number"].update(table["by_number"])
+        return table
+
+    def flush(self):
+        for set_code, table in self.pending.items():
+            _merge_price_table(set_code, table)
+        self.pending = {}
+
+
+def _merge_price_table(set_code: str, table: dict):
+    with transaction.atomic():
+        index, _ = UpstreamSetIndex.objects.select_for_update().get_or_create(
+            source=UpstreamSetIndex.PRICETRACKER,
+            set_code=set_code,
+            defaults={"refreshed_at": timezone.now()},
+        )
+        entries = index.entries or {}
+        rows = entries.setdefault("rows", {})
+        rows.update(table["rows"])
+        entries.setdefault("by_number", {}).update(table["by_number"])
+
+        index.entries = entries
+        index.entry_count = len(rows)
+        index.refreshed_at = timezone.now()
+        index.save(update_fields=["entries", "entry_count", "refreshed_at"])
+
+    remember_set_index(UpstreamSetIndex.PRICETRACKER, set_code, entries)
+
+
+def record_price_payload(set_name: str, data: dict) -> dict:
+    """
+    Index a single price API response and merge it into the stored table
+    for the set right away. Returns the response's own table.
+    """
+    tables = PriceTableBuffer()
+    table = tables.add(set_name, data)
+    tables.flush()
+    return table
+
+
+def lookup_table_price(set_name: str, card_name: str, card_number) -> dict | None:
+    """
+    Current price for a card from the stored table, without calling out or
+    parsing a response. None if the card is missing or its row is older than
+    PRICE_TABLE_MAX_AGE_SECONDS.
+    """
+    set_code = PRICE_SET_MAP.get(set_name)
+    if not set_code:
+        return None
+    entries = load_set_index(UpstreamSetIndex.PRICETRACKER, set_code)
+    if not entries:
+        return None
+
+    number = _pad_card_number_for_image(card_number)
+    name = card_name.strip().lower()
+    row = entries["rows"].get(price_row_key(name, number))
+    if row is None:
+        # Same loose name match the search endpoint would give
+        row = entries["rows"].get(entries["by_number"].get(number))
+        if row and name not in (row["name"] or "").lower():
+            row = None
+    if row is None:
+        return None
+
+    max_age = getattr(settings, "PRICE_TABLE_MAX_AGE_SECONDS", 6 * 60 * 60)
+    if time.time() - row["fetched_at"] > max_age:
+        return None
+    return {
+        "price": row["price"],
+        "price_date": row["price_date"],
+        "tcgplayer_id": row.get("tcgplayer_id", ""),
+    }
@@ -0,0 +1,105 @@
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from vault.models import CollectionValueRollup, PriceSnapshot
+
+logger = logging.getLogger(__name__)
+
+USER_CHUNK_SIZE = 500
+
+
+def _upsert(rows):
+    CollectionValueRollup.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["user", "as_of_date"],
+        update_fields=["total_value", "card_count"],
+    )
+
+
+def _daily_totals(snapshots):
+    return (
+        snapshots.values("card__user_id", "as_of_date")
+        .annotate(total=Sum("price"), cards=Count("id"))
+        .order_by()
+    )
+
+
+def _rollup(row) -> CollectionValueRollup:
+    return CollectionValueRollup(
+        user_id=row["card__user_id"],
+        as_of_date=row["as_of_date"],
+        total_value=row["total"],
+        card_count=row["cards"],
+    )
+
+
+def refresh_collection_rollups(pairs) -> int:
+    """
+    Recompute the rollup rows for the given (user id, date) pairs from their
+    snapshots, dropping days that no longer have any. Only the touched days
+    are summed, never a user's whole history. Returns rows written.
+    """
+    dates_by_user = defaultdict(set)
+    for user_id, day in pairs:
+        dates_by_user[user_id].add(day)
+
+    # A refresh or sweep writes the same day(s) for everyone, query those together
+    users_by_dates = defaultdict(list)
+    for user_id, dates in dates_by_user.items():
+        users_by_dates[frozenset(dates)].append(user_id)
+
+    written = 0
+    for dates, user_ids in users_by_dates.items():
+        for i in range(0, len(user_ids), USER_CHUNK_SIZE):
+            chunk = user_ids[i : i + USER_CHUNK_SIZE]
+            rows = [
+                _rollup(row)
+                for row in _daily_totals(
+                    PriceSnapshot.objects.filter(
+                        card__user_id__in=chunk, as_of_date__in=dates
+                    )
+                )
+            ]
+            _upsert(rows)
+            written += len(rows)
+
+            present = {(row.user_id, row.as_of_date) for row in rows}
+            gone = Q()
+            for user_id in chunk:
+                for day in dates:
+                    if (user_id, day) not in present:
+                        gone |= Q(user_id=user_id, as_of_date=day)
+            if gone:
+                CollectionValueRollup.objects.filter(gone).delete()
+    return written
+
+
+def rebuild_collection_rollups(user=None) -> int:
+    """
+    Recompute every rollup row from scratch, for one user or everyone.
+    Returns rows written.
+    """
+    snapshots = PriceSnapshot.objects.all()
+    rollups = CollectionValueRollup.objects.all()
+    if user is not None:
+        snapshots = snapshots.filter(card__user=user)
+        rollups = rollups.filter(user=user)
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for row in _daily_totals(snapshots).iterator(chunk_size=2000):
+            batch.append(_rollup(row))
+            if len(batch) >= 1000:
+                _upsert(batch)
+                written += len(batch)
+                batch = []
+        _upsert(batch)
+        written += len(batch)
+    logger.info("Rebuilt %d collection value rollup rows", written)
+    return written
@@ -0,0 +1,145 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from vault.models import Card, CollectionValueRollup, PriceSnapshot
+
+CENTS = Decimal("0.01")
+BUCKETS = ("day", "week", "month")
+AGGREGATES = ("last", "avg", "min", "max")
+
+
+def _prices_before(user, start) -> dict:
+    # Each card's last known price going into the range, one index probe per card
+    latest = PriceSnapshot.objects.filter(
+        card=OuterRef("pk"), as_of_date__lt=start
+    ).order_by("-as_of_date")
+    return dict(
+        Card.objects.filter(user=user)
+        .annotate(last_price=Subquery(latest.values("price")[:1]))
+        .filter(last_price__isnull=False)
+        .values_list("pk", "last_price")
+    )
+
+
+def carry_forward_series(user, start=None, end=None) -> list:
+    """
+    Daily collection value where each card counts at its last known price,
+    so a day on which only some cards were refreshed doesn't dip.
+
+    One pass over the range's snapshots in date order keeps a running total:
+    a card's new price replaces its previous contribution, and every day up
+    to the next snapshot date is emitted at the running total. Cost is
+    O(snapshots + days), not O(cards x days). Returns [(date, value)] from
+    the first priced day (or `start`) through `end` (default today).
+    """
+    end = end or timezone.localdate()
+    snapshots = PriceSnapshot.objects.filter(card__user=user, as_of_date__lte=end)
+    last = {}
+    if start is not None:
+        last = _prices_before(user, start)
+        snapshots = snapshots.filter(as_of_date__gte=start)
+
+    total = sum(last.values(), Decimal("0"))
+    day = start if last else None
+    series = []
+    rows = (
+        snapshots.order_by("as_of_date")
+        .values_list("card_id", "as_of_date", "price")
+        .iterator(chunk_size=2000)
+    )
+    for card_id, as_of_date, price in rows:
+        if day is None:
+            day = as_of_date
+        # Days before this snapshot are final, emit them
+        while day < as_of_date:
+            series.append((day, total.quantize(CENTS)))
+            day += timedelta(days=1)
+        total += price - last.get(card_id, 0)
+        last[card_id] = price
+
+    while day is not None and day <= end:
+        series.append((day, total.quantize(CENTS)))
+        day += timedelta(days=1)
+    return series
+
+
+def rollup_series(user, start=None) -> list:
+    """
+    Daily collection value from the rollup table, [(date, value)].
+    """
+    qs = CollectionValueRollup.objects.filter(user=user)
+    if start is not None:
+        qs = qs.filter(as_of_date__gte=start)
+    return list(qs.order_by("as_of_date").values_list("as_of_date", "total_value"))
+
+
+def _bucket_start(day, bucket: str):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_series(points, bucket: str, agg: str = "last") -> list:
+    """
+    Collapse a date-ordered series into day/week/month buckets, each dated by
+    its first day and valued by the last, average, min or max point in it.
+    """
+    buckets = {}
+    for day, value in points:
+        buckets.setdefault(_bucket_start(day, bucket), []).append(value)
+
+    series = []
+    for start, values in buckets.items():
+        if agg == "avg":
+            value = (sum(values) / len(values)).quantize(CENTS)
+        elif agg == "min":
+            value = min(values)
+        elif agg == "max":
+            value = max(values)
+        else:
+            value = values[-1]
+        series.append((start, value))
+    return series
+
+
+def downsample_lttb(points, threshold: int) -> list:
+    """
+    Largest-Triangle-Three-Buckets: keep `threshold` points, always the first
+    and last, picking from each bucket the point that forms the largest
+    triangle with the previous pick and the next bucket's average. Peaks and
+    dips survive where plain striding would skip them. O(len(points)).
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    xs = [day.toordinal() for day, _ in points]
+    ys = [float(value) for _, value in points]
+    every = (n - 2) / (threshold - 2)
+    sampled = [points[0]]
+    prev = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the triangle's third corner
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        best, best_area = None, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs(
+                (xs[prev] - avg_x) * (ys[j] - ys[prev])
+                - (xs[prev] - xs[j]) * (avg_y - ys[prev])
+            )
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        prev = best
+    sampled.append(points[-1])
+    return sampled
@@ -0,0 +1,150 @@
+import hashlib
+import io
+import logging
+import re
+
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError, features
+
+from vault.constants import THUMBNAIL_WIDTHS
+from vault.models import Card, CatalogCard
+from vault.services.image_heal_services import image_retry_delay
+from vault.services.image_services import has_real_image
+from vault.utils import CircuitOpenError, _upstream_get, _upstream_timeout
+
+logger = logging.getLogger(__name__)
+
+# "<16 hex>-<width>.<ext>", the only names card_image will serve
+THUMBNAIL_NAME_RE = re.compile(r"^[0-9a-f]{16}-\d+\.(webp|png)$")
+CONTENT_TYPES = {"webp": "image/webp", "png": "image/png"}
+
+
+def thumbnail_storage() -> FileSystemStorage:
+    return FileSystemStorage(location=settings.CARD_IMAGE_ROOT)
+
+
+def thumbnail_name(mirror: str, width: int) -> str:
+    stem, ext = mirror.rsplit(".", 1)
+    return f"{stem}-{width}.{ext}"
+
+
+def render_thumbnails(content: bytes) -> tuple[str, dict]:
+    """
+    Downscale an image to each of THUMBNAIL_WIDTHS. WebP when this Pillow
+    build supports it, otherwise optimized PNG. Returns (ext, {width: bytes}).
+    """
+    with Image.open(io.BytesIO(content)) as source:
+        image = source.convert("RGBA")
+    webp = features.check("webp")
+    thumbnails = {}
+    for width in THUMBNAIL_WIDTHS:
+        thumb = image.copy()
+        # Height is left to the aspect ratio
+        thumb.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        if webp:
+            thumb.save(out, "WEBP", quality=80, method=6)
+        else:
+            thumb.save(out, "PNG", optimize=True)
+        thumbnails[width] = out.getvalue()
+    return ("webp" if webp else "png"), thumbnails
+
+
+def _download(url: str) -> bytes | None:
+    # CircuitOpenError is left to the caller, nothing was tried
+    max_bytes = getattr(settings, "CARD_IMAGE_MAX_BYTES", 5 * 1024 * 1024)
+    try:
+        resp = _upstream_get(url, timeout=_upstream_timeout())
+    except requests.RequestException as e:
+        logger.warning("Image download failed for %s: %s", url, e)
+        return None
+    if resp.status_code != 200 or len(resp.content) > max_bytes:
+        logger.warning("Image download for %s returned %s", url, resp.status_code)
+        return None
+    return resp.content
+
+
+def _defer_mirror(entry):
+    # Same backoff as image lookups, a broken url isn't fetched every pass
+    entry.image_attempts += 1
+    entry.image_next_attempt_at = timezone.now() + image_retry_delay(
+        entry.image_attempts
+    )
+    entry.save(update_fields=["image_attempts", "image_next_attempt_at"])
+
+
+def mirror_catalog_image(entry) -> bool:
+    """
+    Download a printing's image once and store its thumbnails under a hash of
+    the original, so the names never change and can be cached forever.
+    A failed download or unreadable image pushes the next attempt back.
+    """
+    if entry.image_mirror or not has_real_image(entry.image_url):
+        return False
+    content = _download(entry.image_url)
+    if content is None:
+        _defer_mirror(entry)
+        return False
+    try:
+        ext, thumbnails = render_thumbnails(content)
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning("Unreadable image at %s: %s", entry.image_url, e)
+        _defer_mirror(entry)
+        return False
+
+    mirror = f"{hashlib.sha256(content).hexdigest()[:16]}.{ext}"
+    storage = thumbnail_storage()
+    for width, data in thumbnails.items():
+        name = thumbnail_name(mirror, width)
+        # Reprints sharing artwork land on the same files
+        if not storage.exists(name):
+            storage.save(name, ContentFile(data))
+
+    entry.image_mirror = mirror
+    entry.image_attempts = 0
+    entry.image_next_attempt_at = None
+    entry.save(
+        update_fields=["image_mirror", "image_attempts", "image_next_attempt_at"]
+    )
+    # Moves the watermark of every vault holding it, so cached lists pick up
+    # the thumbnails
+    Card.objects.filter(catalog=entry).update(updated_at=timezone.now())
+    return True
+
+
+def mirror_catalog_images(entries=None, limit: int | None = None) -> dict:
+    """
+    Mirror up to `limit` (IMAGE_MIRROR_BATCH_SIZE) printings with a real
+    image, no thumbnails yet and a due retry time, or just those in
+    `entries`. Stops early while the image host's circuit is open.
+    Returns {mirrored, failed}.
+    """
+    limit = limit or getattr(settings, "IMAGE_MIRROR_BATCH_SIZE", 50)
+    if entries is None:
+        entries = CatalogCard.objects.all()
+    entries = (
+        entries.filter(image_mirror="")
+        .exclude(image_url__isnull=True)
+        .exclude(image_url__in=["", settings.CARD_IMAGE_PLACEHOLDER_URL])
+        .filter(
+            Q(image_next_attempt_at__isnull=True)
+            | Q(image_next_attempt_at__lte=timezone.now())
+        )
+        .distinct()
+        .order_by("image_attempts", "pk")
+    )
+
+    summary = {"mirrored": 0, "failed": 0}
+    for entry in entries[:limit]:
+        try:
+            mirrored = mirror_catalog_image(entry)
+        except CircuitOpenError:
+            logger.warning("Image host circuit open, mirroring stopped early")
+            break
+        summary["mirrored" if mirrored else "failed"] += 1
+    return summary
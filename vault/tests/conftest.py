@@ -2,9 +2,24 @@
 
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from vault.rate_limit import reset_price_limiter
+from vault.services.card_index_services import clear_card_index_memo
 from vault.models import Card
 
 
+@pytest.fixture(autouse=True)
+def clear_upstream_cache():
+    # Upstream responses are cached, keep tests from leaking into each other
+    cache.clear()
+    reset_price_limiter()
+    clear_card_index_memo()
+    yield
+    cache.clear()
+    reset_price_limiter()
+    clear_card_index_memo()
+
+
 @pytest.fixture
 def user(db):
     return User.objects.create_user(username="testuser", password="password123")
@@ -15,6 +30,22 @@ def other_user(db):
     return User.objects.create_user(username="otheruser", password="otherpassword123")
 
 
+@pytest.fixture
+def make_card(db):
+    """
+    Card factory: make_card(user, name, number, **fields) creates a NM
+    English card from 151 unless fields say otherwise.
+    """
+
+    def make(user, name="Pikachu", number="58", **fields):
+        fields = {"set_name": "151", "language": "EN", "condition": "NM", **fields}
+        return Card.objects.create(
+            user=user, card_name=name, card_number=number, **fields
+        )
+
+    return make
+
+
 @pytest.fixture
 def user_card(db, user):
     return Card.objects.create(
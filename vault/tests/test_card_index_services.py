@@ -0,0 +1,125 @@
+import pytest
+from unittest.mock import patch
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+
+from vault.models import UpstreamSetIndex
+from vault.services.card_index_services import (
+    build_set_index,
+    lookup_indexed_card,
+    sync_card_index,
+)
+from vault.services.image_services import get_card_image_url_or_placeholder
+
+SET_LISTING = [
+    {
+        "id": "sv03.5-025",
+        "localId": "025",
+        "name": "Pikachu",
+        "image": "https://img/sv03.5/025",
+    },
+    {
+        "id": "sv03.5-173",
+        "localId": "173",
+        "name": "Pikachu",
+        "image": "https://img/sv03.5/173",
+    },
+    {"id": "sv03.5-151", "localId": "151", "name": "Mew ex"},
+]
+
+
+def test_build_set_index_keys_by_id_and_name_number():
+    entries = build_set_index(SET_LISTING)
+
+    assert set(entries["by_id"]) == {"sv03.5-025", "sv03.5-173", "sv03.5-151"}
+    assert entries["by_name_number"]["pikachu|173"] == "sv03.5-173"
+
+
+@pytest.mark.django_db
+@patch("vault.services.card_index_services.fetch_set_cards")
+def test_sync_card_index_only_refreshes_missing_or_stale_sets(mock_fetch):
+    mock_fetch.return_value = SET_LISTING
+    UpstreamSetIndex.objects.create(
+        source=UpstreamSetIndex.TCGDEX,
+        set_code="sv01",
+        refreshed_at=timezone.now(),
+    )
+    UpstreamSetIndex.objects.create(
+        source=UpstreamSetIndex.TCGDEX,
+        set_code="sv02",
+        refreshed_at=timezone.now() - timedelta(days=30),
+    )
+
+    summary = sync_card_index(["sv01", "sv02", "sv03.5"])
+
+    assert summary == {"refreshed": 2, "skipped": 1, "failed": 0}
+    assert sorted(c.args[0] for c in mock_fetch.call_args_list) == ["sv02", "sv03.5"]
+    assert UpstreamSetIndex.objects.get(set_code="sv03.5").entry_count == 3
+
+
+@pytest.mark.django_db
+@patch("vault.services.card_index_services.fetch_set_cards")
+def test_failed_sync_keeps_previous_index(mock_fetch):
+    mock_fetch.return_value = SET_LISTING
+    sync_card_index(["sv03.5"])
+    mock_fetch.return_value = {"error": "Service unavailable"}
+
+    summary = sync_card_index(["sv03.5"], force=True)
+
+    assert summary["failed"] == 1
+    assert UpstreamSetIndex.objects.get(set_code="sv03.5").entry_count == 3
+
+
+@pytest.mark.django_db
+@patch("vault.services.card_index_services.IMAGE_SET_MAP", {"151": "sv03.5"})
+@patch("vault.services.card_index_services.fetch_set_cards")
+def test_lookup_indexed_card_is_a_local_lookup(mock_fetch):
+    mock_fetch.return_value = SET_LISTING
+    sync_card_index(["sv03.5"])
+
+    assert lookup_indexed_card("pikachu", "151", "173") == {
+        "name": "Pikachu",
+        "image_url": "https://img/sv03.5/173/high.png",
+        "card_id": "sv03.5-173",
+    }
+    # Loose name match on the exact id, like the live search
+    assert lookup_indexed_card("Pika", "151", "25")["card_id"] == "sv03.5-025"
+    assert "error" in lookup_indexed_card("Charizard", "151", "25")
+    assert "error" in lookup_indexed_card("Mew ex", "151", "151")
+    assert lookup_indexed_card("Pikachu", "Unknown set", "25") is None
+    mock_fetch.assert_called_once()
+
+
+@pytest.mark.django_db
+@patch("vault.services.card_index_services.IMAGE_SET_MAP", {"151": "sv03.5"})
+@patch("vault.services.image_services.fetch_card_data")
+@patch("vault.services.card_index_services.fetch_set_cards")
+def test_image_lookup_only_goes_live_for_unindexed_sets(
+    mock_fetch_set, mock_fetch_card
+):
+    mock_fetch_card.return_value = {"image_url": "https://live/img.png"}
+
+    live = get_card_image_url_or_placeholder(
+        card_name="Pikachu", set_name="151", card_number="25"
+    )
+    assert live == "https://live/img.png"
+
+    mock_fetch_set.return_value = SET_LISTING
+    sync_card_index(["sv03.5"])
+    indexed = get_card_image_url_or_placeholder(
+        card_name="Pikachu", set_name="151", card_number="25"
+    )
+
+    assert indexed == "https://img/sv03.5/025/high.png"
+    mock_fetch_card.assert_called_once()
+
+
+@pytest.mark.django_db
+@patch("vault.services.card_index_services.fetch_set_cards")
+def test_sync_card_index_command(mock_fetch, capsys):
+    mock_fetch.return_value = SET_LISTING
+
+    call_command("sync_card_index", "--set", "sv03.5")
+
+    assert "Sets refreshed: 1 | skipped: 0 | failed: 0" in capsys.readouterr().out
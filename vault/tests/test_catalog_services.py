@@ -0,0 +1,120 @@
+import importlib
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+
+from vault.models import Card, CatalogCard, PriceSnapshot
+from vault.services.catalog_services import ensure_catalog, get_or_create_catalog_card
+from vault.services.image_heal_services import heal_catalog_images
+from vault.services.price_services import refresh_prices_for_user
+
+
+@pytest.mark.django_db
+def test_ensure_catalog_links_shared_printings_to_one_row(user, other_user, make_card):
+    yesterday = timezone.localdate() - timedelta(days=1)
+    mine = make_card(user, image_url="https://img/pikachu.png")
+    theirs = make_card(
+        other_user,
+        name="pikachu",
+        number="058",
+        value_usd="4.00",
+        price_last_updated=yesterday,
+    )
+    other = make_card(user, name="Mew", number="151")
+
+    assert ensure_catalog([mine, theirs, other]) == 3
+    assert ensure_catalog([mine, theirs, other]) == 0
+
+    assert CatalogCard.objects.count() == 2
+    mine.refresh_from_db()
+    theirs.refresh_from_db()
+    assert mine.catalog_id == theirs.catalog_id
+
+    entry = mine.catalog
+    assert (entry.set_name, entry.card_number, entry.name_key) == (
+        "151",
+        "058",
+        "pikachu",
+    )
+    assert entry.image_url == "https://img/pikachu.png"
+    assert entry.value_usd == Decimal("4.00")
+
+
+@pytest.mark.django_db
+def test_get_or_create_catalog_card_reuses_existing_row():
+    first = get_or_create_catalog_card(
+        card_name="Pikachu", set_name="151", card_number="58"
+    )
+    again = get_or_create_catalog_card(
+        card_name=" PIKACHU", set_name="151", card_number="058"
+    )
+
+    assert first == again
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+@patch("vault.services.price_services.extract_card_price")
+def test_refresh_reuses_price_another_vault_fetched_today(
+    mock_extract, mock_fetch_price, user, other_user, make_card
+):
+    make_card(user, image_url="https://img/pikachu.png")
+    theirs = make_card(other_user, image_url="https://img/pikachu.png")
+
+    mock_fetch_price.return_value = {"ok": True}
+    mock_extract.return_value = {"price": 6.00}
+
+    assert refresh_prices_for_user(user) == 1
+    stats = {}
+    assert refresh_prices_for_user(other_user, stats=stats) == 1
+
+    # Second vault is priced from the catalog row without an upstream call
+    mock_fetch_price.assert_called_once()
+    assert stats == {"upstream_calls": 0, "calls_saved": 1}
+    theirs.refresh_from_db()
+    assert theirs.value_usd == Decimal("6.00")
+    assert PriceSnapshot.objects.filter(card=theirs).exists()
+
+
+@pytest.mark.django_db
+@patch("vault.services.image_heal_services.lookup_card_image")
+def test_heal_pass_resolves_image_once_for_every_vault(
+    mock_get_image, user, other_user, make_card
+):
+    placeholder = settings.CARD_IMAGE_PLACEHOLDER_URL
+    mine = make_card(user, image_url=placeholder)
+    theirs = make_card(other_user, image_url=placeholder)
+    ensure_catalog([mine, theirs])
+
+    mock_get_image.return_value = {"image_url": "https://img/real.png"}
+
+    heal_catalog_images(CatalogCard.objects.filter(cards__user=user))
+
+    mock_get_image.assert_called_once()
+    theirs.refresh_from_db()
+    assert theirs.image_url == "https://img/real.png"
+    assert theirs.catalog.image_url == "https://img/real.png"
+
+
+@pytest.mark.django_db
+def test_backfill_migration_builds_catalog_from_existing_cards(
+    user, other_user, make_card
+):
+    today = timezone.localdate()
+    make_card(user, value_usd="1.00", price_last_updated=today)
+    make_card(other_user, number="058", image_url="https://img/p.png")
+    make_card(other_user, name="Mew", number="151")
+
+    migration = importlib.import_module("vault.migrations.0014_backfill_catalogcard")
+    migration.backfill_catalog(apps, None)
+
+    assert CatalogCard.objects.count() == 2
+    assert not Card.objects.filter(catalog__isnull=True).exists()
+    entry = CatalogCard.objects.get(name_key="pikachu")
+    assert entry.cards.count() == 2
+    assert entry.value_usd == Decimal("1.00")
+    assert entry.image_url == "https://img/p.png"
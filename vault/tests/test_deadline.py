@@ -0,0 +1,25 @@
+from unittest.mock import patch
+
+from vault.deadline import MIN_TIMEOUT_SECONDS, Deadline
+
+
+def test_deadline_budget_comes_from_settings_per_view(settings):
+    settings.REQUEST_BUDGET_SECONDS = {"default": 8, "card-create": 3}
+
+    assert Deadline.for_view("card-create").seconds == 3
+    assert Deadline.for_view("anything-else").seconds == 8
+
+
+def test_deadline_timeout_is_capped_by_remaining_budget():
+    with patch("vault.deadline.time.monotonic", return_value=100.0):
+        deadline = Deadline(4)
+
+    with patch("vault.deadline.time.monotonic", return_value=101.0):
+        assert deadline.timeout(10) == 3.0
+        assert deadline.timeout(2) == 2.0
+        assert not deadline.expired
+
+    with patch("vault.deadline.time.monotonic", return_value=105.0):
+        assert deadline.expired
+        assert deadline.remaining() == 0.0
+        assert deadline.timeout(10) == MIN_TIMEOUT_SECONDS
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+
+from vault.models import PriceSnapshot
+from vault.services.export_services import stream_export
+
+
+def _snapshot(card, day, price):
+    PriceSnapshot.objects.create(card=card, as_of_date=day, price=Decimal(price))
+
+
+@pytest.mark.django_db
+def test_csv_export_has_latest_snapshot_per_card(user_card, other_user_card):
+    _snapshot(user_card, date(2025, 1, 1), "3.00")
+    _snapshot(user_card, date(2025, 1, 3), "5.00")
+    _snapshot(other_user_card, date(2025, 1, 3), "9.00")
+
+    text = "".join(stream_export(user_card.user, "csv"))
+    rows = list(csv.DictReader(io.StringIO(text)))
+
+    assert len(rows) == 1
+    assert rows[0]["card_name"] == "Pikachu"
+    assert rows[0]["latest_snapshot_price"] == "5.00"
+    assert rows[0]["latest_snapshot_date"] == "2025-01-03"
+    assert rows[0]["value_usd"] == ""
+
+
+@pytest.mark.django_db
+def test_jsonl_history_export_filters_by_date_range(user_card):
+    for day, price in ((1, "1.00"), (2, "2.00"), (3, "3.00")):
+        _snapshot(user_card, date(2025, 1, day), price)
+
+    lines = list(
+        stream_export(
+            user_card.user,
+            "jsonl",
+            start=date(2025, 1, 2),
+            end=date(2025, 1, 3),
+            history=True,
+        )
+    )
+
+    rows = [json.loads(line) for line in lines]
+    assert [(r["as_of_date"], r["price"]) for r in rows] == [
+        ("2025-01-02", "2.00"),
+        ("2025-01-03", "3.00"),
+    ]
+    assert rows[0]["card_name"] == "Pikachu"
+
+
+@pytest.mark.django_db
+def test_export_view_streams_an_attachment(client, user, user_card):
+    client.login(username="testuser", password="password123")
+
+    response = client.get(reverse("card-export"), {"format": "jsonl"})
+
+    assert isinstance(response, StreamingHttpResponse)
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert "attachment" in response["Content-Disposition"]
+    body = b"".join(response.streaming_content).decode()
+    assert json.loads(body)["card_number"] == "58"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params", [{"format": "xlsx"}, {"format": "csv", "start": "yesterday"}]
+)
+def test_export_view_rejects_bad_parameters(client, user, params):
+    client.login(username="testuser", password="password123")
+
+    response = client.get(reverse("card-export"), params)
+
+    assert response.status_code == 400
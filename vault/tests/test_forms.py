@@ -8,7 +8,7 @@ from vault.forms import CardForm
 @pytest.mark.django_db
 def test_valid_card_is_validated_by_form(monkeypatch):
 
-    def fake_fetch_card_price(card_name, set_name):
+    def fake_fetch_card_price(card_name, set_name, deadline=None):
         return {"data": [{"price": 10.50, "date": "2025-11-05"}]}
 
     def fake_extract_card_price(data, card_number):
@@ -35,7 +35,7 @@ def test_valid_card_is_validated_by_form(monkeypatch):
 @pytest.mark.django_db
 def test_fetch_card_price_errors_out_validation_errors_out(monkeypatch):
 
-    def fake_fetch_card_price(card_name, set_name):
+    def fake_fetch_card_price(card_name, set_name, deadline=None):
         return {"error": "whichever error"}
 
     monkeypatch.setattr("vault.forms.fetch_card_price", fake_fetch_card_price)
@@ -58,7 +58,7 @@ def test_fetch_card_price_errors_out_validation_errors_out(monkeypatch):
 @pytest.mark.django_db
 def test_extract_card_price_errors_out_validation_errors_out(monkeypatch):
 
-    def fake_fetch_card_price(card_name, set_name):
+    def fake_fetch_card_price(card_name, set_name, deadline=None):
         return {"data": [{"price": 10.50, "date": "2025-11-05"}]}
 
     def fake_extract_card_price(data, card_number):
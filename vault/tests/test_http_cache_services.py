@@ -0,0 +1,97 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.urls import reverse
+from django.utils import timezone
+
+from vault.models import Card, PriceSnapshot
+from vault.services.price_services import PriceWriteBuffer
+from vault.services.rollup_services import rebuild_collection_rollups
+
+
+@pytest.fixture
+def priced_card(user):
+    card = Card.objects.create(
+        user=user,
+        card_name="Pikachu",
+        set_name="151",
+        language="EN",
+        card_number="25",
+        condition="NM",
+        value_usd=Decimal("2.00"),
+    )
+    PriceSnapshot.objects.create(
+        card=card, as_of_date=timezone.localdate() - timedelta(days=1), price=2
+    )
+    rebuild_collection_rollups(user)
+    return card
+
+
+@pytest.mark.django_db
+def test_series_answers_304_when_unchanged(client, user, priced_card):
+    client.force_login(user)
+    url = reverse("collection-value-series")
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert "private" in first["Cache-Control"]
+
+    again = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert again.status_code == 304
+
+
+@pytest.mark.django_db
+def test_series_served_from_cache_for_one_query(
+    client, user, priced_card, django_assert_num_queries
+):
+    client.force_login(user)
+    url = reverse("collection-value-series")
+    first = client.get(url).json()
+
+    # Session, user, then only the watermark
+    with django_assert_num_queries(3):
+        assert client.get(url).json() == first
+
+
+@pytest.mark.django_db
+def test_price_refresh_changes_etag(client, user, priced_card):
+    client.force_login(user)
+    url = reverse("collection-value-series")
+    before = client.get(url)
+
+    writer = PriceWriteBuffer()
+    writer.add(priced_card, Decimal("5.00"), timezone.localdate())
+    writer.flush()
+
+    after = client.get(url, HTTP_IF_NONE_MATCH=before["ETag"])
+    assert after.status_code == 200
+    assert after["ETag"] != before["ETag"]
+    assert after.json()[-1]["value"] == "5.00"
+
+
+@pytest.mark.django_db
+def test_deleting_a_card_changes_etag(client, user, priced_card):
+    client.force_login(user)
+    url = reverse("card-list-api")
+    before = client.get(url)
+    assert len(before.json()["results"]) == 1
+
+    client.post(reverse("card-delete", args=[priced_card.pk]))
+
+    after = client.get(url, HTTP_IF_NONE_MATCH=before["ETag"])
+    assert after.status_code == 200
+    assert after.json()["results"] == []
+
+
+@pytest.mark.django_db
+def test_etag_varies_by_query_and_user(client, user, other_user, priced_card):
+    client.force_login(user)
+    url = reverse("card-list-api")
+    by_value = client.get(url, {"sort": "value_desc"})["ETag"]
+    by_set = client.get(url, {"sort": "set_asc"})["ETag"]
+
+    client.force_login(other_user)
+    other = client.get(url, {"sort": "value_desc"})
+
+    assert len({by_value, by_set, other["ETag"]}) == 3
+    assert other.json()["results"] == []
@@ -0,0 +1,144 @@
+import pytest
+from asgiref.sync import async_to_sync
+from datetime import timedelta
+from unittest.mock import patch
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from vault.models import Card, CatalogCard
+from vault.services.catalog_services import ensure_catalog
+from vault.services.image_heal_services import (
+    aheal_catalog_images,
+    entries_due_for_heal,
+    heal_catalog_images,
+    image_retry_delay,
+)
+
+REAL_IMAGE = "https://assets.tcgdex.net/en/sv/sv03.5/001/high.png"
+
+
+@pytest.fixture
+def placeholder_card(user):
+    card = Card.objects.create(
+        user=user,
+        card_name="Bulbasaur",
+        set_name="151",
+        language="EN",
+        card_number="1",
+        condition="NM",
+        image_url=settings.CARD_IMAGE_PLACEHOLDER_URL,
+    )
+    ensure_catalog([card])
+    return card
+
+
+def test_retry_delay_doubles_up_to_cap(settings):
+    settings.IMAGE_HEAL_BASE_SECONDS = 60
+    settings.IMAGE_HEAL_MAX_SECONDS = 300
+
+    delays = [image_retry_delay(n).total_seconds() for n in range(1, 6)]
+
+    assert delays == [60, 120, 240, 300, 300]
+
+
+@pytest.mark.django_db
+@patch(
+    "vault.services.image_heal_services.lookup_card_image",
+    return_value={"image_url": REAL_IMAGE, "card_id": "sv03.5-001"},
+)
+def test_heal_fans_image_out_to_cards(mock_image, placeholder_card):
+    assert heal_catalog_images() == {"healed": 1, "missed": 0, "errors": 0}
+
+    placeholder_card.refresh_from_db()
+    assert placeholder_card.image_url == REAL_IMAGE
+    assert placeholder_card.catalog.image_attempts == 0
+    assert placeholder_card.catalog.tcgdex_id == "sv03.5-001"
+    assert not entries_due_for_heal().exists()
+
+
+@pytest.mark.django_db
+@patch(
+    "vault.services.image_heal_services.lookup_card_image",
+    return_value={"error": "No matching cards in return"},
+)
+def test_misses_back_off_instead_of_retrying_every_pass(mock_image, placeholder_card):
+    assert heal_catalog_images() == {"healed": 0, "missed": 1, "errors": 0}
+    # Not due again until the backoff passes
+    assert heal_catalog_images() == {"healed": 0, "missed": 0, "errors": 0}
+    assert mock_image.call_count == 1
+
+    entry = CatalogCard.objects.get()
+    assert entry.image_attempts == 1
+    first_wait = entry.image_next_attempt_at - timezone.now()
+
+    CatalogCard.objects.update(image_next_attempt_at=timezone.now())
+    heal_catalog_images()
+
+    entry.refresh_from_db()
+    assert entry.image_attempts == 2
+    assert entry.image_next_attempt_at - timezone.now() > first_wait + timedelta(
+        minutes=30
+    )
+
+
+@pytest.mark.django_db
+@patch(
+    "vault.services.image_heal_services.lookup_card_image",
+    return_value={"image_url": REAL_IMAGE, "card_id": "sv03.5-001"},
+)
+def test_heal_command_prints_summary(mock_image, placeholder_card, capsys):
+    call_command("heal_card_images", "--limit", "5")
+
+    assert (
+        "Images healed: 1 | still missing: 0 | lookup errors: 0"
+        in capsys.readouterr().out
+    )
+
+
+@pytest.mark.django_db
+@patch(
+    "vault.services.image_heal_services.lookup_card_image",
+    return_value={"error": "Service unavailable", "status": 503},
+)
+def test_upstream_errors_are_not_counted_as_misses(
+    mock_image, settings, placeholder_card
+):
+    settings.IMAGE_HEAL_ERROR_RETRY_SECONDS = 300
+
+    assert heal_catalog_images() == {"healed": 0, "missed": 0, "errors": 1}
+
+    entry = CatalogCard.objects.get()
+    assert entry.image_attempts == 0
+    wait = entry.image_next_attempt_at - timezone.now()
+    assert timedelta(minutes=4) < wait <= timedelta(minutes=5)
+
+
+@pytest.mark.django_db
+def test_async_heal_records_every_lookup(placeholder_card, other_user):
+    missing = Card.objects.create(
+        user=other_user,
+        card_name="Mew",
+        set_name="151",
+        language="EN",
+        card_number="151",
+        condition="NM",
+    )
+    ensure_catalog([missing])
+
+    async def fake_lookup(client, *, card_name, set_name, card_number):
+        if card_name == "Bulbasaur":
+            return {"image_url": REAL_IMAGE, "card_id": "sv03.5-001"}
+        return {"error": "Service unavailable", "status": 503}
+
+    with patch(
+        "vault.services.image_heal_services.alookup_card_image",
+        side_effect=fake_lookup,
+    ):
+        summary = async_to_sync(aheal_catalog_images)()
+
+    assert summary == {"healed": 1, "missed": 0, "errors": 1}
+    placeholder_card.refresh_from_db()
+    assert placeholder_card.image_url == REAL_IMAGE
+    # A failed lookup is retried later without counting as an attempt
+    assert CatalogCard.objects.get(pk=missing.catalog_id).image_attempts == 0
@@ -1,9 +1,15 @@
+import pytest
 from unittest.mock import patch
 from django.conf import settings
 
-from vault.services.image_services import get_card_image_url_or_placeholder
+from vault.services.image_services import (
+    get_card_image_url_or_placeholder,
+    lookup_card_image,
+    lookup_indexed_image,
+)
 
 
+@pytest.mark.django_db
 @patch("vault.services.image_services.fetch_card_data")
 def test_get_card_image_returns_image_when_present(mock_fetch):
     mock_fetch.return_value = {"image_url": "https://example.com/img.png"}
@@ -17,6 +23,7 @@ def test_get_card_image_returns_image_when_present(mock_fetch):
     assert result == "https://example.com/img.png"
 
 
+@pytest.mark.django_db
 @patch("vault.services.image_services.fetch_card_data")
 def test_get_card_image_returns_placeholder_when_missing(mock_fetch):
     mock_fetch.return_value = {}
@@ -30,6 +37,7 @@ def test_get_card_image_returns_placeholder_when_missing(mock_fetch):
     assert result == settings.CARD_IMAGE_PLACEHOLDER_URL
 
 
+@pytest.mark.django_db
 @patch("vault.services.image_services.fetch_card_data")
 def test_get_card_image_returns_placeholder_on_exception(mock_fetch):
     mock_fetch.side_effect = Exception("API down")
@@ -41,3 +49,33 @@ def test_get_card_image_returns_placeholder_on_exception(mock_fetch):
     )
 
     assert result == settings.CARD_IMAGE_PLACEHOLDER_URL
+
+
+@pytest.mark.django_db
+@patch("vault.services.image_services.fetch_card_data")
+@patch("vault.services.image_services.lookup_indexed_card")
+def test_indexed_image_never_goes_live(mock_lookup, mock_fetch):
+    mock_lookup.return_value = None
+
+    result = lookup_indexed_image(card_name="Pikachu", set_name="151", card_number="58")
+
+    assert "error" in result
+    mock_fetch.assert_not_called()
+
+    mock_lookup.return_value = {"image_url": "https://example.com/img.png"}
+    assert lookup_indexed_image(
+        card_name="Pikachu", set_name="151", card_number="58"
+    ) == {"image_url": "https://example.com/img.png"}
+
+
+@pytest.mark.django_db
+@patch("vault.services.image_services.fetch_card_data")
+def test_lookup_card_image_keeps_the_tcgdex_id(mock_fetch):
+    mock_fetch.return_value = {
+        "image_url": "https://example.com/img.png",
+        "card_id": "sv03.5-058",
+    }
+
+    result = lookup_card_image(card_name="Pikachu", set_name="151", card_number="58")
+
+    assert result["card_id"] == "sv03.5-058"
@@ -0,0 +1,166 @@
+import io
+import json
+import pytest
+from decimal import Decimal
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from vault.models import (
+    Card,
+    CatalogCard,
+    CollectionValueRollup,
+    PriceRefreshJob,
+    PriceSnapshot,
+)
+from vault.services.import_services import import_cards, iter_import_rows
+
+CSV_FILE = (
+    "card_name,set_name,card_number,condition,language\n"
+    "Pikachu,151,25,NM,EN\n"
+    "Mew,151,151,Lightly Played,\n"
+    "Charizard,Base Set,4,NM,EN\n"
+    "pikachu,151,025,,\n"
+    "Bulbasaur,151,abc,NM,EN\n"
+    "Eevee,PALDEAN FATES,1,,\n"
+)
+
+
+def _rows(text, fmt="csv"):
+    return iter_import_rows(io.BytesIO(text.encode("utf-8")), fmt)
+
+
+@pytest.mark.django_db
+def test_import_creates_valid_rows_and_reports_the_rest(user):
+    summary = import_cards(user, _rows(CSV_FILE))
+
+    assert summary["created"] == 3
+    assert summary["duplicates"] == 1
+    assert summary["errors"] == [
+        {"row": 3, "error": "Unknown set 'Base Set'"},
+        {"row": 5, "error": "Invalid card_number 'abc'"},
+    ]
+    mew = Card.objects.get(user=user, card_name="Mew")
+    assert (mew.condition, mew.language) == ("LP", "EN")
+    assert Card.objects.get(card_name="Eevee").set_name == "Paldean Fates"
+    # Every imported card is linked to the shared catalog
+    assert not Card.objects.filter(user=user, catalog__isnull=True).exists()
+    # Prices and images are resolved later by one batched refresh
+    assert PriceRefreshJob.objects.filter(user=user).count() == 1
+
+
+@pytest.mark.django_db
+def test_import_dedupes_against_the_vault_with_one_query(
+    user, django_assert_max_num_queries
+):
+    Card.objects.create(
+        user=user,
+        card_name="Pikachu",
+        set_name="151",
+        language="EN",
+        card_number="25",
+        condition="NM",
+    )
+    lines = [
+        json.dumps({"card_name": f"Card {n}", "set_name": "151", "card_number": n})
+        for n in range(1, 41)
+    ]
+    lines.append(
+        json.dumps({"card_name": "PIKACHU", "set_name": "151", "card_number": "025"})
+    )
+    lines.append("{not json")
+
+    # Vault read, then per chunk of 25: insert, catalog create/select/link
+    with django_assert_max_num_queries(9):
+        summary = import_cards(
+            user, _rows("\n".join(lines), "jsonl"), chunk_size=25, enrich=False
+        )
+
+    assert summary["created"] == 40
+    assert summary["duplicates"] == 1
+    assert summary["errors"] == [{"row": 42, "error": "Invalid JSON"}]
+
+
+@pytest.mark.django_db
+def test_import_starts_from_known_catalog_data(user, other_user):
+    CatalogCard.objects.create(
+        set_name="151",
+        card_number="025",
+        card_name="Pikachu",
+        name_key="pikachu",
+        image_url="https://img/pikachu.png",
+        value_usd="4.50",
+    )
+    rows = json.dumps([{"card_name": "Pikachu", "set_name": "151", "card_number": 25}])
+
+    import_cards(user, _rows(rows, "json"), enrich=False)
+
+    card = Card.objects.get(user=user)
+    assert card.image_url == "https://img/pikachu.png"
+    assert card.value_usd == Decimal("4.50")
+
+
+@pytest.mark.django_db
+def test_import_view_shows_per_row_report(client, user):
+    client.login(username="testuser", password="password123")
+    upload = SimpleUploadedFile("cards.csv", CSV_FILE.encode("utf-8"))
+
+    response = client.post(reverse("card-import"), {"file": upload})
+
+    assert response.status_code == 200
+    assert response.context["summary"]["created"] == 3
+    assert b"Row 3: Unknown set" in response.content
+
+
+@pytest.mark.django_db
+def test_import_view_rejects_unknown_file_types(client, user):
+    client.login(username="testuser", password="password123")
+    upload = SimpleUploadedFile("cards.xlsx", b"nope")
+
+    response = client.post(reverse("card-import"), {"file": upload})
+
+    assert response.status_code == 200
+    assert response.context["form"].errors["file"]
+    assert not Card.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_cards_command(tmp_path, user, capsys):
+    path = tmp_path / "cards.csv"
+    path.write_text(CSV_FILE, encoding="utf-8")
+
+    call_command("import_cards", "testuser", str(path), "--no-enrich")
+
+    out = capsys.readouterr()
+    assert "Created: 3 | duplicates: 1 | errors: 2" in out.out
+    assert "Row 3: Unknown set 'Base Set'" in out.err
+    assert not PriceRefreshJob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_snapshots_prices_the_catalog_already_has_for_today(user):
+    today = timezone.localdate()
+    CatalogCard.objects.create(
+        set_name="151",
+        card_number="025",
+        card_name="Pikachu",
+        name_key="pikachu",
+        value_usd="4.50",
+        price_last_updated=today,
+    )
+    rows = json.dumps(
+        [
+            {"card_name": "Pikachu", "set_name": "151", "card_number": 25},
+            {"card_name": "Mew", "set_name": "151", "card_number": 151},
+        ]
+    )
+
+    import_cards(user, _rows(rows, "json"), enrich=False)
+
+    snapshot = PriceSnapshot.objects.get()
+    assert snapshot.card.card_name == "Pikachu"
+    assert snapshot.as_of_date == today
+    rollup = CollectionValueRollup.objects.get(user=user)
+    assert rollup.as_of_date == today
+    assert rollup.total_value == Decimal("4.50")
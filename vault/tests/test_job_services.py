@@ -0,0 +1,204 @@
+import pytest
+from asgiref.sync import sync_to_async
+from datetime import timedelta
+from unittest.mock import patch
+from django.core.management import call_command
+from django.utils import timezone
+
+from vault.models import PriceRefreshJob
+from vault.services.job_services import (
+    claim_next_job,
+    enqueue_price_refresh,
+    process_next_job,
+    requeue_stale_jobs,
+    run_price_refresh_job,
+)
+
+
+@pytest.mark.django_db
+def test_enqueue_collapses_duplicate_requests(user, other_user):
+    job, created = enqueue_price_refresh(user)
+    again, created_again = enqueue_price_refresh(user)
+    _, other_created = enqueue_price_refresh(other_user)
+
+    assert created
+    assert not created_again
+    assert again == job
+    assert other_created
+    assert PriceRefreshJob.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_enqueue_collapses_into_running_job(user):
+    job, _ = enqueue_price_refresh(user)
+    claim_next_job()
+
+    again, created = enqueue_price_refresh(user)
+
+    assert not created
+    assert again == job
+
+
+@pytest.mark.django_db
+def test_enqueue_creates_new_job_after_previous_finished(user):
+    PriceRefreshJob.objects.create(user=user, status=PriceRefreshJob.DONE)
+
+    _, created = enqueue_price_refresh(user)
+
+    assert created
+
+
+@pytest.mark.django_db
+def test_claim_next_job_returns_none_on_empty_queue():
+    assert claim_next_job() is None
+
+
+@pytest.mark.django_db
+@patch("vault.services.job_services.refresh_prices_for_user")
+def test_process_next_job_records_progress_and_finishes(mock_refresh, user):
+    def fake_refresh(user, progress=None):
+        progress(3, 5, 1)
+        return 2
+
+    mock_refresh.side_effect = fake_refresh
+    job, _ = enqueue_price_refresh(user)
+
+    assert process_next_job()
+
+    job.refresh_from_db()
+    assert job.status == PriceRefreshJob.DONE
+    assert (job.cards_done, job.cards_total, job.cards_failed) == (3, 5, 1)
+    assert job.finished_at is not None
+    assert not process_next_job()
+
+
+@pytest.mark.django_db
+@patch("vault.services.job_services.mirror_catalog_images")
+@patch("vault.services.job_services.refresh_prices_for_user", return_value=1)
+def test_finished_job_mirrors_images_without_failing(mock_refresh, mock_mirror, user):
+    mock_mirror.side_effect = OSError("disk full")
+    job, _ = enqueue_price_refresh(user)
+
+    process_next_job()
+
+    job.refresh_from_db()
+    assert job.status == PriceRefreshJob.DONE
+    mock_mirror.assert_called_once()
+
+
+@pytest.mark.django_db
+@patch("vault.services.job_services.refresh_prices_for_user")
+def test_process_next_job_marks_job_failed_on_exception(mock_refresh, user):
+    mock_refresh.side_effect = RuntimeError("boom")
+    job, _ = enqueue_price_refresh(user)
+
+    process_next_job()
+
+    job.refresh_from_db()
+    assert job.status == PriceRefreshJob.FAILED
+    assert job.error == "boom"
+
+
+@pytest.mark.django_db
+def test_requeue_stale_jobs_only_touches_jobs_without_a_heartbeat(user, other_user):
+    two_hours_ago = timezone.now() - timedelta(hours=2)
+    stale = PriceRefreshJob.objects.create(
+        user=user,
+        status=PriceRefreshJob.RUNNING,
+        started_at=two_hours_ago,
+        heartbeat_at=two_hours_ago,
+    )
+    # Started long ago but still reporting progress
+    long_running = PriceRefreshJob.objects.create(
+        user=other_user,
+        status=PriceRefreshJob.RUNNING,
+        started_at=two_hours_ago,
+        heartbeat_at=timezone.now(),
+    )
+
+    assert requeue_stale_jobs() == 1
+
+    stale.refresh_from_db()
+    long_running.refresh_from_db()
+    assert stale.status == PriceRefreshJob.QUEUED
+    assert long_running.status == PriceRefreshJob.RUNNING
+
+
+@pytest.mark.django_db
+@patch("vault.services.job_services.refresh_prices_for_user", return_value=0)
+def test_process_price_refresh_jobs_command_drains_queue(mock_refresh, user):
+    enqueue_price_refresh(user)
+
+    call_command("process_price_refresh_jobs", "--once")
+
+    mock_refresh.assert_called_once()
+    assert PriceRefreshJob.objects.get().status == PriceRefreshJob.DONE
+
+
+@pytest.mark.django_db
+@patch("vault.services.job_services.refresh_prices_for_user", return_value=0)
+def test_worker_requeues_orphaned_jobs_inside_its_loop(mock_refresh, user):
+    job = PriceRefreshJob.objects.create(
+        user=user,
+        status=PriceRefreshJob.RUNNING,
+        started_at=timezone.now() - timedelta(hours=2),
+        heartbeat_at=timezone.now() - timedelta(hours=2),
+    )
+
+    call_command("process_price_refresh_jobs", "--once")
+
+    job.refresh_from_db()
+    assert job.status == PriceRefreshJob.DONE
+
+
+@pytest.mark.django_db
+def test_progress_reports_keep_the_job_alive(user):
+    enqueue_price_refresh(user)
+    job = claim_next_job()
+    job.heartbeat_at = timezone.now() - timedelta(hours=2)
+    job.save(update_fields=["heartbeat_at"])
+
+    def fake_refresh(user, progress=None):
+        progress(1, 2, 0)
+        # Another worker's requeue pass mid-run finds a fresh heartbeat
+        assert requeue_stale_jobs() == 0
+        return 1
+
+    with patch(
+        "vault.services.job_services.refresh_prices_for_user", side_effect=fake_refresh
+    ):
+        run_price_refresh_job(job)
+
+    job.refresh_from_db()
+    assert job.status == PriceRefreshJob.DONE
+
+
+@pytest.mark.django_db
+def test_async_setting_runs_the_job_on_the_async_path(user, settings):
+    settings.PRICE_REFRESH_ASYNC = True
+    enqueue_price_refresh(user)
+    calls = []
+
+    async def fake_refresh(user, progress=None):
+        await sync_to_async(progress)(2, 2, 0)
+        calls.append("refresh")
+        return 2
+
+    async def fake_heal(entries):
+        calls.append("heal")
+
+    with patch(
+        "vault.services.job_services.arefresh_prices_for_user",
+        side_effect=fake_refresh,
+    ), patch(
+        "vault.services.job_services.aheal_catalog_images", side_effect=fake_heal
+    ), patch(
+        "vault.services.job_services.refresh_prices_for_user"
+    ) as sync_refresh:
+        assert process_next_job()
+
+    assert calls == ["refresh", "heal"]
+    sync_refresh.assert_not_called()
+    job = PriceRefreshJob.objects.get()
+    assert job.status == PriceRefreshJob.DONE
+    assert job.cards_done == 2
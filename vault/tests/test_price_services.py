@@ -1,21 +1,30 @@
+import asyncio
+import threading
+
 import pytest
+from asgiref.sync import async_to_sync
 from unittest.mock import patch
 from django.conf import settings
 from decimal import Decimal
 from django.utils import timezone
 
-from vault.models import Card, PriceSnapshot
+from vault.models import Card, CatalogCard, PriceSnapshot, PriceSweepCheckpoint
+from django.core.management import call_command
+from vault.services.catalog_services import ensure_catalog_for_all_cards
 from vault.services.price_services import (
+    PriceWriteBuffer,
+    arefresh_prices_for_user,
+    refresh_all_prices,
     refresh_prices_for_user,
     create_initial_snapshot,
 )
 
 
 @pytest.mark.django_db
-@patch("vault.services.price_services.get_card_image_url_or_placeholder")
+@patch("vault.services.image_heal_services.lookup_card_image")
 @patch("vault.services.price_services.fetch_card_price")
 @patch("vault.services.price_services.extract_card_price")
-def test_refresh_heals_placeholder_image(
+def test_refresh_leaves_image_lookups_to_heal_pass(
     mock_extract,
     mock_fetch_price,
     mock_get_image,
@@ -37,14 +46,12 @@ def test_refresh_heals_placeholder_image(
     mock_fetch_price.return_value = {"ok": True}
     mock_extract.return_value = {"price": 10.0}
 
-    # Image side
-    mock_get_image.return_value = "https://example.com/real.png"
-
     refresh_prices_for_user(user)
 
     card.refresh_from_db()
 
-    assert card.image_url == "https://example.com/real.png"
+    mock_get_image.assert_not_called()
+    assert card.image_url == settings.CARD_IMAGE_PLACEHOLDER_URL
     assert card.price_last_updated == today
     assert card.value_usd == Decimal("10.0")
 
@@ -274,3 +281,373 @@ def test_create_initial_snapshot_saves_expected_snapshot_data(user):
     assert snapshot.source == "pokemonpricetracker"
     assert snapshot.currency == "USD"
     assert snapshot.as_of_date == timezone.localdate()
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+@patch("vault.services.price_services.extract_card_price")
+def test_refresh_fetches_once_per_set_and_name_group(
+    mock_extract,
+    mock_fetch_price,
+    user,
+):
+    for number in ("58", "173"):
+        Card.objects.create(
+            user=user,
+            card_name="Pikachu",
+            set_name="151",
+            language="EN",
+            card_number=number,
+            condition="NM",
+            image_url="valid_image_url",
+        )
+    Card.objects.create(
+        user=user,
+        card_name="pikachu ",
+        set_name="151",
+        language="EN",
+        card_number="25",
+        condition="NM",
+        image_url="valid_image_url",
+    )
+    Card.objects.create(
+        user=user,
+        card_name="Pikachu",
+        set_name="Paldea Evolved",
+        language="EN",
+        card_number="63",
+        condition="NM",
+        image_url="valid_image_url",
+    )
+
+    mock_fetch_price.return_value = {"ok": True}
+    mock_extract.return_value = {"price": 5.00}
+
+    stats = {}
+    assert refresh_prices_for_user(user, stats=stats) == 4
+
+    # One call for the three 151 Pikachus, one for Paldea Evolved
+    assert mock_fetch_price.call_count == 2
+    assert mock_extract.call_count == 4
+    assert stats == {"upstream_calls": 2, "calls_saved": 2}
+    assert PriceSnapshot.objects.count() == 4
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.extract_card_price")
+def test_refresh_fans_price_fetches_out_concurrently(mock_extract, settings, user):
+    settings.PRICE_REFRESH_MAX_WORKERS = 3
+    for name in ("Pikachu", "Bulbasaur", "Charmander"):
+        Card.objects.create(
+            user=user,
+            card_name=name,
+            set_name="151",
+            language="EN",
+            card_number="1",
+            condition="NM",
+            image_url="valid_image_url",
+        )
+
+    # Every fetch waits for the other two, so this only passes if all three
+    # are in flight at the same time
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_fetch(card_name, set_name):
+        barrier.wait()
+        return {"ok": True}
+
+    mock_extract.return_value = {"price": 3.00}
+
+    with patch("vault.services.price_services.fetch_card_price", fake_fetch):
+        assert refresh_prices_for_user(user) == 3
+
+    assert PriceSnapshot.objects.count() == 3
+    assert set(Card.objects.values_list("value_usd", flat=True)) == {Decimal("3.00")}
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+@patch("vault.services.price_services.extract_card_price")
+def test_refresh_reports_progress_counts(mock_extract, mock_fetch_price, user):
+    Card.objects.create(
+        user=user,
+        card_name="Pikachu",
+        set_name="151",
+        language="EN",
+        card_number="58",
+        condition="NM",
+        image_url="valid_image_url",
+        price_last_updated=timezone.localdate(),
+    )
+    Card.objects.create(
+        user=user,
+        card_name="Bulbasaur",
+        set_name="151",
+        language="EN",
+        card_number="1",
+        condition="NM",
+        image_url="valid_image_url",
+    )
+    Card.objects.create(
+        user=user,
+        card_name="Mew",
+        set_name="151",
+        language="EN",
+        card_number="151",
+        condition="NM",
+        image_url="valid_image_url",
+    )
+
+    mock_fetch_price.side_effect = lambda name, set_name: (
+        {"ok": True} if name == "Bulbasaur" else {"error": "not found"}
+    )
+    mock_extract.return_value = {"price": 1.00}
+    calls = []
+
+    refresh_prices_for_user(user, progress=lambda *counts: calls.append(counts))
+
+    # Starts with the already-current card done, ends with everything accounted for
+    assert calls[0] == (1, 3, 0)
+    assert calls[-1] == (3, 3, 1)
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+@patch("vault.services.price_services.extract_card_price")
+def test_refresh_writes_in_bulk_with_fixed_query_count(
+    mock_extract,
+    mock_fetch_price,
+    settings,
+    django_assert_max_num_queries,
+    user,
+):
+    settings.PRICE_REFRESH_WRITE_CHUNK_SIZE = 1000
+    for number in range(1, 21):
+        Card.objects.create(
+            user=user,
+            card_name=f"Card {number}",
+            set_name="151",
+            language="EN",
+            card_number=str(number),
+            condition="NM",
+            image_url="valid_image_url",
+        )
+
+    mock_fetch_price.return_value = {"ok": True}
+    mock_extract.return_value = {"price": 2.50}
+
+    # Card select, catalog create/select/link, one price table read for the
+    # set, then one flush: savepoint, catalog update, snapshot upsert, card
+    # update, rollup sum and upsert, release
+    with django_assert_max_num_queries(12):
+        assert refresh_prices_for_user(user) == 20
+
+    assert PriceSnapshot.objects.count() == 20
+    assert (
+        Card.objects.filter(
+            value_usd=Decimal("2.50"), price_last_updated=timezone.localdate()
+        ).count()
+        == 20
+    )
+
+
+@pytest.mark.django_db
+def test_price_write_buffer_flushes_in_chunks_and_upserts(user_card):
+    today = timezone.localdate()
+    PriceSnapshot.objects.create(card=user_card, as_of_date=today, price="1.00")
+
+    writer = PriceWriteBuffer(chunk_size=2)
+    writer.add(user_card, Decimal("4.00"), today)
+    assert PriceSnapshot.objects.get().price == Decimal("1.00")
+
+    other = Card.objects.create(
+        user=user_card.user,
+        card_name="Mew",
+        set_name="151",
+        language="EN",
+        card_number="151",
+        condition="NM",
+    )
+    # Second add reaches the chunk size and flushes both cards
+    writer.add(other, Decimal("9.00"), today)
+
+    assert PriceSnapshot.objects.count() == 2
+    assert PriceSnapshot.objects.get(card=user_card).price == Decimal("4.00")
+    user_card.refresh_from_db()
+    assert user_card.value_usd == Decimal("4.00")
+    assert writer.rows_written == 4
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+@patch("vault.services.price_services.extract_card_price")
+def test_refresh_all_prices_fetches_each_distinct_card_once(
+    mock_extract, mock_fetch_price, user, other_user, make_card
+):
+    make_card(user, "Pikachu", "58")
+    make_card(other_user, "pikachu", "58")
+    make_card(other_user, "Pikachu", "173")
+    make_card(user, "Bulbasaur", "1")
+    current = make_card(
+        other_user,
+        "Mew",
+        "151",
+        value_usd="3.00",
+        price_last_updated=timezone.localdate(),
+    )
+
+    mock_fetch_price.return_value = {"ok": True}
+    mock_extract.return_value = {"price": 7.00}
+
+    summary = refresh_all_prices()
+
+    assert summary == {
+        "distinct_keys": 3,
+        "upstream_calls": 2,
+        # 4 snapshots, 4 cards and the 3 catalog printings
+        "rows_written": 11,
+        "resumed": False,
+    }
+    assert mock_fetch_price.call_count == 2
+    assert PriceSnapshot.objects.count() == 4
+    assert not PriceSnapshot.objects.filter(card=current).exists()
+    assert Card.objects.filter(value_usd=Decimal("7.00")).count() == 4
+    assert PriceSweepCheckpoint.objects.get().completed_at is not None
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+@patch("vault.services.price_services.extract_card_price")
+def test_refresh_all_prices_resumes_after_checkpoint(
+    mock_extract, mock_fetch_price, user, make_card
+):
+    make_card(user, "Bulbasaur", "1")
+    make_card(user, "Pikachu", "58")
+    PriceSweepCheckpoint.objects.create(
+        as_of_date=timezone.localdate(),
+        last_key="151|bulbasaur",
+        distinct_keys=2,
+        upstream_calls=1,
+    )
+
+    mock_fetch_price.return_value = {"ok": True}
+    mock_extract.return_value = {"price": 7.00}
+
+    summary = refresh_all_prices()
+
+    mock_fetch_price.assert_called_once_with("Pikachu", "151")
+    assert summary["resumed"]
+    assert summary["upstream_calls"] == 2
+    assert summary["distinct_keys"] == 2
+
+    # --restart ignores the checkpoint and picks the skipped card back up
+    refresh_all_prices(restart=True)
+    mock_fetch_price.assert_called_with("Bulbasaur", "151")
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+@patch("vault.services.price_services.extract_card_price")
+def test_refresh_all_prices_counts_rows_from_every_flush(
+    mock_extract, mock_fetch_price, user, other_user, settings, make_card
+):
+    settings.PRICE_REFRESH_WRITE_CHUNK_SIZE = 2
+    for _ in range(5):
+        make_card(user, "Pikachu", "58")
+    # Printing already priced today, reused without a call before the sweep
+    make_card(other_user, "Mew", "151")
+    ensure_catalog_for_all_cards()
+    CatalogCard.objects.filter(card_name="Mew").update(
+        value_usd="3.00", price_last_updated=timezone.localdate()
+    )
+
+    mock_fetch_price.return_value = {"ok": True}
+    mock_extract.return_value = {"price": 7.00}
+
+    summary = refresh_all_prices()
+
+    # 6 snapshots, 6 cards and the Pikachu catalog printing
+    assert summary["rows_written"] == 13
+    assert summary["distinct_keys"] == 2
+    assert summary["upstream_calls"] == 1
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+@patch("vault.services.price_services.extract_card_price")
+def test_refresh_all_prices_command_prints_summary(
+    mock_extract, mock_fetch_price, user, capsys, make_card
+):
+    make_card(user, "Pikachu", "58")
+    mock_fetch_price.return_value = {"ok": True}
+    mock_extract.return_value = {"price": 7.00}
+
+    call_command("refresh_all_prices")
+
+    out = capsys.readouterr().out
+    assert "Distinct keys: 1 | upstream calls: 1 | rows written: 3" in out
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+def test_refresh_does_not_store_stale_fallback_prices(
+    mock_fetch_price, user, make_card
+):
+    card = make_card(user, "Pikachu", "25")
+    mock_fetch_price.return_value = {
+        "data": [
+            {
+                "name": "Pikachu",
+                "cardNumber": "025/165",
+                "prices": {"market": 4.5, "lastUpdated": "2025-11-05T10:00:00Z"},
+            }
+        ],
+        "stale": True,
+    }
+
+    assert refresh_prices_for_user(user) == 0
+
+    card.refresh_from_db()
+    assert card.price_last_updated is None
+    assert not PriceSnapshot.objects.exists()
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.extract_card_price")
+def test_async_refresh_gathers_lookups_on_one_loop(
+    mock_extract, user, settings, make_card
+):
+    settings.ASYNC_REFRESH_APPLY_BATCH_SIZE = 2
+    for name in ("Pikachu", "Bulbasaur", "Charmander"):
+        make_card(user, name, "1")
+    make_card(
+        user,
+        "Mew",
+        "151",
+        value_usd="9.00",
+        price_last_updated=timezone.localdate(),
+    )
+
+    # Each price fetch waits for the other two, so all must be in flight at once
+    barrier = asyncio.Barrier(3)
+
+    async def fake_afetch(client, card_name, set_name):
+        await asyncio.wait_for(barrier.wait(), timeout=5)
+        return {"ok": True}
+
+    mock_extract.return_value = {"price": 4.00}
+    reports = []
+    with patch(
+        "vault.services.price_services.afetch_card_price", side_effect=fake_afetch
+    ) as mock_afetch:
+        stats = {}
+        updated = async_to_sync(arefresh_prices_for_user)(
+            user, stats=stats, progress=lambda *counts: reports.append(counts)
+        )
+
+    assert updated == 3
+    assert mock_afetch.call_count == 3
+    assert stats["upstream_calls"] == 3
+    assert PriceSnapshot.objects.count() == 3
+    assert Card.objects.filter(value_usd=Decimal("4.00")).count() == 3
+    assert reports == [(1, 4, 0), (2, 4, 0), (3, 4, 0), (4, 4, 0)]
@@ -0,0 +1,175 @@
+import pytest
+import time
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from vault.forms import CardForm
+from vault.models import Card, CatalogCard, UpstreamSetIndex
+from vault.services import card_index_services
+from vault.services.price_services import refresh_prices_for_user
+from vault.services.price_table_services import (
+    lookup_table_price,
+    record_price_payload,
+)
+
+PAYLOAD = {
+    "data": [
+        {
+            "name": "Pikachu",
+            "cardNumber": "025/165",
+            "tcgPlayerId": 517045,
+            "prices": {"market": 4.5, "lastUpdated": "2025-11-05T10:00:00Z"},
+        },
+        {
+            "name": "Pikachu",
+            "cardNumber": "173/165",
+            "prices": {"market": 90.0, "lastUpdated": "2025-11-05T10:00:00Z"},
+        },
+    ]
+}
+
+pytestmark = pytest.mark.usefixtures("price_set_map")
+
+
+@pytest.fixture
+def price_set_map():
+    with patch("vault.services.price_table_services.PRICE_SET_MAP", {"151": "sv3pt5"}):
+        yield
+
+
+@pytest.mark.django_db
+def test_recorded_payload_answers_lookups_for_the_set():
+    table = record_price_payload("151", PAYLOAD)
+
+    assert set(table["by_number"]) == {"025", "173"}
+    assert lookup_table_price("151", "pikachu", "25") == {
+        "price": 4.5,
+        "price_date": "2025-11-05",
+        "tcgplayer_id": "517045",
+    }
+    assert lookup_table_price("151", "Pika", "173")["price"] == 90.0
+    # Right number, wrong card
+    assert lookup_table_price("151", "Charizard", "25") is None
+    assert lookup_table_price("151", "Pikachu", "58") is None
+
+    stored = UpstreamSetIndex.objects.get(
+        source=UpstreamSetIndex.PRICETRACKER, set_code="sv3pt5"
+    )
+    assert stored.entry_count == 2
+
+
+@pytest.mark.django_db
+def test_lookup_reads_the_stored_table_and_ignores_stale_rows(settings):
+    record_price_payload("151", PAYLOAD)
+    card_index_services.clear_card_index_memo()
+
+    assert lookup_table_price("151", "Pikachu", "25")["price"] == 4.5
+
+    settings.PRICE_TABLE_MAX_AGE_SECONDS = 60
+    later = time.time() + 120
+    with patch("vault.services.price_table_services.time.time", return_value=later):
+        assert lookup_table_price("151", "Pikachu", "25") is None
+
+
+@pytest.mark.django_db
+def test_card_form_prices_from_the_table_without_calling_out(monkeypatch):
+    record_price_payload("151", PAYLOAD)
+
+    def fail_fetch(*args, **kwargs):
+        raise AssertionError("price API should not be called")
+
+    monkeypatch.setattr("vault.forms.fetch_card_price", fail_fetch)
+    form = CardForm(
+        data={
+            "card_name": "Pikachu",
+            "set_name": "151",
+            "language": "EN",
+            "card_number": "25",
+            "condition": "NM",
+        }
+    )
+
+    assert form.is_valid()
+    assert form.cleaned_price["price"] == 4.5
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+def test_refresh_records_one_response_and_reuses_it(mock_fetch_price, user):
+    for number in ("25", "173"):
+        Card.objects.create(
+            user=user,
+            card_name="Pikachu",
+            set_name="151",
+            language="EN",
+            card_number=number,
+            condition="NM",
+            image_url="valid_image_url",
+        )
+    mock_fetch_price.return_value = PAYLOAD
+
+    assert refresh_prices_for_user(user) == 2
+    mock_fetch_price.assert_called_once()
+    prices = set(Card.objects.values_list("value_usd", flat=True))
+    assert prices == {Decimal("4.50"), Decimal("90.00")}
+    ids = set(CatalogCard.objects.values_list("tcgplayer_id", flat=True))
+    assert ids == {"517045", ""}
+
+    # A second pass inside the freshness window is answered by the table
+    Card.objects.update(price_last_updated=None)
+    stats = {}
+    assert refresh_prices_for_user(user, stats=stats) == 2
+    mock_fetch_price.assert_called_once()
+    assert stats == {"upstream_calls": 0, "calls_saved": 2}
+
+
+@pytest.mark.django_db
+def test_stale_fallback_payload_is_not_stored_as_fresh():
+    table = record_price_payload("151", {**PAYLOAD, "stale": True})
+
+    assert set(table["by_number"]) == {"025", "173"}
+    assert not UpstreamSetIndex.objects.exists()
+    assert lookup_table_price("151", "Pikachu", "25") is None
+
+
+@pytest.mark.django_db
+@patch("vault.services.price_services.fetch_card_price")
+def test_refresh_merges_the_set_table_once_per_flush(mock_fetch_price, user):
+    names = ("Pikachu", "Bulbasaur", "Mew")
+    for number, name in enumerate(names, start=1):
+        Card.objects.create(
+            user=user,
+            card_name=name,
+            set_name="151",
+            language="EN",
+            card_number=str(number),
+            condition="NM",
+        )
+
+    def fake_fetch(card_name, set_name):
+        number = f"{names.index(card_name) + 1:03d}/165"
+        return {
+            "data": [
+                {
+                    "name": card_name,
+                    "cardNumber": number,
+                    "prices": {"market": 1.0, "lastUpdated": "2025-11-05T10:00:00Z"},
+                }
+            ]
+        }
+
+    mock_fetch_price.side_effect = fake_fetch
+    with CaptureQueriesContext(connection) as queries:
+        assert refresh_prices_for_user(user) == 3
+
+    table_writes = [
+        q["sql"]
+        for q in queries.captured_queries
+        if q["sql"].startswith("UPDATE") and "upstreamsetindex" in q["sql"]
+    ]
+    assert len(table_writes) == 1
+    stored = UpstreamSetIndex.objects.get(set_code="sv3pt5")
+    assert stored.entry_count == 3
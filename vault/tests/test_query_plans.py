@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+
+from vault.models import Card
+from vault.services.card_list_services import SORT_KEYS, sorted_cards
+
+SORT_INDEXES = {
+    "value_desc": "card_user_value_desc_idx",
+    "value_asc": "card_user_value_asc_idx",
+    "set_asc": "card_user_set_asc_idx",
+    "set_desc": "card_user_set_desc_idx",
+}
+
+
+@pytest.fixture
+def postgres_plans(user, other_user):
+    if connection.vendor != "postgresql":
+        pytest.skip("Query plans are only checked on PostgreSQL")
+    for owner in (user, other_user):
+        Card.objects.bulk_create(
+            Card(
+                user=owner,
+                card_name=f"Card {i}",
+                set_name="151",
+                language="EN",
+                card_number=str(i % 165 + 1),
+                condition="NM",
+                value_usd=i if i % 4 else None,
+            )
+            for i in range(500)
+        )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE vault_card")
+        # A test-sized table is cheap to scan, make the planner show its hand
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("sort", sorted(SORT_KEYS))
+def test_card_list_sorts_read_their_index(postgres_plans, user, sort):
+    plan = sorted_cards(user, sort)[:50].explain()
+
+    assert f"Index Scan using {SORT_INDEXES[sort]}" in plan
+    # The index already returns rows in order
+    assert "Sort Key" not in plan
+
+
+@pytest.mark.django_db
+def test_duplicate_check_uses_functional_index(postgres_plans, user):
+    # Same lookups as Card.clean
+    plan = Card.objects.filter(
+        user=user,
+        card_name__iexact="card 7",
+        set_name__iexact="151",
+        card_number="8",
+    ).explain()
+
+    assert "card_user_dup_check_idx" in plan
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from vault.rate_limit import TokenBucket
+
+
+class FakeClock:
+    """Stands in for the time module; sleeping just moves the clock forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch("vault.rate_limit.time", fake):
+        yield fake
+
+
+def test_bucket_allows_burst_then_paces_to_rate(clock):
+    bucket = TokenBucket("test", rate=2, capacity=3)
+
+    for _ in range(3):
+        assert bucket.acquire()
+    assert clock.slept == []
+
+    # Fourth call has to wait for half a second of refill at 2 tokens/s
+    assert bucket.acquire()
+    assert clock.slept == [0.5]
+
+    metrics = bucket.metrics()
+    assert metrics["throttled_calls"] == 1
+    assert metrics["throttle_wait_seconds"] == 0.5
+
+
+def test_bucket_gives_up_past_max_wait(clock):
+    bucket = TokenBucket("test", rate=1, capacity=1)
+    assert bucket.acquire()
+
+    assert not bucket.acquire(max_wait=0.5)
+    assert clock.slept == []
+
+
+def test_block_for_pauses_callers_until_retry_after(clock):
+    bucket = TokenBucket("test", rate=10, capacity=5)
+    bucket.block_for(4)
+
+    assert bucket.metrics()["blocked_for_seconds"] == 4
+    assert bucket.acquire()
+    assert sum(clock.slept) >= 4
+
+
+def test_shared_bucket_keeps_budget_in_cache(clock):
+    first = TokenBucket("shared-test", rate=1, capacity=2, shared=True)
+    second = TokenBucket("shared-test", rate=1, capacity=2, shared=True)
+
+    assert first.acquire()
+    assert first.acquire()
+
+    # Another process sees the drained bucket and has to wait for a refill
+    assert second.metrics()["tokens_available"] == 0
+    assert second.acquire()
+    assert clock.slept == [1.0]
+
+
+def test_async_acquire_waits_on_the_event_loop(clock):
+    bucket = TokenBucket("test", rate=2, capacity=1)
+
+    async def fake_sleep(seconds):
+        clock.now += seconds
+        clock.slept.append(seconds)
+
+    async def take_two():
+        return [await bucket.aacquire(), await bucket.aacquire()]
+
+    with patch("vault.rate_limit.asyncio.sleep", side_effect=fake_sleep):
+        assert asyncio.run(take_two()) == [True, True]
+
+    assert clock.slept == [0.5]
+    assert bucket.metrics()["throttled_calls"] == 1
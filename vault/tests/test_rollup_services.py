@@ -0,0 +1,133 @@
+import importlib
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.apps import apps
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from vault.models import CollectionValueRollup, PriceSnapshot
+from vault.services.price_services import PriceWriteBuffer, create_initial_snapshot
+from vault.services.rollup_services import (
+    rebuild_collection_rollups,
+    refresh_collection_rollups,
+)
+
+
+def _totals(user):
+    return {
+        r.as_of_date: (r.total_value, r.card_count)
+        for r in CollectionValueRollup.objects.filter(user=user)
+    }
+
+
+@pytest.mark.django_db
+def test_write_buffer_keeps_rollups_in_step(user, other_user, make_card):
+    today = timezone.localdate()
+    mine = [make_card(user, "Pikachu", "25"), make_card(user, "Mew", "151")]
+    theirs = make_card(other_user, "Eevee", "133")
+
+    writer = PriceWriteBuffer()
+    writer.add(mine[0], Decimal("2.00"), today)
+    writer.add(mine[1], Decimal("3.50"), today)
+    writer.add(theirs, Decimal("9.00"), today)
+    writer.flush()
+
+    assert _totals(user) == {today: (Decimal("5.50"), 2)}
+    assert _totals(other_user) == {today: (Decimal("9.00"), 1)}
+
+    # Re-pricing the same day replaces the day's total
+    writer.add(mine[0], Decimal("4.00"), today)
+    writer.flush()
+    assert _totals(user) == {today: (Decimal("7.50"), 2)}
+
+
+@pytest.mark.django_db
+def test_initial_snapshot_updates_rollup(user, make_card):
+    card = make_card(user, "Pikachu", "25")
+    card.value_usd = Decimal("6.00")
+
+    create_initial_snapshot(card)
+
+    assert _totals(user) == {timezone.localdate(): (Decimal("6.00"), 1)}
+
+
+@pytest.mark.django_db
+def test_deleting_a_card_resums_its_days(client, user, make_card):
+    today = timezone.localdate()
+    yesterday = today - timedelta(days=1)
+    keep = make_card(user, "Pikachu", "25")
+    drop = make_card(user, "Mew", "151")
+    PriceSnapshot.objects.create(card=keep, as_of_date=today, price="1.00")
+    PriceSnapshot.objects.create(card=drop, as_of_date=today, price="2.00")
+    PriceSnapshot.objects.create(card=drop, as_of_date=yesterday, price="2.00")
+    rebuild_collection_rollups(user)
+
+    client.force_login(user)
+    client.post(reverse("card-delete", args=[drop.pk]))
+
+    assert _totals(user) == {today: (Decimal("1.00"), 1)}
+
+
+@pytest.mark.django_db
+def test_refresh_drops_days_without_snapshots(user):
+    day = timezone.localdate()
+    CollectionValueRollup.objects.create(
+        user=user, as_of_date=day, total_value="3.00", card_count=1
+    )
+
+    refresh_collection_rollups([(user.pk, day)])
+
+    assert not CollectionValueRollup.objects.exists()
+
+
+@pytest.mark.django_db
+def test_series_reads_rollups_not_snapshots(client, user, django_assert_num_queries):
+    today = timezone.localdate()
+    for offset in range(3):
+        CollectionValueRollup.objects.create(
+            user=user,
+            as_of_date=today - timedelta(days=offset),
+            total_value=Decimal(offset + 1),
+            card_count=1,
+        )
+    client.force_login(user)
+
+    # Session, user, vault watermark, then the rollup rows
+    with django_assert_num_queries(4):
+        data = client.get(reverse("collection-value-series")).json()
+
+    assert [row["value"] for row in data] == ["3.00", "2.00", "1.00"]
+
+
+@pytest.mark.django_db
+def test_rebuild_command_matches_snapshots(user, other_user, capsys, make_card):
+    today = timezone.localdate()
+    for owner, price in ((user, "1.25"), (other_user, "4.00")):
+        card = make_card(owner, "Pikachu", "25")
+        PriceSnapshot.objects.create(card=card, as_of_date=today, price=price)
+    CollectionValueRollup.objects.create(
+        user=user, as_of_date=today - timedelta(days=9), total_value="1", card_count=1
+    )
+
+    call_command("rebuild_collection_rollups")
+
+    assert "Rollup rows written: 2" in capsys.readouterr().out
+    assert _totals(user) == {today: (Decimal("1.25"), 1)}
+    assert _totals(other_user) == {today: (Decimal("4.00"), 1)}
+
+
+@pytest.mark.django_db
+def test_backfill_migration_sums_existing_snapshots(user, make_card):
+    today = timezone.localdate()
+    for name, number, price in (("Pikachu", "25", "1.00"), ("Mew", "151", "2.00")):
+        card = make_card(user, name, number)
+        PriceSnapshot.objects.create(card=card, as_of_date=today, price=price)
+
+    migration = importlib.import_module(
+        "vault.migrations.0019_backfill_collection_rollups"
+    )
+    migration.backfill_rollups(apps, None)
+
+    assert _totals(user) == {today: (Decimal("3.00"), 2)}
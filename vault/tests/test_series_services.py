@@ -0,0 +1,170 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.urls import reverse
+from django.utils import timezone
+
+from vault.models import PriceSnapshot
+from vault.services.series_services import (
+    bucket_series,
+    carry_forward_series,
+    downsample_lttb,
+)
+
+D1 = date(2025, 1, 1)
+
+
+def _snap(card, offset, price):
+    PriceSnapshot.objects.create(
+        card=card, as_of_date=D1 + timedelta(days=offset), price=Decimal(price)
+    )
+
+
+@pytest.fixture
+def history(user, other_user, make_card):
+    pikachu = make_card(user, "Pikachu", "25")
+    mew = make_card(user, "Mew", "151")
+    _snap(pikachu, 0, "2.00")
+    _snap(mew, 0, "10.00")
+    # Day 1 only Pikachu was refreshed, day 2 nothing, day 3 only Mew
+    _snap(pikachu, 1, "3.00")
+    _snap(mew, 3, "8.00")
+    _snap(make_card(other_user, "Eevee", "133"), 1, "50.00")
+    return pikachu, mew
+
+
+def _values(series):
+    return [(day - D1).days for day, _ in series], [str(v) for _, v in series]
+
+
+@pytest.mark.django_db
+def test_carry_forward_keeps_last_known_prices(user, history):
+    series = carry_forward_series(user, end=D1 + timedelta(days=4))
+
+    assert _values(series) == (
+        [0, 1, 2, 3, 4],
+        ["12.00", "13.00", "13.00", "11.00", "11.00"],
+    )
+
+
+@pytest.mark.django_db
+def test_carry_forward_seeds_prices_from_before_the_range(user, history):
+    series = carry_forward_series(
+        user, start=D1 + timedelta(days=2), end=D1 + timedelta(days=3)
+    )
+
+    assert _values(series) == ([2, 3], ["13.00", "11.00"])
+
+
+@pytest.mark.django_db
+def test_carry_forward_with_no_history_is_empty(user):
+    assert carry_forward_series(user) == []
+
+
+@pytest.mark.django_db
+def test_series_endpoint_carry_forward_option(client, user, make_card):
+    today = timezone.localdate()
+    pikachu = make_card(user, "Pikachu", "25")
+    mew = make_card(user, "Mew", "151")
+    PriceSnapshot.objects.create(card=pikachu, as_of_date=today - timedelta(1), price=2)
+    PriceSnapshot.objects.create(card=mew, as_of_date=today - timedelta(1), price=5)
+    PriceSnapshot.objects.create(card=pikachu, as_of_date=today, price=3)
+    client.force_login(user)
+
+    response = client.get(
+        reverse("collection-value-series"), {"range": "30d", "carry_forward": "1"}
+    )
+
+    assert response.json() == [
+        {"date": (today - timedelta(1)).isoformat(), "value": "7.00"},
+        {"date": today.isoformat(), "value": "8.00"},
+    ]
+
+
+def _daily(values, first=date(2025, 1, 30)):
+    return [(first + timedelta(days=i), Decimal(v)) for i, v in enumerate(values)]
+
+
+@pytest.mark.parametrize(
+    "agg, expected",
+    [
+        ("last", ["2", "4"]),
+        ("avg", ["1.50", "3.50"]),
+        ("min", ["1", "3"]),
+        ("max", ["2", "4"]),
+    ],
+)
+def test_bucket_series_month(agg, expected):
+    # Jan 30-31 in one bucket, Feb 1-2 in the next
+    series = bucket_series(_daily(["1", "2", "3", "4"]), "month", agg)
+
+    assert [day for day, _ in series] == [date(2025, 1, 1), date(2025, 2, 1)]
+    assert [str(value) for _, value in series] == expected
+
+
+def test_bucket_series_week_starts_on_monday():
+    # 2025-01-30 is a Thursday
+    series = bucket_series(_daily(["1", "2", "3", "4", "5"]), "week", "last")
+
+    assert series == [
+        (date(2025, 1, 27), Decimal("4")),
+        (date(2025, 2, 3), Decimal("5")),
+    ]
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    values = ["10"] * 100
+    values[37] = "500"
+    points = _daily(values)
+
+    sampled = downsample_lttb(points, 10)
+
+    assert len(sampled) == 10
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert points[37] in sampled
+    assert sampled == sorted(sampled)
+
+
+def test_lttb_under_budget_returns_everything():
+    points = _daily(["1", "2", "3"])
+
+    assert downsample_lttb(points, 10) == points
+
+
+@pytest.mark.django_db
+def test_series_endpoint_columnar_and_bucketed(client, user, make_card):
+    today = timezone.localdate()
+    pikachu = make_card(user, "Pikachu", "25")
+    for offset in range(20):
+        PriceSnapshot.objects.create(
+            card=pikachu, as_of_date=today - timedelta(offset), price=offset + 1
+        )
+    client.force_login(user)
+    url = reverse("collection-value-series")
+
+    columns = client.get(
+        url, {"range": "30d", "carry_forward": "1", "format": "columns", "points": 5}
+    ).json()
+    assert len(columns["dates"]) == len(columns["values"]) == 5
+    assert columns["dates"][-1] == today.isoformat()
+    assert columns["values"][-1] == 1.0
+
+    weekly = client.get(
+        url, {"range": "30d", "carry_forward": "1", "bucket": "week", "agg": "max"}
+    ).json()
+    assert weekly[0]["value"] == "20.00"
+    assert len(weekly) in (3, 4)
+
+    assert client.get(url, {"bucket": "year"}).status_code == 400
+    assert client.get(url, {"points": "lots"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_graph_page_reads_the_rollup_series(client, user):
+    client.force_login(user)
+
+    page = client.get(reverse("collection-graph")).content.decode()
+
+    assert "collection-value-series/?range=" in page
+    # Carry-forward scans raw snapshots, it stays opt-in on the endpoint
+    assert "carry_forward" not in page
@@ -0,0 +1,178 @@
+import io
+import pytest
+from unittest.mock import MagicMock, patch
+from django.urls import reverse
+from PIL import Image
+
+from vault.models import Card
+from vault.services.catalog_services import get_or_create_catalog_card
+from vault.services.thumbnail_services import (
+    mirror_catalog_image,
+    mirror_catalog_images,
+    render_thumbnails,
+    thumbnail_name,
+    thumbnail_storage,
+)
+from vault.utils import get_breaker
+
+IMAGE_URL = "https://assets.tcgdex.net/en/sv/sv03.5/025/high.png"
+
+
+def _png(width=600, height=825):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(out, "PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def image_root(settings, tmp_path):
+    settings.CARD_IMAGE_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def entry(db):
+    entry = get_or_create_catalog_card(
+        card_name="Pikachu", set_name="151", card_number="25"
+    )
+    entry.image_url = IMAGE_URL
+    entry.save()
+    return entry
+
+
+def _session(content):
+    session = MagicMock()
+    session.get.return_value = MagicMock(status_code=200, content=content)
+    return session
+
+
+def test_render_thumbnails_scales_to_each_width():
+    ext, thumbnails = render_thumbnails(_png())
+
+    assert ext in ("webp", "png")
+    for width in (200, 400):
+        with Image.open(io.BytesIO(thumbnails[width])) as thumb:
+            assert thumb.size == (width, width * 825 // 600)
+    assert len(thumbnails[200]) < len(_png())
+
+
+@pytest.mark.django_db
+@patch("vault.utils.get_http_session")
+def test_mirror_downloads_once(mock_session, image_root, entry):
+    mock_session.return_value = _session(_png())
+
+    assert mirror_catalog_image(entry) is True
+    assert mirror_catalog_images() == {"mirrored": 0, "failed": 0}
+
+    entry.refresh_from_db()
+    storage = thumbnail_storage()
+    assert storage.exists(thumbnail_name(entry.image_mirror, 200))
+    assert storage.exists(thumbnail_name(entry.image_mirror, 400))
+    assert mock_session.return_value.get.call_count == 1
+
+
+@pytest.mark.django_db
+@patch("vault.utils.get_http_session")
+def test_mirror_skips_unreadable_images(mock_session, image_root, entry):
+    mock_session.return_value = _session(b"<html>not an image</html>")
+
+    assert mirror_catalog_images() == {"mirrored": 0, "failed": 1}
+    # Backed off, not fetched again on the next pass
+    assert mirror_catalog_images() == {"mirrored": 0, "failed": 0}
+    assert mock_session.return_value.get.call_count == 1
+
+    entry.refresh_from_db()
+    assert entry.image_mirror == ""
+    assert entry.image_attempts == 1
+    assert entry.image_next_attempt_at is not None
+
+
+@pytest.mark.django_db
+@patch("vault.utils.get_http_session")
+def test_card_list_uses_thumbnails(mock_session, client, user, image_root, entry):
+    mock_session.return_value = _session(_png())
+    mirror_catalog_image(entry)
+    Card.objects.create(
+        user=user,
+        card_name="Pikachu",
+        set_name="151",
+        language="EN",
+        card_number="25",
+        condition="NM",
+        image_url=IMAGE_URL,
+        catalog=entry,
+    )
+    client.force_login(user)
+
+    html = client.get(reverse("card-list")).content.decode()
+    assert entry.thumbnail_srcset in html
+    assert IMAGE_URL not in html
+
+    image = client.get(entry.thumbnail_url(400))
+    assert image.status_code == 200
+    assert "immutable" in image["Cache-Control"]
+    assert image["Content-Type"].startswith("image/")
+
+
+def test_card_image_rejects_unknown_names(client, image_root):
+    for name in ("..%2Fsettings.py", "0123456789abcdef-200.webp"):
+        response = client.get(f"/cards/images/{name}")
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+@patch("vault.utils.get_http_session")
+def test_mirroring_invalidates_cached_card_lists(
+    mock_session, client, user, image_root, entry
+):
+    Card.objects.create(
+        user=user,
+        card_name="Pikachu",
+        set_name="151",
+        language="EN",
+        card_number="25",
+        condition="NM",
+        image_url=IMAGE_URL,
+        catalog=entry,
+    )
+    client.force_login(user)
+    url = reverse("card-list-api")
+    etag = client.get(url)["ETag"]
+
+    mock_session.return_value = _session(_png())
+    mirror_catalog_image(entry)
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    entry.refresh_from_db()
+    assert response.json()["results"][0]["thumbnail_srcset"] == entry.thumbnail_srcset
+
+
+@pytest.mark.django_db
+@patch("vault.utils.get_http_session")
+def test_mirror_pass_is_batched(mock_session, settings, image_root, entry):
+    settings.IMAGE_MIRROR_BATCH_SIZE = 1
+    other = get_or_create_catalog_card(
+        card_name="Mew", set_name="151", card_number="151"
+    )
+    other.image_url = IMAGE_URL.replace("025", "151")
+    other.save()
+    mock_session.return_value = _session(_png())
+
+    assert mirror_catalog_images() == {"mirrored": 1, "failed": 0}
+    assert mirror_catalog_images() == {"mirrored": 1, "failed": 0}
+    assert mirror_catalog_images() == {"mirrored": 0, "failed": 0}
+
+
+@pytest.mark.django_db
+@patch("vault.utils.get_http_session")
+def test_mirror_pass_stops_while_image_host_circuit_is_open(
+    mock_session, settings, image_root, entry
+):
+    settings.CIRCUIT_BREAKER_FAILURES = 1
+    get_breaker(IMAGE_URL).record_failure()
+
+    assert mirror_catalog_images() == {"mirrored": 0, "failed": 0}
+    mock_session.return_value.get.assert_not_called()
+    entry.refresh_from_db()
+    assert entry.image_attempts == 0
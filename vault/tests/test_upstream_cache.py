@@ -0,0 +1,40 @@
+from unittest.mock import patch
+
+from vault.upstream_cache import (
+    get_cache_stats,
+    get_cached,
+    reset_cache_stats,
+    set_cached,
+)
+
+
+def test_cache_round_trip_and_stats():
+    reset_cache_stats()
+
+    assert get_cached("price", "151", "Pikachu") is None
+    set_cached("price", "151", "Pikachu", {"data": [1]})
+
+    # Lookups are case and whitespace insensitive on the search name
+    assert get_cached("price", "151", " pikachu ") == {"data": [1]}
+    assert get_cached("price", "Paldea Evolved", "Pikachu") is None
+    assert get_cached("tcgdex", "151", "Pikachu") is None
+
+    stats = get_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 0
+    assert stats["hit_rate"] == 0.25
+
+
+def test_expired_entries_count_as_evictions_but_can_be_served_stale(settings):
+    settings.UPSTREAM_CACHE_TTLS = {"price": 60}
+    reset_cache_stats()
+
+    with patch("vault.upstream_cache.time.time", return_value=1000):
+        set_cached("price", "151", "Mew", {"data": []})
+
+    with patch("vault.upstream_cache.time.time", return_value=1061):
+        assert get_cached("price", "151", "Mew") is None
+        assert get_cached("price", "151", "Mew", allow_stale=True) == {"data": []}
+
+    assert get_cache_stats()["evictions"] == 2
@@ -1,7 +1,31 @@
 # Test helper functions
 
 
-from vault.utils import _pad_card_number_for_image, extract_card_price
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+import requests
+
+from vault import utils
+from vault.deadline import Deadline
+from vault.upstream_cache import set_cached
+from vault.utils import (
+    CircuitOpenError,
+    _pad_card_number_for_image,
+    _upstream_get,
+    afetch_card_data,
+    afetch_card_price,
+    async_http_client,
+    get_breaker,
+    extract_card_price,
+    fetch_card_data,
+    index_price_payload,
+    fetch_card_price,
+)
 
 
 def test_pad_card_number_for_image():
@@ -67,3 +91,468 @@ def test_extract_card_price_card_not_found(monkeypatch):
 
     result = extract_card_price(mock_data, "1")
     assert result["error"] == "Card number 001 not found"
+
+
+def test_extract_card_price_from_indexed_table():
+    """First variant per number wins, and the table can be reused"""
+
+    table = index_price_payload(
+        {
+            "data": [
+                {"name": "Pikachu", "cardNumber": "025/165"},
+                {
+                    "name": "Pikachu",
+                    "cardNumber": "025/165",
+                    "tcgPlayerId": 517045,
+                    "prices": {"market": 4.5, "lastUpdated": "2025-11-05T10:00:00Z"},
+                },
+                {
+                    "name": "Pikachu",
+                    "cardNumber": "025/165",
+                    "prices": {"market": 9.9, "lastUpdated": "2025-11-05T10:00:00Z"},
+                },
+            ]
+        }
+    )
+
+    assert extract_card_price(table, 25) == {
+        "price": 4.5,
+        "price_date": "2025-11-05",
+        "tcgplayer_id": "517045",
+    }
+    assert extract_card_price(table, "173")["error"] == "Card number 173 not found"
+
+
+def test_fetch_card_price_caps_concurrent_requests_per_host(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    settings.UPSTREAM_MAX_CONCURRENCY_PER_HOST = 2
+    utils._host_semaphores.clear()
+
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_get(*args, **kwargs):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return MagicMock(status_code=200, json=lambda: {"data": []})
+
+    with patch("vault.utils.requests.Session.get", side_effect=fake_get):
+        threads = [
+            threading.Thread(target=fetch_card_price, args=(f"Card {i}", "151"))
+            for i in range(6)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    utils._host_semaphores.clear()
+    assert peak == 2
+
+
+def test_fetch_card_price_reuses_cached_response(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    payload = {"data": [{"cardNumber": "058/165"}]}
+    ok = MagicMock(status_code=200, json=lambda: payload)
+
+    with patch("vault.utils.requests.Session.get", return_value=ok) as mock_get:
+        assert fetch_card_price("Pikachu", "151") == payload
+        # Another user asking for the same card is served from the cache
+        assert fetch_card_price("pikachu", "151") == payload
+
+    mock_get.assert_called_once()
+
+
+def test_fetch_card_price_does_not_cache_errors(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    missing = MagicMock(status_code=404, text="not found")
+
+    with patch("vault.utils.requests.Session.get", return_value=missing) as mock_get:
+        assert fetch_card_price("Pikachu", "151")["status"] == 404
+        assert fetch_card_price("Pikachu", "151")["status"] == 404
+
+    assert mock_get.call_count == 2
+
+
+def test_fetch_card_data_caches_set_candidates_across_card_numbers():
+    listing = [
+        {"id": "sv03.5-025", "name": "Pikachu", "image": "https://img/sv03.5/025"},
+        {"id": "sv03.5-173", "name": "Pikachu", "image": "https://img/sv03.5/173"},
+        {"id": "sv01-063", "name": "Pikachu", "image": "https://img/sv01/063"},
+    ]
+    ok = MagicMock(status_code=200, json=lambda: listing)
+
+    with patch("vault.utils.requests.Session.get", return_value=ok) as mock_get:
+        first = fetch_card_data("Pikachu", "151", "25")
+        second = fetch_card_data("Pikachu", "151", "173")
+
+    mock_get.assert_called_once()
+    assert first["card_id"] == "sv03.5-025"
+    assert second["image_url"] == "https://img/sv03.5/173/high.png"
+
+
+def test_fetch_card_price_honors_retry_after_on_429(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    limited = MagicMock(status_code=429, text="slow down", headers={"Retry-After": "7"})
+    ok = MagicMock(status_code=200, json=lambda: {"data": []})
+
+    with (
+        patch(
+            "vault.utils.requests.Session.get", side_effect=[limited, ok]
+        ) as mock_get,
+        patch("vault.rate_limit.TokenBucket.block_for") as mock_block,
+        patch("vault.rate_limit.TokenBucket.acquire", return_value=True),
+    ):
+        assert fetch_card_price("Pikachu", "151") == {"data": []}
+
+    assert mock_get.call_count == 2
+    mock_block.assert_called_once_with(7.0)
+
+
+def test_fetch_card_price_backs_off_on_server_errors_then_gives_up(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    settings.PRICE_API_MAX_RETRIES = 2
+    settings.PRICE_API_BACKOFF_BASE_SECONDS = 1.0
+    broken = MagicMock(status_code=503, text="down", headers={})
+
+    with (
+        patch("vault.utils.requests.Session.get", return_value=broken) as mock_get,
+        patch("vault.utils.time.sleep") as mock_sleep,
+    ):
+        result = fetch_card_price("Pikachu", "151")
+
+    assert result == {"error": "down", "status": 503}
+    assert mock_get.call_count == 3
+    # Jittered exponential backoff: [0.5, 1.0) then [1.0, 2.0)
+    first, second = [c.args[0] for c in mock_sleep.call_args_list]
+    assert 0.5 <= first <= 1.0
+    assert 1.0 <= second <= 2.0
+
+
+def test_fetch_card_price_gives_up_when_limiter_budget_is_exhausted(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+
+    with (
+        patch("vault.rate_limit.TokenBucket.acquire", return_value=False),
+        patch("vault.utils.requests.Session.get") as mock_get,
+    ):
+        result = fetch_card_price("Pikachu", "151")
+
+    assert result["status"] == 429
+    mock_get.assert_not_called()
+
+
+def test_fetch_card_price_passes_remaining_budget_as_timeout(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    settings.UPSTREAM_TIMEOUT_SECONDS = 10
+    ok = MagicMock(status_code=200, json=lambda: {"data": []})
+
+    with patch("vault.utils.requests.Session.get", return_value=ok) as mock_get:
+        fetch_card_price("Pikachu", "151", deadline=Deadline(2))
+
+    assert 0 < mock_get.call_args.kwargs["timeout"] <= 2
+
+
+def test_expired_deadline_serves_stale_price_without_calling_out(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    settings.UPSTREAM_CACHE_TTLS = {"price": 60}
+    with patch("vault.upstream_cache.time.time", return_value=1000):
+        set_cached("price", "151", "Pikachu", {"data": [1]})
+
+    with (
+        patch("vault.upstream_cache.time.time", return_value=2000),
+        patch("vault.utils.requests.Session.get") as mock_get,
+    ):
+        stale = fetch_card_price("Pikachu", "151", deadline=Deadline(0))
+        missing = fetch_card_price("Mew", "151", deadline=Deadline(0))
+
+    mock_get.assert_not_called()
+    assert stale == {"data": [1], "stale": True}
+    assert missing == {"error": "Request budget exhausted"}
+
+
+def test_fetch_card_price_skips_retry_that_would_overrun_budget(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    limited = MagicMock(status_code=429, text="slow", headers={"Retry-After": "30"})
+
+    with (
+        patch("vault.utils.requests.Session.get", return_value=limited) as mock_get,
+        patch("vault.utils.time.sleep") as mock_sleep,
+    ):
+        result = fetch_card_price("Pikachu", "151", deadline=Deadline(5))
+
+    assert result == {"error": "Request budget exhausted"}
+    mock_get.assert_called_once()
+    mock_sleep.assert_not_called()
+
+
+def test_expired_deadline_falls_back_to_stale_card_data(settings):
+    settings.UPSTREAM_CACHE_TTLS = {"tcgdex": 60}
+    listing = [{"id": "sv03.5-025", "name": "Pikachu", "image": "https://img/025"}]
+    with patch("vault.upstream_cache.time.time", return_value=1000):
+        set_cached("tcgdex", "sv03.5", "Pikachu", listing)
+
+    with (
+        patch("vault.upstream_cache.time.time", return_value=2000),
+        patch("vault.utils.requests.Session.get") as mock_get,
+    ):
+        result = fetch_card_data("Pikachu", "151", "25", deadline=Deadline(0))
+
+    mock_get.assert_not_called()
+    assert result["image_url"] == "https://img/025/high.png"
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert utils._parse_retry_after("12") == 12.0
+    assert utils._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert utils._parse_retry_after(None) is None
+    assert utils._parse_retry_after("soon") is None
+
+
+def test_http_session_is_pooled_and_reused(settings):
+    settings.UPSTREAM_POOL_SIZE = 16
+    utils.reset_http_session()
+
+    session = utils.get_http_session()
+
+    assert utils.get_http_session() is session
+    adapter = session.get_adapter("https://api.tcgdex.net/v2/en/cards")
+    assert adapter._pool_maxsize == 16
+    assert adapter.max_retries.status == 0
+    assert "gzip" in session.headers["Accept-Encoding"]
+    utils.reset_http_session()
+
+
+def test_upstream_clients_route_through_shared_session(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    ok = MagicMock(status_code=200, json=lambda: [])
+    session = MagicMock()
+    session.get.return_value = ok
+
+    with patch("vault.utils.get_http_session", return_value=session):
+        fetch_card_price("Pikachu", "151")
+        fetch_card_data("Pikachu", "151", "25")
+
+    urls = [c.args[0] for c in session.get.call_args_list]
+    assert urls == [
+        "https://www.pokemonpricetracker.com/api/v2/cards",
+        "https://api.tcgdex.net/v2/en/cards",
+    ]
+
+
+def test_breaker_opens_after_consecutive_failures_and_fails_fast(settings):
+    settings.CIRCUIT_BREAKER_FAILURES = 2
+    down = MagicMock(status_code=503)
+    url = "https://api.tcgdex.net/v2/en/cards"
+
+    with patch("vault.utils.requests.Session.get", return_value=down) as mock_get:
+        _upstream_get(url)
+        _upstream_get(url)
+        try:
+            _upstream_get(url)
+            assert False, "expected CircuitOpenError"
+        except CircuitOpenError:
+            pass
+
+    assert mock_get.call_count == 2
+    state = get_breaker(url).state()
+    assert state["state"] == "open"
+    assert state["consecutive_failures"] == 2
+
+
+def test_breaker_success_resets_failure_count(settings):
+    settings.CIRCUIT_BREAKER_FAILURES = 2
+    url = "https://api.tcgdex.net/v2/en/cards"
+    responses = [MagicMock(status_code=500), MagicMock(status_code=200)] * 2
+
+    with patch("vault.utils.requests.Session.get", side_effect=responses):
+        for _ in responses:
+            _upstream_get(url)
+
+    assert get_breaker(url).state()["state"] == "closed"
+
+
+def test_breaker_half_opens_with_a_single_probe(settings):
+    settings.CIRCUIT_BREAKER_FAILURES = 1
+    settings.CIRCUIT_BREAKER_RESET_SECONDS = 30
+    breaker = get_breaker("www.pokemonpricetracker.com")
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    with patch("vault.utils.time.time", return_value=time.time() + 31):
+        assert breaker.state()["state"] == "half_open"
+        # only one worker gets to probe
+        assert breaker.allow()
+        assert not breaker.allow()
+        # a failed probe opens it again for another window
+        breaker.record_failure()
+        assert breaker.state()["state"] == "open"
+
+    breaker.record_success()
+    assert breaker.state() == {
+        "host": "www.pokemonpricetracker.com",
+        "state": "closed",
+        "consecutive_failures": 0,
+        "retry_in_seconds": 0.0,
+    }
+
+
+def test_open_circuit_serves_stale_price_or_fails_fast(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    settings.CIRCUIT_BREAKER_FAILURES = 1
+    settings.UPSTREAM_CACHE_TTLS = {"price": 60}
+    get_breaker("www.pokemonpricetracker.com").record_failure()
+    with patch("vault.upstream_cache.time.time", return_value=1000):
+        set_cached("price", "151", "Pikachu", {"data": [1]})
+
+    with (
+        patch("vault.upstream_cache.time.time", return_value=2000),
+        patch("vault.utils.requests.Session.get") as mock_get,
+    ):
+        stale = fetch_card_price("Pikachu", "151")
+        missing = fetch_card_price("Mew", "151")
+
+    mock_get.assert_not_called()
+    assert stale == {"data": [1], "stale": True}
+    assert missing["status"] == 503
+
+
+def test_open_circuit_skips_tcgdex_lookup(settings):
+    settings.CIRCUIT_BREAKER_FAILURES = 1
+    get_breaker("api.tcgdex.net").record_failure()
+
+    with patch("vault.utils.requests.Session.get") as mock_get:
+        result = fetch_card_data("Pikachu", "151", "25")
+
+    mock_get.assert_not_called()
+    assert result == {"error": "Service unavailable", "status": 503}
+
+
+def test_timeout_cut_short_by_a_deadline_does_not_trip_the_breaker(settings):
+    settings.CIRCUIT_BREAKER_FAILURES = 1
+    url = "https://api.tcgdex.net/v2/en/cards"
+
+    with patch(
+        "vault.utils.requests.Session.get", side_effect=requests.Timeout("slow")
+    ):
+        with pytest.raises(requests.Timeout):
+            _upstream_get(url, timeout=0.05)
+
+    assert get_breaker(url).state()["state"] == "closed"
+
+
+def test_timeouts_inside_the_card_create_budget_trip_the_breaker(settings):
+    settings.CIRCUIT_BREAKER_FAILURES = 2
+    settings.UPSTREAM_TIMEOUT_SECONDS = 10
+    settings.REQUEST_BUDGET_SECONDS = {"default": 8, "card-create": 6}
+
+    with patch(
+        "vault.utils.requests.Session.get", side_effect=requests.Timeout("slow")
+    ) as mock_get:
+        for _ in range(3):
+            fetch_card_data(
+                "Pikachu", "151", "25", deadline=Deadline.for_view("card-create")
+            )
+
+    # Both calls got the 6s budget, not the full timeout, and still counted
+    assert [c.kwargs["timeout"] for c in mock_get.call_args_list] == [
+        pytest.approx(6, abs=0.5)
+    ] * 2
+    assert get_breaker("api.tcgdex.net").state()["state"] == "open"
+
+
+def test_open_price_circuit_fails_fast_without_taking_a_token(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    settings.CIRCUIT_BREAKER_FAILURES = 1
+    breaker = get_breaker("www.pokemonpricetracker.com")
+    breaker.record_failure()
+
+    with (
+        patch("vault.rate_limit.TokenBucket.acquire") as mock_acquire,
+        patch("vault.utils.requests.Session.get") as mock_get,
+    ):
+        result = fetch_card_price("Pikachu", "151")
+
+    assert result == {"error": "Price API unavailable", "status": 503}
+    mock_acquire.assert_not_called()
+    mock_get.assert_not_called()
+    # The check doesn't claim the half-open probe either
+    assert breaker.is_open()
+
+
+def _run_with_client(handler, coro_fn):
+    async def run():
+        async with async_http_client(transport=httpx.MockTransport(handler)) as client:
+            return await coro_fn(client)
+
+    return asyncio.run(run())
+
+
+def test_async_price_client_retries_server_errors_and_caches(settings):
+    settings.CARDVAULT_API_KEY = "test-key"
+    settings.PRICE_API_BACKOFF_BASE_SECONDS = 0
+    payload = {"data": [{"cardNumber": "058/165"}]}
+    answers = [httpx.Response(503), httpx.Response(200, json=payload)]
+    requests_seen = []
+
+    def handler(request):
+        requests_seen.append(request)
+        return answers.pop(0)
+
+    async def lookups(client):
+        first = await afetch_card_price(client, "Pikachu", "151")
+        again = await afetch_card_price(client, "pikachu", "151")
+        return first, again
+
+    assert _run_with_client(handler, lookups) == (payload, payload)
+    # One retry, then the second lookup is served from the cache
+    assert len(requests_seen) == 2
+    assert requests_seen[0].headers["Authorization"] == "Bearer test-key"
+    assert requests_seen[0].url.params["search"] == "Pikachu"
+
+
+def test_async_card_data_client_matches_the_printing():
+    listing = [
+        {"id": "sv03.5-025", "name": "Pikachu", "image": "https://img/025"},
+        {"id": "sv03.5-173", "name": "Pikachu", "image": "https://img/173"},
+        {"id": "swsh1-025", "name": "Pikachu", "image": "https://img/other"},
+    ]
+
+    result = _run_with_client(
+        lambda request: httpx.Response(200, json=listing),
+        lambda client: afetch_card_data(client, "Pikachu", "151", "173"),
+    )
+
+    assert result == {
+        "name": "Pikachu",
+        "image_url": "https://img/173/high.png",
+        "card_id": "sv03.5-173",
+    }
+
+
+def test_async_transport_errors_open_the_breaker(settings):
+    settings.CIRCUIT_BREAKER_FAILURES = 1
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async def lookups(client):
+        first = await afetch_card_data(client, "Pikachu", "151", "25")
+        second = await afetch_card_data(client, "Mew", "151", "151")
+        return first, second
+
+    first, second = _run_with_client(handler, lookups)
+
+    assert first == {"error": "Service unavailable", "status": 503}
+    assert second == {"error": "Service unavailable", "status": 503}
+    # The open circuit failed the second lookup without a request
+    assert len(calls) == 1
+    assert get_breaker("api.tcgdex.net").state()["state"] == "open"
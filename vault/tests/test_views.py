@@ -2,13 +2,17 @@
 
 
 import pytest
+from django.conf import settings
 from django.urls import reverse
 from django.test import Client
 from django.utils import timezone
 from decimal import Decimal
 from datetime import timedelta
 from unittest.mock import patch
-from vault.models import Card, PriceSnapshot
+from vault.models import Card, CatalogCard, PriceSnapshot, PriceRefreshJob
+from vault.services.image_heal_services import heal_new_images
+from vault.services.rollup_services import rebuild_collection_rollups
+from vault.utils import get_breaker
 
 
 """ 
@@ -108,16 +112,7 @@ def test_card_create_view_creates_card(monkeypatch, user):
     client = Client()
     client.force_login(user)
 
-    # Mock helper function so testing does not hit apis
-    def get_card_image_url_or_placeholder(*, card_name, set_name, card_number):
-        return "https://example.com/fake.jpg"
-
-    monkeypatch.setattr(
-        "vault.views.get_card_image_url_or_placeholder",
-        get_card_image_url_or_placeholder,
-    )
-
-    def fake_fetch_card_price(card_name, set_name):
+    def fake_fetch_card_price(card_name, set_name, deadline=None):
         return {"data": [{"price": 10.50, "date": "2025-11-05"}]}
 
     def fake_extract_card_price(data, card_number):
@@ -142,11 +137,94 @@ def test_card_create_view_creates_card(monkeypatch, user):
     assert response.status_code == 302
     assert response.url == reverse("card-list")
 
-    # Verify the card was saved correctly
+    # Verify the card was saved correctly, its image is left to the worker
     card = Card.objects.get(user=user, card_name="Bulbasaur")
-    assert card.image_url == "https://example.com/fake.jpg"
+    assert card.image_url == settings.CARD_IMAGE_PLACEHOLDER_URL
     assert float(card.value_usd) == 10.50
 
+    # Mock helper function so testing does not hit apis
+    monkeypatch.setattr(
+        "vault.services.image_heal_services.lookup_card_image",
+        lambda **kwargs: {"image_url": "https://example.com/fake.jpg"},
+    )
+    assert heal_new_images() == {"healed": 1, "missed": 0, "errors": 0}
+
+    card.refresh_from_db()
+    assert card.image_url == "https://example.com/fake.jpg"
+    images = client.get(reverse("card-images-api"), {"ids": str(card.pk)}).json()
+    assert images == {"images": {str(card.pk): "https://example.com/fake.jpg"}}
+
+
+@pytest.mark.django_db
+def test_card_create_view_reuses_catalog_image(monkeypatch, user):
+    client = Client()
+    client.force_login(user)
+
+    CatalogCard.objects.create(
+        set_name="151",
+        card_number="001",
+        card_name="Bulbasaur",
+        name_key="bulbasaur",
+        image_url="https://example.com/catalog.jpg",
+    )
+
+    def fail_image_lookup(**kwargs):
+        raise AssertionError("image API should not be called")
+
+    monkeypatch.setattr("vault.views.lookup_indexed_image", fail_image_lookup)
+    monkeypatch.setattr(
+        "vault.forms.fetch_card_price",
+        lambda card_name, set_name, deadline=None: {"data": []},
+    )
+    monkeypatch.setattr(
+        "vault.forms.extract_card_price",
+        lambda data, card_number: {"price": 3.25, "price_date": "2025-11-05"},
+    )
+
+    client.post(
+        reverse("card-create"),
+        data={
+            "card_name": "Bulbasaur",
+            "set_name": "151",
+            "language": "EN",
+            "card_number": "1",
+            "condition": "NM",
+        },
+    )
+
+    card = Card.objects.get(user=user, card_name="Bulbasaur")
+    assert card.image_url == "https://example.com/catalog.jpg"
+    assert card.catalog.value_usd == Decimal("3.25")
+
+
+@pytest.mark.django_db
+def test_card_create_view_gives_price_lookup_a_deadline(monkeypatch, settings, user):
+    settings.REQUEST_BUDGET_SECONDS = {"default": 8, "card-create": 3}
+    client = Client()
+    client.force_login(user)
+    seen = []
+
+    def fake_fetch_card_price(card_name, set_name, deadline=None):
+        seen.append(deadline)
+        return {"error": "Request budget exhausted"}
+
+    monkeypatch.setattr("vault.forms.fetch_card_price", fake_fetch_card_price)
+
+    response = client.post(
+        reverse("card-create"),
+        data={
+            "card_name": "Bulbasaur",
+            "set_name": "151",
+            "language": "EN",
+            "card_number": "1",
+            "condition": "NM",
+        },
+    )
+
+    assert response.status_code == 200
+    assert 0 < seen[0].remaining() <= 3
+    assert not Card.objects.exists()
+
 
 # --------------- update view tests
 
@@ -414,6 +492,7 @@ def test_value_series_returns_aggregated_data_for_user_and_ignores_other_user_da
         source="test",
         currency="USD",
     )
+    rebuild_collection_rollups()
 
     url = reverse("collection-value-series")
     response = client.get(url)
@@ -451,6 +530,7 @@ def test_value_series_respects_range_override(user):
         source="test",
         currency="USD",
     )
+    rebuild_collection_rollups(user)
 
     url = reverse("collection-value-series")
 
@@ -493,21 +573,80 @@ def test_collection_graph_custom_range(user):
 # ----------------- Refresh prices view tests -----
 
 
-@patch("vault.views.refresh_prices_for_user")
-def test_refresh_prices_post_calls_service(mock_refresh, client, user):
+@patch("vault.views.enqueue_price_refresh")
+def test_refresh_prices_post_enqueues_job(mock_enqueue, client, user):
     client.force_login(user)
 
     response = client.post(reverse("refresh-prices"))
 
-    mock_refresh.assert_called_once_with(user)
+    mock_enqueue.assert_called_once_with(user)
     assert response.status_code == 302
 
 
-@patch("vault.views.refresh_prices_for_user")
-def test_refresh_prices_get_does_not_call_service(mock_refresh, client, user):
+@patch("vault.views.enqueue_price_refresh")
+def test_refresh_prices_get_does_not_enqueue_job(mock_enqueue, client, user):
     client.force_login(user)
 
     response = client.get(reverse("refresh-prices"))
 
+    mock_enqueue.assert_not_called()
+    assert response.status_code == 302
+
+
+@patch("vault.services.job_services.refresh_prices_for_user")
+def test_refresh_prices_post_does_not_refresh_inline(mock_refresh, client, user):
+    client.force_login(user)
+
+    client.post(reverse("refresh-prices"))
+    client.post(reverse("refresh-prices"))
+
     mock_refresh.assert_not_called()
+    assert PriceRefreshJob.objects.filter(user=user).count() == 1
+
+
+# ----------------- Refresh progress view tests -----
+
+
+def test_refresh_progress_requires_login(client):
+    response = client.get(reverse("refresh-progress"))
     assert response.status_code == 302
+
+
+def test_refresh_progress_idle_without_jobs(client, user):
+    client.force_login(user)
+    response = client.get(reverse("refresh-progress"))
+    assert response.json() == {"status": "idle"}
+
+
+def test_refresh_progress_reports_latest_job_counts(client, user, other_user):
+    client.force_login(user)
+    PriceRefreshJob.objects.create(
+        user=user,
+        status=PriceRefreshJob.RUNNING,
+        cards_total=10,
+        cards_done=4,
+        cards_failed=1,
+    )
+    PriceRefreshJob.objects.create(user=other_user, cards_total=99)
+
+    data = client.get(reverse("refresh-progress")).json()
+
+    assert data["status"] == "running"
+    assert (data["total"], data["done"], data["failed"]) == (10, 4, 1)
+    assert data["finished_at"] is None
+
+
+@pytest.mark.django_db
+def test_upstream_status_reports_breakers(settings, user):
+    settings.CIRCUIT_BREAKER_FAILURES = 1
+    get_breaker("api.tcgdex.net").record_failure()
+    client = Client()
+    client.force_login(user)
+
+    data = client.get(reverse("upstream-status")).json()
+
+    states = {b["host"]: b["state"] for b in data["circuit_breakers"]}
+    assert states["api.tcgdex.net"] == "open"
+    assert states["www.pokemonpricetracker.com"] == "closed"
+    assert "tokens_available" in data["price_limiter"]
+    assert "hit_rate" in data["upstream_cache"]
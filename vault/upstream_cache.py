@@ -0,0 +1,84 @@
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Fallback TTLs (seconds) per upstream endpoint, override with UPSTREAM_CACHE_TTLS
+DEFAULT_TTLS = {
+    "price": 6 * 60 * 60,
+    "tcgdex": 7 * 24 * 60 * 60,
+}
+
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(stat: str):
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def _ttl_for(endpoint: str) -> int:
+    ttls = getattr(settings, "UPSTREAM_CACHE_TTLS", {})
+    return ttls.get(endpoint, DEFAULT_TTLS.get(endpoint, 60 * 60))
+
+
+def _cache_key(endpoint: str, set_code: str | None, search_name: str) -> str:
+    # Hash the lookup so names with spaces or accents are safe for any backend
+    raw = f"{set_code or ''}|{search_name.strip().lower()}"
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return f"vault:upstream:{endpoint}:{digest}"
+
+
+def get_cached(
+    endpoint: str, set_code: str | None, search_name: str, allow_stale=False
+):
+    """
+    Return the cached upstream result for (endpoint, set code, search name),
+    or None on a miss. Entries past their endpoint TTL count as evicted; they
+    are only returned when allow_stale is set.
+    """
+    entry = cache.get(_cache_key(endpoint, set_code, search_name))
+    if entry is None:
+        _count("misses")
+        return None
+
+    if entry["expires_at"] <= time.time():
+        _count("evictions")
+        if allow_stale:
+            return entry["value"]
+        _count("misses")
+        return None
+
+    _count("hits")
+    return entry["value"]
+
+
+def set_cached(endpoint: str, set_code: str | None, search_name: str, value):
+    ttl = _ttl_for(endpoint)
+    # Keep the entry around past its TTL so callers can fall back to stale data
+    stale = getattr(settings, "UPSTREAM_CACHE_STALE_SECONDS", 24 * 60 * 60)
+    cache.set(
+        _cache_key(endpoint, set_code, search_name),
+        {"value": value, "expires_at": time.time() + ttl},
+        timeout=ttl + stale,
+    )
+
+
+def get_cache_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return stats
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        for stat in _stats:
+            _stats[stat] = 0
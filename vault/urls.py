@@ -1,18 +1,27 @@
 from django.urls import path
 from vault.views import (
     CardCreateView,
+    CardImportView,
     CardListView,
+    card_list_api,
+    card_images_api,
     CardUpdateView,
     CardDeleteView,
     refresh_prices,
+    export_cards,
+    refresh_progress,
     collection_value_series,
     CollectionGraphView,
+    card_image,
+    upstream_status,
 )
 
 
 urlpatterns = [
     path("create/", CardCreateView.as_view(), name="card-create"),
     path("", CardListView.as_view(), name="card-list"),
+    path("import/", CardImportView.as_view(), name="card-import"),
+    path("export/", export_cards, name="card-export"),
     path("update/<int:pk>/", CardUpdateView.as_view(), name="card-update"),
     path("delete/<int:pk>/", CardDeleteView.as_view(), name="card-delete"),
     path("refresh-prices/", refresh_prices, name="refresh-prices"),
@@ -21,5 +30,10 @@ urlpatterns = [
         collection_value_series,
         name="collection-value-series",
     ),
+    path("api/refresh-progress/", refresh_progress, name="refresh-progress"),
+    path("api/cards/", card_list_api, name="card-list-api"),
+    path("api/card-images/", card_images_api, name="card-images-api"),
+    path("api/upstream-status/", upstream_status, name="upstream-status"),
     path("collection/graph/", CollectionGraphView.as_view(), name="collection-graph"),
+    path("images/<str:name>", card_image, name="card-image"),
 ]
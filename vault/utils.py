@@ -1,13 +1,329 @@
+import asyncio
+import httpx
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.cache import cache
 import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .constants import IMAGE_SET_MAP, PRICE_SET_MAP
+from .rate_limit import get_price_limiter
+from .upstream_cache import get_cached, set_cached
 
 
 logger = logging.getLogger(__name__)
 
 
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Long-lived session shared by the upstream clients so repeated lookups reuse
+    pooled keep-alive connections instead of a new TCP + TLS handshake each.
+    Rebuilt after a fork so worker processes never share sockets.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            pool_size = getattr(settings, "UPSTREAM_POOL_SIZE", 10)
+            retries = getattr(settings, "UPSTREAM_CONNECT_RETRIES", 2)
+            # Only connection/read failures are retried here, status codes are
+            # handled by each client (see fetch_card_price backoff)
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=pool_size,
+                max_retries=Retry(
+                    total=retries,
+                    connect=retries,
+                    read=retries,
+                    status=0,
+                    backoff_factor=0.2,
+                    allowed_methods=frozenset({"GET"}),
+                    raise_on_status=False,
+                ),
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(
+                {"Accept-Encoding": "gzip, deflate", "User-Agent": "CardVault"}
+            )
+            _session = session
+            _session_pid = os.getpid()
+        return _session
+
+
+def reset_http_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def async_http_client(transport=None) -> httpx.AsyncClient:
+    """
+    Native asyncio client for the async upstream clients, the counterpart of
+    get_http_session. Open one per event loop run (`async with`) so its
+    keep-alive pool lives on that loop; connections are capped by
+    settings.UPSTREAM_ASYNC_MAX_CONNECTIONS and connect failures retried
+    UPSTREAM_CONNECT_RETRIES times.
+    """
+    limit = getattr(settings, "UPSTREAM_ASYNC_MAX_CONNECTIONS", 20)
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(
+            retries=getattr(settings, "UPSTREAM_CONNECT_RETRIES", 2),
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+        )
+    return httpx.AsyncClient(transport=transport, headers={"User-Agent": "CardVault"})
+
+
+# One semaphore per upstream host so concurrent refreshes can't flood an API
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    """
+    Return the semaphore capping in-flight requests to the url's host,
+    sized by settings.UPSTREAM_MAX_CONCURRENCY_PER_HOST
+    """
+    host = urlsplit(url).netloc
+    with _host_semaphores_lock:
+        slot = _host_semaphores.get(host)
+        if slot is None:
+            limit = getattr(settings, "UPSTREAM_MAX_CONCURRENCY_PER_HOST", 4)
+            slot = threading.BoundedSemaphore(max(1, limit))
+            _host_semaphores[host] = slot
+    return slot
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a host whose circuit breaker is open
+    """
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker. State lives in the Django cache so every
+    gunicorn worker sees the same circuit (use a shared backend, ie the
+    database cache, for that to hold across processes).
+
+    Closed: calls go through and consecutive failures are counted. After
+    settings.CIRCUIT_BREAKER_FAILURES in a row it opens and calls fail fast
+    for CIRCUIT_BREAKER_RESET_SECONDS. Then it is half-open: one probe call at
+    a time goes through, a success closes it and a failure opens it again.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+
+    def _key(self, part: str) -> str:
+        return f"vault:breaker:{self.host}:{part}"
+
+    def allow(self) -> bool:
+        open_until = cache.get(self._key("open_until"))
+        if open_until is None:
+            return True
+        if time.time() < open_until:
+            return False
+        # Half-open, whichever worker adds the probe key gets to try
+        probe_ttl = getattr(settings, "UPSTREAM_TIMEOUT_SECONDS", 10) + 5
+        return cache.add(self._key("probe"), 1, timeout=probe_ttl)
+
+    def is_open(self) -> bool:
+        # Failing fast right now; unlike allow() this never claims the probe
+        open_until = cache.get(self._key("open_until"))
+        return open_until is not None and time.time() < open_until
+
+    def record_success(self):
+        if cache.get(self._key("open_until")) is not None:
+            logger.info("Circuit for %s closed, probe succeeded", self.host)
+        cache.delete_many(
+            [self._key("failures"), self._key("open_until"), self._key("probe")]
+        )
+
+    def release_probe(self):
+        # The probe ended without saying anything about the host
+        cache.delete(self._key("probe"))
+
+    def record_failure(self):
+        key = self._key("failures")
+        cache.add(key, 0, timeout=None)
+        try:
+            failures = cache.incr(key)
+        except ValueError:
+            # evicted between add and incr
+            cache.set(key, 1, timeout=None)
+            failures = 1
+
+        half_open = cache.get(self._key("open_until")) is not None
+        threshold = getattr(settings, "CIRCUIT_BREAKER_FAILURES", 5)
+        if half_open or failures >= threshold:
+            reset = getattr(settings, "CIRCUIT_BREAKER_RESET_SECONDS", 30)
+            cache.set(self._key("open_until"), time.time() + reset, timeout=None)
+            cache.delete(self._key("probe"))
+            logger.warning(
+                "Circuit for %s open after %d failures, probing again in %ss",
+                self.host,
+                failures,
+                reset,
+            )
+
+    def state(self) -> dict:
+        open_until = cache.get(self._key("open_until"))
+        now = time.time()
+        if open_until is None:
+            status = "closed"
+        elif now < open_until:
+            status = "open"
+        else:
+            status = "half_open"
+        return {
+            "host": self.host,
+            "state": status,
+            "consecutive_failures": cache.get(self._key("failures"), 0),
+            "retry_in_seconds": round(max(0.0, (open_until or now) - now), 1),
+        }
+
+
+# Hosts the status endpoint always reports, breakers for others show up once used
+UPSTREAM_HOSTS = ("www.pokemonpricetracker.com", "api.tcgdex.net", "assets.tcgdex.net")
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(url_or_host: str) -> CircuitBreaker:
+    host = urlsplit(url_or_host).netloc or url_or_host
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+    return breaker
+
+
+def breaker_states() -> list:
+    with _breakers_lock:
+        hosts = sorted(set(UPSTREAM_HOSTS) | set(_breakers))
+    return [get_breaker(host).state() for host in hosts]
+
+
+# A call timing out with less than this to work with says nothing about the host
+_SHORT_TIMEOUT_SECONDS = 1.0
+
+
+def _upstream_get(url: str, **kwargs):
+    """
+    GET through the shared session, capped per host and guarded by the
+    host's circuit breaker. Raises CircuitOpenError while the circuit is
+    open; connection errors, timeouts and 5xx answers count as failures,
+    except a timeout on a call the caller's deadline left under a second.
+    """
+    breaker = get_breaker(url)
+    if not breaker.allow():
+        raise CircuitOpenError(breaker.host)
+    try:
+        with _host_slot(url):
+            resp = get_http_session().get(url, **kwargs)
+    except requests.Timeout:
+        if kwargs.get("timeout", _SHORT_TIMEOUT_SECONDS) < _SHORT_TIMEOUT_SECONDS:
+            # The request's deadline left the call almost no time
+            breaker.release_probe()
+        else:
+            breaker.record_failure()
+        raise
+    except requests.RequestException:
+        breaker.record_failure()
+        raise
+    if resp.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return resp
+
+
+async def _aupstream_get(client: httpx.AsyncClient, url: str, **kwargs):
+    """
+    _upstream_get over the async client, guarded by the same per-host
+    circuit breakers. Breaker state lives in the cache, so it is read and
+    written off the event loop.
+    """
+    breaker = get_breaker(url)
+    if not await sync_to_async(breaker.allow)():
+        raise CircuitOpenError(breaker.host)
+    try:
+        resp = await client.get(url, **kwargs)
+    except httpx.TransportError:
+        await sync_to_async(breaker.record_failure)()
+        raise
+    if resp.status_code >= 500:
+        await sync_to_async(breaker.record_failure)()
+    else:
+        await sync_to_async(breaker.record_success)()
+    return resp
+
+
+def _parse_retry_after(value) -> float | None:
+    """
+    Retry-After is either a number of seconds or an HTTP date
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _retry_delay(resp, attempt: int) -> float:
+    """
+    Honor Retry-After when the API sends it, otherwise exponential backoff
+    with jitter so concurrent workers don't retry in lockstep
+    """
+    retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+    if retry_after is not None:
+        return retry_after
+    base = getattr(settings, "PRICE_API_BACKOFF_BASE_SECONDS", 0.5)
+    backoff = min(base * (2**attempt), 30.0)
+    return backoff / 2 + random.uniform(0, backoff / 2)
+
+
+def _upstream_timeout(deadline=None) -> float:
+    # settings.UPSTREAM_TIMEOUT_SECONDS, cut down to what the request has left
+    timeout = getattr(settings, "UPSTREAM_TIMEOUT_SECONDS", 10)
+    return deadline.timeout(timeout) if deadline is not None else timeout
+
+
+def _stale_price_or(set_code: str, card_name: str, error: dict) -> dict:
+    """
+    Out of request budget or the circuit is open: an expired price response
+    beats no answer. It is flagged so record_price_payload doesn't store it
+    as fresh rows.
+    """
+    stale = get_cached("price", set_code, card_name, allow_stale=True)
+    if stale is None:
+        return error
+    logger.info("Serving stale price data for %s | %s", set_code, card_name)
+    return {**stale, "stale": True}
+
+
 def _pad_card_number_for_image(n: str | int) -> str:
     """
     TCGdex image id's use a 3-digit card number: ie, '006'
@@ -19,29 +335,66 @@ def _pad_card_number_for_image(n: str | int) -> str:
 
 
 def fetch_card_data(
-    card_name: str, set_name: str, card_number: str | int | None = None
+    card_name: str,
+    set_name: str,
+    card_number: str | int | None = None,
+    deadline=None,
 ):
+    """
+    TCGdex card data for a printing: {"name", "image_url", "card_id"}, or
+    {"error": ...} when there is no match. Errors from TCGdex failing rather
+    than answering also carry a "status", like the price client's.
+    """
     # use official set name and filter through map in constants to get api set_code
     set_code = IMAGE_SET_MAP.get(set_name)
     # graceful exit if set_code not found
     if not set_code:
         logger.error("Missing IMAGE_SET_MAP code for set '%s'", set_name)
         return {"error": "Invalid set"}
-    # hit api to grab a json list of cards with the name from model
-    try:
-        url = "https://api.tcgdex.net/v2/en/cards"
-        # safe timeout after 10 second if no data received
-        resp = requests.get(url, params={"name": card_name}, timeout=10)
-        # throws exception on bad request so we don't save a 404 page or the like
-        resp.raise_for_status()
-        # put data in json list if data is good
-        data = resp.json() or []  # list
-    except Exception as e:
-        logger.exception("TCGdex request failed: %s", e)
-        return {"error": "Service unavailable"}
+    # cards in this set with this name may already be cached from another lookup
+    candidates = get_cached("tcgdex", set_code, card_name)
+    if candidates is None and deadline is not None and deadline.expired:
+        # out of request time, an expired entry beats no answer
+        candidates = get_cached("tcgdex", set_code, card_name, allow_stale=True)
+        if candidates is None:
+            return {"error": "Request budget exhausted", "status": 504}
+    if candidates is None:
+        # hit api to grab a json list of cards with the name from model
+        try:
+            url = "https://api.tcgdex.net/v2/en/cards"
+            # give up after UPSTREAM_TIMEOUT_SECONDS, or sooner on a deadline
+            resp = _upstream_get(
+                url, params={"name": card_name}, timeout=_upstream_timeout(deadline)
+            )
+            # throws exception on bad request so we don't save a 404 page or the like
+            resp.raise_for_status()
+            # put data in json list if data is good
+            data = resp.json() or []  # list
+        except CircuitOpenError:
+            # TCGdex is down, don't wait on it; a stale listing still works
+            logger.warning("TCGdex circuit open, skipping lookup for %s", card_name)
+            candidates = get_cached("tcgdex", set_code, card_name, allow_stale=True)
+            if candidates is None:
+                return {"error": "Service unavailable", "status": 503}
+        except Exception as e:
+            logger.exception("TCGdex request failed: %s", e)
+            if deadline is not None and deadline.expired:
+                candidates = get_cached("tcgdex", set_code, card_name, allow_stale=True)
+            if candidates is None:
+                return {"error": "Service unavailable", "status": 503}
+        else:
+            candidates = _set_candidates(data, set_code)
+            set_cached("tcgdex", set_code, card_name, candidates)
+    return _pick_card(candidates, set_code, card_number)
+
+
+def _set_candidates(data: list, set_code: str) -> list:
     # use list comprehension to save only cards that have that name and also the correct set_code
     prefix = f"{set_code.lower()}-"
-    candidates = [c for c in data if c.get("id", "").lower().startswith(prefix)]
+    return [c for c in data if c.get("id", "").lower().startswith(prefix)]
+
+
+def _pick_card(candidates: list, set_code: str, card_number) -> dict:
     # more list comprehension to save from those only the cards with also a proper car_number
     if card_number:
         # calling this function ensures the card number matches the json data from this api
@@ -69,7 +422,24 @@ def fetch_card_data(
     }
 
 
-def fetch_card_price(card_name: str, set_name: str):
+def fetch_set_cards(set_code: str):
+    """
+    Full card listing for one TCGdex set, used to build the local card index
+    """
+    url = f"https://api.tcgdex.net/v2/en/sets/{set_code}"
+    try:
+        resp = _upstream_get(url, timeout=_upstream_timeout())
+        resp.raise_for_status()
+        return (resp.json() or {}).get("cards") or []
+    except CircuitOpenError:
+        logger.warning("TCGdex circuit open, skipping set %s", set_code)
+        return {"error": "Service unavailable"}
+    except Exception as e:
+        logger.exception("TCGdex set request failed for %s: %s", set_code, e)
+        return {"error": "Service unavailable"}
+
+
+def fetch_card_price(card_name: str, set_name: str, deadline=None):
     # the price API requires a key hidden in .env
     api_key = getattr(settings, "CARDVAULT_API_KEY", None)
     # if someone uses this on github and cannot access my key this will fail gracefully unless they add their own
@@ -87,48 +457,250 @@ def fetch_card_price(card_name: str, set_name: str):
     headers = {"Authorization": f"Bearer {api_key}"}
     params = {"set": set_code, "search": card_name}
 
-    try:
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
+    # popular cards are shared across vaults, so reuse any recent response
+    cached = get_cached("price", set_code, card_name)
+    if cached is not None:
+        return cached
+
+    limiter = get_price_limiter()
+    max_retries = getattr(settings, "PRICE_API_MAX_RETRIES", 3)
+    max_wait = getattr(settings, "PRICE_API_MAX_THROTTLE_WAIT_SECONDS", 30)
+
+    exhausted = {"error": "Request budget exhausted"}
+    unavailable = {"error": "Price API unavailable", "status": 503}
+    breaker = get_breaker(url)
+    for attempt in range(max_retries + 1):
+        if deadline is not None:
+            if deadline.expired:
+                return _stale_price_or(set_code, card_name, exhausted)
+            max_wait = min(max_wait, deadline.remaining())
+        # don't spend a token (or wait for one) on a call that would fail fast
+        if breaker.is_open():
+            logger.warning("Price API circuit open, failing fast")
+            return _stale_price_or(set_code, card_name, unavailable)
+        # wait for a token so concurrent refreshes stay under the API's rate limit
+        if not limiter.acquire(max_wait=max_wait):
+            if deadline is not None:
+                return _stale_price_or(set_code, card_name, exhausted)
+            return {"error": "Rate limit budget exhausted", "status": 429}
+        try:
+            resp = _upstream_get(
+                url, headers=headers, params=params, timeout=_upstream_timeout(deadline)
+            )
+        except CircuitOpenError:
+            logger.warning("Price API circuit open, failing fast")
+            return _stale_price_or(set_code, card_name, unavailable)
+        except Exception as e:
+            logger.exception("Price API request failed: %s", e)
+            if deadline is not None and deadline.expired:
+                return _stale_price_or(set_code, card_name, exhausted)
+            return {"error": "Request failed"}
         # if all goes well, return json dictionary (how the API formats their data)
         if resp.status_code == 200:
-            return resp.json()
-        # if not, fail gracefully
-        return {"error": resp.text, "status": resp.status_code}
-    except Exception as e:
-        logger.exception("Price API request failed: %s", e)
-        return {"error": "Request failed"}
+            data = resp.json()
+            set_cached("price", set_code, card_name, data)
+            return data
+        # only rate limits and server errors are worth retrying
+        retryable = resp.status_code == 429 or resp.status_code >= 500
+        if not retryable or attempt == max_retries:
+            break
+        delay = _retry_delay(resp, attempt)
+        if deadline is not None and delay >= deadline.remaining():
+            # the retry couldn't finish inside the request anyway
+            return _stale_price_or(set_code, card_name, exhausted)
+        logger.warning(
+            "Price API returned %s, retrying in %.1fs (attempt %d/%d)",
+            resp.status_code,
+            delay,
+            attempt + 1,
+            max_retries,
+        )
+        if resp.status_code == 429:
+            # back every caller off, not just this one
+            limiter.block_for(delay)
+        else:
+            time.sleep(delay)
+
+    # if not, fail gracefully
+    return {"error": resp.text, "status": resp.status_code}
+
+
+def price_row_key(card_name: str, card_number: str | int) -> str:
+    return f"{card_name.strip().lower()}|{_pad_card_number_for_image(card_number)}"
+
+
+def index_price_payload(data: dict) -> dict:
+    """
+    Normalize a price API response into a price table:
+    {"rows": {"name|number": row}, "by_number": {number: "name|number"}}
+    where each row holds the card name, market price, price date and
+    TCGplayer id.
+    The first variant seen for a card number wins, as it always has.
+    """
+    rows = {}
+    by_number = {}
+    for card in (data or {}).get("data") or []:
+        try:
+            # v2 stores this field as "cardNumber" (e.g. "062/197")
+            number = _pad_card_number_for_image(
+                str(card.get("cardNumber", "")).split("/")[0]
+            )
+            price = card["prices"]["market"]
+            # lastUpdated is ISO 8601, not YYYY/MM/DD
+            price_date = card["prices"]["lastUpdated"].split("T")[0]  # YYYY-MM-DD
+        except Exception as e:
+            logger.exception("Failed parsing a card variant: %s", e)
+            continue
+        key = price_row_key(card.get("name") or "", number)
+        rows.setdefault(
+            key,
+            {
+                "name": card.get("name"),
+                "price": price,
+                "price_date": price_date,
+                "tcgplayer_id": str(card.get("tcgPlayerId") or ""),
+            },
+        )
+        by_number.setdefault(number, key)
+    return {"rows": rows, "by_number": by_number}
 
 
-def extract_card_price(data: dict, card_number: str | int):
+def extract_card_price(
+    data: dict, card_number: str | int, card_name: str | None = None
+):
+    """
+    Price for one card from a raw API response or a table built by
+    index_price_payload. Build the table once to make repeat lookups O(1).
+    """
     # Safety: ensure API returned something usable
-    if not data or "data" not in data:
+    if not data or ("data" not in data and "rows" not in data):
         logger.warning("No valid pricing data provided to extract_card_price.")
         return {"error": "No data received from price API"}
 
+    table = data if "rows" in data else index_price_payload(data)
     padded = _pad_card_number_for_image(card_number)
 
-    # Loop through all card variants in the response
-    for card in data.get("data", []):
+    row = None
+    if card_name:
+        row = table["rows"].get(price_row_key(card_name, padded))
+    if row is None:
+        row = table["rows"].get(table["by_number"].get(padded))
+    if row is None:
+        return {"error": f"Card number {padded} not found"}
+
+    return {
+        "price": row["price"],
+        "price_date": row["price_date"],
+        # Tables stored before ids were kept don't have one
+        "tcgplayer_id": row.get("tcgplayer_id", ""),
+    }
+
+
+async def afetch_card_data(
+    client: httpx.AsyncClient,
+    card_name: str,
+    set_name: str,
+    card_number: str | int | None = None,
+):
+    """
+    fetch_card_data over the native async client, same cache and result shape.
+    """
+    set_code = IMAGE_SET_MAP.get(set_name)
+    if not set_code:
+        logger.error("Missing IMAGE_SET_MAP code for set '%s'", set_name)
+        return {"error": "Invalid set"}
+    candidates = await sync_to_async(get_cached)("tcgdex", set_code, card_name)
+    if candidates is None:
         try:
-            # v2 stores this field as "cardNumber" (e.g. "062/197")
-            if str(card.get("cardNumber", "")).startswith(padded):
-                # Pull price data
-                price = card["prices"]["market"]
-
-                # lastUpdated is ISO 8601, not YYYY/MM/DD
-                raw_date = card["prices"]["lastUpdated"]
-                price_date = raw_date.split("T")[0]  # YYYY-MM-DD
-
-                return {
-                    "price": price,
-                    "price_date": price_date,
-                    # The following may be useful in future feature expansion
-                    # "tcgplayer_id": card.get("tcgPlayerId"),
-                    # "variant": card.get("rarity"),
-                }
+            resp = await _aupstream_get(
+                client,
+                "https://api.tcgdex.net/v2/en/cards",
+                params={"name": card_name},
+                timeout=_upstream_timeout(),
+            )
+            resp.raise_for_status()
+            data = resp.json() or []
+        except CircuitOpenError:
+            logger.warning("TCGdex circuit open, skipping lookup for %s", card_name)
+            candidates = await sync_to_async(get_cached)(
+                "tcgdex", set_code, card_name, allow_stale=True
+            )
+            if candidates is None:
+                return {"error": "Service unavailable", "status": 503}
+        except Exception as e:
+            logger.exception("TCGdex request failed: %s", e)
+            return {"error": "Service unavailable", "status": 503}
+        else:
+            candidates = _set_candidates(data, set_code)
+            await sync_to_async(set_cached)("tcgdex", set_code, card_name, candidates)
+    return _pick_card(candidates, set_code, card_number)
+
+
+async def afetch_card_price(client: httpx.AsyncClient, card_name: str, set_name: str):
+    """
+    fetch_card_price over the native async client: same cache, rate limiter,
+    circuit breaker and 429/5xx backoff, but waits on the event loop.
+    """
+    api_key = getattr(settings, "CARDVAULT_API_KEY", None)
+    if not api_key:
+        logger.warning("CARDVAULT_API_KEY missing - skipping price fetch.")
+        return {"error": "Missing API key"}
+    set_code = PRICE_SET_MAP.get(set_name)
+    if not set_code:
+        logger.error("Missing PRICE_SET_MAP code for set '%s'", set_name)
+        return {"error": "Unknown set for price API"}
+    url = "https://www.pokemonpricetracker.com/api/v2/cards"
+    headers = {"Authorization": f"Bearer {api_key}"}
+    params = {"set": set_code, "search": card_name}
+
+    cached = await sync_to_async(get_cached)("price", set_code, card_name)
+    if cached is not None:
+        return cached
+
+    limiter = get_price_limiter()
+    max_retries = getattr(settings, "PRICE_API_MAX_RETRIES", 3)
+    max_wait = getattr(settings, "PRICE_API_MAX_THROTTLE_WAIT_SECONDS", 30)
 
+    unavailable = {"error": "Price API unavailable", "status": 503}
+    breaker = get_breaker(url)
+    for attempt in range(max_retries + 1):
+        if await sync_to_async(breaker.is_open)():
+            logger.warning("Price API circuit open, failing fast")
+            return await sync_to_async(_stale_price_or)(
+                set_code, card_name, unavailable
+            )
+        if not await limiter.aacquire(max_wait=max_wait):
+            return {"error": "Rate limit budget exhausted", "status": 429}
+        try:
+            resp = await _aupstream_get(
+                client, url, headers=headers, params=params, timeout=_upstream_timeout()
+            )
+        except CircuitOpenError:
+            logger.warning("Price API circuit open, failing fast")
+            return await sync_to_async(_stale_price_or)(
+                set_code, card_name, unavailable
+            )
         except Exception as e:
-            logger.exception("Failed parsing a card variant: %s", e)
-            continue
+            logger.exception("Price API request failed: %s", e)
+            return {"error": "Request failed"}
+        if resp.status_code == 200:
+            data = resp.json()
+            await sync_to_async(set_cached)("price", set_code, card_name, data)
+            return data
+        retryable = resp.status_code == 429 or resp.status_code >= 500
+        if not retryable or attempt == max_retries:
+            break
+        delay = _retry_delay(resp, attempt)
+        logger.warning(
+            "Price API returned %s, retrying in %.1fs (attempt %d/%d)",
+            resp.status_code,
+            delay,
+            attempt + 1,
+            max_retries,
+        )
+        if resp.status_code == 429:
+            await sync_to_async(limiter.block_for)(delay)
+        else:
+            await asyncio.sleep(delay)
 
-    return {"error": f"Card number {padded} not found"}
+    return {"error": resp.text, "status": resp.status_code}
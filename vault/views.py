@@ -1,34 +1,72 @@
 # Standard library
-from datetime import timedelta
+from datetime import date, timedelta
 from decimal import Decimal
 import logging
 
 # Django
+from django.conf import settings
 from django.shortcuts import redirect
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.views.generic import (
     CreateView,
     UpdateView,
     DeleteView,
+    FormView,
     ListView,
     TemplateView,
 )
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.db.models import Sum
 from django.db.models.functions import Coalesce
-from django.http import HttpResponse, JsonResponse
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.utils import timezone
 
 # Local app
-from .models import Card, PriceSnapshot
-from .forms import CardForm, CardUpdateForm
-from vault.services.image_services import get_card_image_url_or_placeholder
-from vault.services.price_services import (
-    refresh_prices_for_user,
-    create_initial_snapshot,
+from .deadline import Deadline
+from .models import Card
+from .rate_limit import get_price_limiter
+from .upstream_cache import get_cache_stats
+from .utils import breaker_states
+from .forms import CardForm, CardImportForm, CardUpdateForm
+from vault.services.image_services import (
+    lookup_indexed_image,
+    has_real_image,
+)
+from vault.services.card_list_services import (
+    encode_cursor,
+    keyset_page,
+    resolve_sort,
+    sorted_cards,
+)
+from vault.services.catalog_services import get_or_create_catalog_card
+from vault.services.export_services import EXPORT_FORMATS, stream_export
+from vault.services.http_cache_services import cached_collection_response
+from vault.services.import_services import import_cards, iter_import_rows
+from vault.services.price_services import create_initial_snapshot
+from vault.services.rollup_services import refresh_collection_rollups
+from vault.services.thumbnail_services import (
+    CONTENT_TYPES,
+    THUMBNAIL_NAME_RE,
+    thumbnail_storage,
 )
+from vault.services.series_services import (
+    AGGREGATES,
+    BUCKETS,
+    bucket_series,
+    carry_forward_series,
+    downsample_lttb,
+    rollup_series,
+)
+from vault.services.job_services import enqueue_price_refresh, get_active_job
 
 logger = logging.getLogger(__name__)
 
@@ -39,22 +77,56 @@ class CardCreateView(LoginRequiredMixin, CreateView):
     template_name = "vault/card_form.html"
     success_url = reverse_lazy("card-list")
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        # Every upstream call this request makes shares one time budget
+        kwargs["deadline"] = Deadline.for_view("card-create")
+        return kwargs
+
     def form_valid(self, form):
         form.instance.user = self.request.user
 
-        form.instance.image_url = get_card_image_url_or_placeholder(
+        # Printings other vaults already hold reuse the catalog image
+        entry = get_or_create_catalog_card(
             card_name=form.instance.card_name,
             set_name=form.instance.set_name,
             card_number=form.instance.card_number,
         )
+        form.instance.catalog = entry
+        if has_real_image(entry.image_url):
+            form.instance.image_url = entry.image_url
+        else:
+            # No live lookup while the user waits: the local index or the
+            # placeholder, which the worker heals after the response
+            data = lookup_indexed_image(
+                card_name=form.instance.card_name,
+                set_name=form.instance.set_name,
+                card_number=form.instance.card_number,
+            )
+            form.instance.image_url = (
+                data.get("image_url") or settings.CARD_IMAGE_PLACEHOLDER_URL
+            )
+            if has_real_image(form.instance.image_url):
+                entry.image_url = form.instance.image_url
+                entry.tcgdex_id = data.get("card_id") or entry.tcgdex_id
+                entry.save(update_fields=["image_url", "tcgdex_id"])
 
         parsed = getattr(form, "cleaned_price", None)
         if parsed and "price" in parsed:
             form.instance.value_usd = parsed["price"]
             form.instance.price_last_updated = parsed["price_date"]
-
-        response = super().form_valid(form)
-        create_initial_snapshot(self.object)
+            entry.value_usd = parsed["price"]
+            entry.price_last_updated = parsed["price_date"]
+            entry.tcgplayer_id = parsed.get("tcgplayer_id") or entry.tcgplayer_id
+            entry.save(
+                update_fields=["value_usd", "price_last_updated", "tcgplayer_id"]
+            )
+
+        # Card and first snapshot land together, so the watermark that moves
+        # with the card never describes a vault without its snapshot
+        with transaction.atomic():
+            response = super().form_valid(form)
+            create_initial_snapshot(self.object)
         return response
 
 
@@ -63,26 +135,38 @@ class CardListView(LoginRequiredMixin, ListView):
     template_name = "vault/card_list.html"
     context_object_name = "cards"
 
+    def get_paginate_by(self, queryset):
+        return getattr(settings, "CARD_LIST_PAGE_SIZE", 50)
+
     def get_queryset(self):
-        qs = Card.objects.filter(user=self.request.user)
-
-        sort = self.request.GET.get("sort", "value_desc")
-
-        if sort == "value_asc":
-            return qs.order_by("value_usd", "card_name")
-        elif sort == "value_desc":
-            return qs.order_by("-value_usd", "card_name")
-        elif sort == "set_asc":
-            return qs.order_by("set_name", "card_number")
-        elif sort == "set_desc":
-            return qs.order_by("-set_name", "card_number")
-        else:
-            return qs.order_by("-value_usd", "card_name")
+        return sorted_cards(self.request.user, self.request.GET.get("sort"))
+
+    def paginate_queryset(self, queryset, page_size):
+        sort = resolve_sort(self.request.GET.get("sort"))
+        cursor = self.request.GET.get("cursor")
+        if cursor:
+            # Cursor pages skip OFFSET entirely, a bad cursor starts over
+            try:
+                cards, self.next_cursor = keyset_page(queryset, sort, cursor, page_size)
+            except ValueError:
+                cards, self.next_cursor = keyset_page(queryset, sort, None, page_size)
+            return None, None, cards, True
+
+        paginator, page, cards, is_paginated = super().paginate_queryset(
+            queryset, page_size
+        )
+        page.object_list = list(cards)
+        self.next_cursor = None
+        if page.has_next():
+            # "Next" continues by cursor so going deeper never pays for OFFSET
+            self.next_cursor = encode_cursor(page.object_list[-1], sort)
+        return paginator, page, page.object_list, is_paginated
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        context["current_sort"] = self.request.GET.get("sort", "value_desc")
+        context["current_sort"] = resolve_sort(self.request.GET.get("sort"))
+        context["next_cursor"] = self.next_cursor
 
         # Total value across the user's entire collection
         user_cards = Card.objects.filter(user=self.request.user)
@@ -91,10 +175,77 @@ class CardListView(LoginRequiredMixin, ListView):
         )
 
         context["total_value_usd"] = aggregates["total"]
+        context["refresh_job"] = get_active_job(self.request.user)
+        context["placeholder_image_url"] = settings.CARD_IMAGE_PLACEHOLDER_URL
 
         return context
 
 
+@login_required
+@cached_collection_response
+def card_list_api(request):
+    """
+    The card list as JSON for infinite scroll, paged by cursor.
+    """
+    sort = resolve_sort(request.GET.get("sort"))
+    page_size = getattr(settings, "CARD_LIST_PAGE_SIZE", 50)
+    max_size = getattr(settings, "CARD_LIST_MAX_PAGE_SIZE", 200)
+    try:
+        limit = min(max(1, int(request.GET.get("limit", page_size))), max_size)
+        cards, next_cursor = keyset_page(
+            sorted_cards(request.user, sort),
+            sort,
+            request.GET.get("cursor"),
+            limit,
+        )
+    except ValueError:
+        return JsonResponse({"error": "invalid limit or cursor"}, status=400)
+
+    results = [
+        {
+            "id": card.pk,
+            "card_name": card.card_name,
+            "set_name": card.set_name,
+            "card_number": card.card_number,
+            "condition": card.condition,
+            "language": card.language,
+            "image_url": card.image_url,
+            "thumbnail_srcset": (
+                card.catalog.thumbnail_srcset
+                if card.catalog and card.catalog.image_mirror
+                else None
+            ),
+            "value_usd": str(card.value_usd) if card.value_usd is not None else None,
+            "price_last_updated": (
+                card.price_last_updated.isoformat() if card.price_last_updated else None
+            ),
+            "update_url": reverse("card-update", args=[card.pk]),
+            "delete_url": reverse("card-delete", args=[card.pk]),
+        }
+        for card in cards
+    ]
+    return JsonResponse({"results": results, "next_cursor": next_cursor})
+
+
+@login_required
+def card_images_api(request):
+    """
+    Image urls for the given card ids once they have a real one, polled by
+    the list page for cards added moments ago.
+    """
+    try:
+        ids = [int(pk) for pk in request.GET.get("ids", "").split(",") if pk]
+    except ValueError:
+        return JsonResponse({"error": "ids must be numbers"}, status=400)
+    cards = Card.objects.filter(user=request.user, pk__in=ids[:100])
+    images = {
+        card.pk: card.image_url
+        for card in cards.only("pk", "image_url")
+        if has_real_image(card.image_url)
+    }
+    return JsonResponse({"images": images})
+
+
 class CardUpdateView(LoginRequiredMixin, UpdateView):
     model = Card
     form_class = CardUpdateForm
@@ -117,6 +268,55 @@ class CardDeleteView(LoginRequiredMixin, DeleteView):
     def get_queryset(self):
         return Card.objects.filter(user=self.request.user)
 
+    def form_valid(self, form):
+        # The card's snapshots go with it, so its days need re-summing
+        days = list(self.object.price_snapshots.values_list("as_of_date", flat=True))
+        response = super().form_valid(form)
+        refresh_collection_rollups((self.request.user.pk, day) for day in days)
+        return response
+
+
+class CardImportView(LoginRequiredMixin, FormView):
+    form_class = CardImportForm
+    template_name = "vault/card_import.html"
+
+    def form_valid(self, form):
+        upload = form.cleaned_data["file"]
+        summary = import_cards(
+            self.request.user, iter_import_rows(upload.file, form.import_format)
+        )
+        # Show the per-row report with a fresh form for the next file
+        return self.render_to_response(
+            self.get_context_data(form=CardImportForm(), summary=summary)
+        )
+
+
+@login_required
+def export_cards(request):
+    fmt = request.GET.get("format", "csv").lower()
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({"error": "format must be csv or jsonl"}, status=400)
+
+    try:
+        start = request.GET.get("start")
+        end = request.GET.get("end")
+        start = date.fromisoformat(start) if start else None
+        end = date.fromisoformat(end) if end else None
+    except ValueError:
+        return JsonResponse({"error": "dates must be YYYY-MM-DD"}, status=400)
+
+    # A date range exports snapshot history instead of the vault itself
+    history = bool(start or end) or request.GET.get("history") == "1"
+    lines = stream_export(request.user, fmt, start=start, end=end, history=history)
+
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    name = "cardvault-history" if history else "cardvault"
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response["Content-Disposition"] = (
+        f'attachment; filename="{name}-{timezone.localdate().isoformat()}.{fmt}"'
+    )
+    return response
+
 
 class RegisterView(CreateView):
     form_class = UserCreationForm
@@ -128,6 +328,7 @@ class RegisterView(CreateView):
 
 
 @login_required
+@cached_collection_response
 def collection_value_series(request):
     range_key = request.GET.get("range", "30d").lower()
     today = timezone.localdate()
@@ -144,18 +345,44 @@ def collection_value_series(request):
         # fallback
         start = today - timedelta(days=29)
 
-    qs = PriceSnapshot.objects.filter(card__user=request.user)
-
-    if start is not None:
-        qs = qs.filter(as_of_date__gte=start)
-
-    rows = qs.values("as_of_date").annotate(total=Sum("price")).order_by("as_of_date")
-
-    data = [
-        {"date": r["as_of_date"].isoformat(), "value": str(r["total"] or 0)}
-        for r in rows
-    ]
+    if request.GET.get("carry_forward") in ("1", "true"):
+        # Cards missing a snapshot on a day count at their last known price
+        points = carry_forward_series(request.user, start=start)
+    else:
+        # One pre-summed row per day, kept current as snapshots are written
+        points = rollup_series(request.user, start=start)
+
+    bucket = request.GET.get("bucket")
+    agg = request.GET.get("agg", "last")
+    if bucket or "agg" in request.GET:
+        if bucket not in BUCKETS or agg not in AGGREGATES:
+            return JsonResponse(
+                {"error": "bucket must be day/week/month, agg last/avg/min/max"},
+                status=400,
+            )
+        points = bucket_series(points, bucket, agg)
+
+    columnar = request.GET.get("format") == "columns"
+    try:
+        budget = int(request.GET["points"]) if "points" in request.GET else None
+    except ValueError:
+        return JsonResponse({"error": "points must be a number"}, status=400)
+    if budget is None and columnar:
+        budget = getattr(settings, "SERIES_MAX_POINTS", 1000)
+    if budget is not None:
+        points = downsample_lttb(points, max(3, budget))
+
+    if columnar:
+        # Parallel arrays with numeric values, far smaller than a list of dicts
+        return JsonResponse(
+            {
+                "dates": [day.isoformat() for day, _ in points],
+                "values": [float(value) for _, value in points],
+            },
+            json_dumps_params={"separators": (",", ":")},
+        )
 
+    data = [{"date": day.isoformat(), "value": str(value)} for day, value in points]
     return JsonResponse(data, safe=False)
 
 
@@ -170,11 +397,60 @@ class CollectionGraphView(LoginRequiredMixin, TemplateView):
 
 @login_required
 def refresh_prices(request):
+    # Refreshes run in the job worker, the request only queues one
     if request.method == "POST":
-        refresh_prices_for_user(request.user)
+        enqueue_price_refresh(request.user)
     return redirect("card-list")
 
 
+@login_required
+def refresh_progress(request):
+    job = request.user.price_refresh_jobs.order_by("-created_at").first()
+    if job is None:
+        return JsonResponse({"status": "idle"})
+
+    return JsonResponse(
+        {
+            "status": job.status,
+            "total": job.cards_total,
+            "done": job.cards_done,
+            "failed": job.cards_failed,
+            "created_at": job.created_at.isoformat(),
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+    )
+
+
+@login_required
+def upstream_status(request):
+    """
+    Circuit breaker state per upstream host, plus this worker's price limiter
+    and upstream cache counters.
+    """
+    return JsonResponse(
+        {
+            "circuit_breakers": breaker_states(),
+            "price_limiter": get_price_limiter().metrics(),
+            "upstream_cache": get_cache_stats(),
+        }
+    )
+
+
+def card_image(request, name):
+    """
+    A mirrored card thumbnail. Names are content hashes, so a response never
+    goes stale and browsers and proxies can keep it for a year.
+    """
+    storage = thumbnail_storage()
+    if not THUMBNAIL_NAME_RE.match(name) or not storage.exists(name):
+        raise Http404("No such image")
+    response = FileResponse(
+        storage.open(name), content_type=CONTENT_TYPES[name.rsplit(".", 1)[1]]
+    )
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
 # ----------------------------------test helper
 
 